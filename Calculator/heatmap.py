@@ -0,0 +1,175 @@
+"""
+探索热力图：统计所有模拟队伍在每个格子的到达次数与触发次数
+walk_policies 的批量模拟每走一步用 np.bincount 把整批队伍的落点一次累加到格子上，不逐步更新字典
+导出为与 map/ch*.xlsx 对齐的 CSV（首行为列字母 A、B…，首列为行号 1、2…）和 PNG 热力图
+
+用法：
+    python heatmap.py map/ch1.xlsx --ap 65
+    python heatmap.py map/ch1.xlsx --ap 65 --policy greedy --walks 200000 --out heatmap
+"""
+
+import argparse
+import csv
+import os
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # 未安装 Pillow 时只导出 CSV
+    Image = None
+
+# 热力图配色：0 为白色，经黄色到最大值的深红色
+COLOR_STOPS = np.array([[255, 255, 255], [255, 214, 64], [196, 24, 24]], dtype=float)
+
+
+class CellCounts:
+    """每个格子的到达次数（含起点）与触发次数，可在多次模拟间累加；walks 为累计的队伍数"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.visits = np.zeros(self.rows * self.cols, dtype=np.int64)
+        self.triggers = np.zeros(self.rows * self.cols, dtype=np.int64)
+        self.walks = 0
+
+    def add(self, visited, triggered=None):
+        """visited / triggered 为本步所有队伍落点的展平格子下标（可重复），按格子分桶后一次累加"""
+        cells = self.rows * self.cols
+        self.visits += np.bincount(visited, minlength=cells)
+        if triggered is not None and len(triggered):
+            self.triggers += np.bincount(triggered, minlength=cells)
+
+    def matrices(self):
+        """与地图同形状的 {'visits', 'triggers'}"""
+        shape = (self.rows, self.cols)
+        return {'visits': self.visits.reshape(shape), 'triggers': self.triggers.reshape(shape)}
+
+
+def column_letter(index):
+    """0 -> A，25 -> Z，26 -> AA，与 Excel 列名一致"""
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord('A') + rem) + letters
+    return letters
+
+
+def write_csv(matrix, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([''] + [column_letter(c) for c in range(matrix.shape[1])])
+        for r, row in enumerate(matrix, 1):
+            writer.writerow([r] + row.tolist())
+
+
+def colorize(matrix):
+    """按最大值归一化后在 COLOR_STOPS 间线性插值，返回 (行, 列, 3) 的 uint8 颜色"""
+    peak = matrix.max()
+    scaled = matrix / peak * (len(COLOR_STOPS) - 1) if peak else np.zeros(matrix.shape)
+    lower = np.minimum(scaled.astype(int), len(COLOR_STOPS) - 2)
+    fraction = (scaled - lower)[..., None]
+    colors = COLOR_STOPS[lower] * (1 - fraction) + COLOR_STOPS[lower + 1] * fraction
+    return colors.round().astype(np.uint8), scaled / (len(COLOR_STOPS) - 1)
+
+
+def render_panel(matrix, grid, walks, title, cell=40, margin=28):
+    """
+    单张热力图：格子按地图排列，边上标列字母与行号；事件格加粗边框，起点标 S
+    格内数字为每支队伍的平均次数
+    """
+    rows, cols = matrix.shape
+    colors, intensity = colorize(matrix)
+    heat = Image.fromarray(colors, 'RGB').resize((cols * cell, rows * cell), Image.NEAREST)
+
+    panel = Image.new('RGB', (margin + cols * cell + 1, margin * 2 + rows * cell + 1), 'white')
+    panel.paste(heat, (margin, margin * 2))
+    draw = ImageDraw.Draw(panel)
+    font = ImageFont.load_default(size=11)
+    draw.text((margin, margin // 2), title, fill='black', font=font, anchor='lm')
+
+    top = margin * 2
+    for c in range(cols):
+        draw.text((margin + c * cell + cell / 2, top - margin / 2), column_letter(c), fill='black', font=font, anchor='mm')
+    for r in range(rows):
+        draw.text((margin / 2, top + r * cell + cell / 2), str(r + 1), fill='black', font=font, anchor='mm')
+
+    for r in range(rows):
+        for c in range(cols):
+            x, y = margin + c * cell, top + r * cell
+            event = bool(grid[r][c])
+            draw.rectangle((x, y, x + cell, y + cell), outline='black' if event else (200, 200, 200),
+                           width=2 if event else 1)
+            ink = 'white' if intensity[r, c] > 0.6 else 'black'
+            if grid[r][c] == 2:
+                draw.text((x + 4, y + 3), 'S', fill=ink, font=font)
+            if matrix[r, c]:
+                draw.text((x + cell / 2, y + cell / 2 + 4), f'{matrix[r, c] / max(walks, 1):.2f}', fill=ink,
+                          font=font, anchor='mm')
+    return panel
+
+
+def render_png(counts, path, cell=40):
+    """到达次数与触发次数两张热力图左右并排"""
+    matrices = counts.matrices()
+    # 内置字体没有中文字形，标题用英文
+    panels = [render_panel(matrices['visits'], counts.grid, counts.walks, 'visits / walk', cell),
+              render_panel(matrices['triggers'], counts.grid, counts.walks, 'triggers / walk', cell)]
+    image = Image.new('RGB', (sum(p.width for p in panels) + 20, max(p.height for p in panels)), 'white')
+    x = 0
+    for panel in panels:
+        image.paste(panel, (x, 0))
+        x += panel.width + 20
+    image.save(path)
+
+
+def export_heatmap(counts, prefix):
+    """写出 {prefix}_visits.csv、{prefix}_triggers.csv 与 {prefix}_heatmap.png，返回写出的文件列表"""
+    paths = []
+    for name, matrix in counts.matrices().items():
+        path = f'{prefix}_{name}.csv'
+        write_csv(matrix, path)
+        paths.append(path)
+    if Image is None:
+        print("⚠️ 未安装 Pillow，跳过 PNG 热力图（pip install pillow）")
+    else:
+        path = f'{prefix}_heatmap.png'
+        render_png(counts, path)
+        paths.append(path)
+    return paths
+
+
+def main():
+    from map_reader import load_map_with_color
+    from walk_policies import POLICIES, run_walks
+
+    parser = argparse.ArgumentParser(description='统计地图每格的到达与触发次数并导出热力图')
+    parser.add_argument('map', help='地图文件（map/ch*.xlsx）')
+    parser.add_argument('--ap', type=int, required=True, help='队伍行动值')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='uniform', help='游走策略')
+    parser.add_argument('--walks', type=int, default=100000, help='模拟队伍数')
+    parser.add_argument('--start', type=int, nargs=2, default=(0, 0), metavar=('ROW', 'COL'), help='起点（从 0 开始）')
+    parser.add_argument('--out', default='.', help='输出目录')
+    parser.add_argument('--seed', type=int, help='随机种子')
+    args = parser.parse_args()
+
+    grid = load_map_with_color(args.map)
+    counts = CellCounts(grid)
+    events = run_walks(grid, args.ap, args.policy, args.walks, tuple(args.start), seed=args.seed, heatmap=counts)
+
+    os.makedirs(args.out, exist_ok=True)
+    prefix = os.path.join(args.out, os.path.splitext(os.path.basename(args.map))[0])
+    for path in export_heatmap(counts, prefix):
+        print(f"📄 {path}")
+
+    # 触发最少的事件格，调图时最需要关注
+    triggers = counts.matrices()['triggers']
+    cells = [(triggers[r, c], r, c) for r in range(counts.rows) for c in range(counts.cols) if grid[r][c] == 1]
+    print(f"平均触发事件数: {events.mean() / 2:.2f}（{args.walks} 支队伍，策略 {args.policy}）")
+    print("触发最少的事件格:", ', '.join(f'{column_letter(c)}{r + 1} ({n / args.walks:.3f})'
+                                   for n, r, c in sorted(cells)[:5]))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 from map_reader import load_map_with_color
-from simulator import calc_team_action_points, simulate_exploration
+from simulator import calc_team_action_points, simulate_exploration, simulate_ap_curve
+from route_planner import plan_routes
+from walk_policies import compare_policies, ap_for_target
 
 if __name__ == "__main__":
     # 读取地图
@@ -32,3 +34,30 @@ if __name__ == "__main__":
     print(f"最少触发事件数: {min_e}")
     print(f"最多触发事件数: {max_e}")
     print(f"平均触发事件数: {avg_e:.2f}")
+
+    # 最优路线：规划器按事件格原始计数，与上面的模拟结果一样 /2 换算后打印，括号内为原始计数
+    routes = plan_routes(grid, action_points, start=(0, 0))
+    bound_note = "" if routes['optimal'] else f"，搜索未完成，上界 {routes['max_bound'] / 2}"
+    print(f"最优路线最多触发事件数: {routes['max_events'] / 2}（原始计数 {routes['max_events']}{bound_note}）")
+    if routes['min_complete']:
+        print(f"最优路线最少触发事件数: {routes['min_events'] / 2}（原始计数 {routes['min_events']}）")
+    else:
+        print(f"最优路线最少触发事件数: 搜索未完成（已展开 {routes['min_states']} 个状态）")
+    print(f"最多事件路线: {' -> '.join(f'{r},{c}' for r, c in routes['max_path'])}")
+
+    # 不同游走策略的对比
+    print("策略对比（最少 / 最多 / 平均）:")
+    for name, (low, high, mean) in compare_policies(grid, action_points, walks=100000).items():
+        print(f"  {name:<10}{low:>6} / {high:>6} / {mean:.2f}")
+
+    # 行动值曲线：一次模拟得到每档行动值的事件数，按 1/10 间隔打印
+    max_ap = action_points * 2
+    curve = simulate_ap_curve(grid, max_ap, start=(0, 0), simulations=100000)
+    print(f"行动值曲线（平均 / P5 / P50 / P95，行动值 0-{max_ap}）:")
+    for ap in range(0, max_ap + 1, max(1, max_ap // 10)):
+        p = curve['percentiles']
+        print(f"  {ap:>4}  {curve['mean'][ap]:>6.2f} / {p[5][ap]:>5} / {p[50][ap]:>5} / {p[95][ap]:>5}")
+    # 平均值看均值曲线；最多值是一万次里最好的一次，均值曲线几乎追不上，改看 P95 曲线（约 1/20 的队伍能达到）
+    for label, target, stat in (("平均事件数达到模拟平均值", avg_e, 'mean'), ("P95 事件数达到模拟最多值", max_e, 95)):
+        needed = ap_for_target(curve, target, stat)
+        print(f"{label} {target:.2f} 需要行动值: {needed if needed is not None else f'超过 {max_ap}'}")
@@ -0,0 +1,232 @@
+"""
+最优路线规划：给定行动值，从起点出发最多 / 最少能触发多少个不同的事件格
+
+规则与 simulate_exploration 相同：
+- 每移动一格消耗 1 点
+- 进入事件格（地图中非 0 的格子）后若还有行动值，自动触发并再消耗 1 点
+- 行动值用完前必须一直移动
+不同之处：每个事件格只计一次，已触发的事件格可以再次经过，只消耗移动
+结果不做 simulate_exploration 中的 /2 换算
+"""
+
+from collections import deque
+
+
+class _Board:
+    """把地图展开成一维下标，预先算好邻居和事件位"""
+
+    def __init__(self, grid):
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.neighbors = []
+        self.event_bit = []
+        event_count = 0
+        for r in range(self.rows):
+            for c in range(self.cols):
+                moves = [(r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)]
+                self.neighbors.append([x * self.cols + y for x, y in moves
+                                       if 0 <= x < self.rows and 0 <= y < self.cols])
+                if grid[r][c]:
+                    self.event_bit.append(1 << event_count)
+                    event_count += 1
+                else:
+                    self.event_bit.append(0)
+        self.event_count = event_count
+
+        # 每个事件格到最近的其他事件格的距离（地图没有障碍，即曼哈顿距离），用于估计上界
+        cells = [divmod(i, self.cols) for i, bit in enumerate(self.event_bit) if bit]
+        self.events = []
+        for r, c in cells:
+            nearest = min((abs(r - x) + abs(c - y) for x, y in cells if (x, y) != (r, c)), default=0)
+            self.events.append((self.event_bit[r * self.cols + c], r, c, nearest))
+
+    def index(self, pos):
+        return pos[0] * self.cols + pos[1]
+
+    def cell(self, index):
+        return divmod(index, self.cols)
+
+    def reach(self, source, mask, ap):
+        """
+        从 source 出发，只经过空地和已触发的事件格，找出进入后还能触发的未触发事件格
+        返回 [(距离, 事件格, 路径)]，按距离升序；距离 d 需满足 d < ap（进入后还剩行动值）
+        """
+        dist = {source: 0}
+        parent = {source: None}
+        targets = []
+        found = set()
+        frontier = [source]
+        d = 0
+        while frontier and d + 1 < ap:
+            next_frontier = []
+            for cell in frontier:
+                for n in self.neighbors[cell]:
+                    bit = self.event_bit[n]
+                    if bit and not mask & bit:
+                        if n not in found:
+                            found.add(n)
+                            targets.append((d + 1, n, cell))
+                    elif n not in dist:
+                        dist[n] = d + 1
+                        parent[n] = cell
+                        next_frontier.append(n)
+            frontier = next_frontier
+            d += 1
+
+        result = []
+        for distance, target, via in targets:
+            path = [target]
+            while via is not None and via != source:
+                path.append(via)
+                via = parent[via]
+            result.append((distance, target, path[::-1]))
+        return result
+
+    def upper_bound(self, pos, mask, ap, count):
+        """
+        至多能触发的事件数：每个未触发事件至少花费 1（触发）+ 从上一个位置走过来的距离，
+        上一个位置只能是当前位置或另一个未触发事件，取较近者；按花费从小到大累加到行动值为止
+        """
+        pr, pc = divmod(pos, self.cols)
+        costs = sorted(1 + min(nearest, abs(r - pr) + abs(c - pc))
+                       for bit, r, c, nearest in self.events if not mask & bit)
+        total = 0
+        for cost in costs:
+            total += cost
+            if total > ap:
+                break
+            count += 1
+        return count
+
+
+def plan_max_events(grid, action_points, start=(0, 0), node_limit=20000):
+    """
+    分支定界求最多能触发的不同事件数
+    每一步枚举"下一个要触发的事件格"（走最短路过去），按距离由近到远展开；
+    (位置, 已触发集合) 相同且剩余行动值不多于已见过的状态直接剪枝
+    超过 node_limit 时返回当前最优路线，bound 为尚未排除的上界（optimal 为 False）
+    返回 {'events', 'bound', 'optimal', 'path', 'triggered', 'nodes'}
+    """
+    board = _Board(grid)
+    source = board.index(start)
+    best = {'events': 0, 'segments': []}
+    seen = {}
+    state = {'nodes': 0, 'open_bound': 0}
+
+    root_bound = board.upper_bound(source, 0, action_points, 0)
+
+    def search(pos, mask, ap, count, segments, bound):
+        if count > best['events']:
+            best['events'], best['segments'] = count, list(segments)
+        if best['events'] >= root_bound or bound <= best['events']:
+            return
+        if state['nodes'] >= node_limit:
+            state['open_bound'] = max(state['open_bound'], bound)
+            return
+        state['nodes'] += 1
+
+        for distance, target, path in board.reach(pos, mask, ap):
+            new_mask = mask | board.event_bit[target]
+            new_ap = ap - distance - 1
+            if seen.get((target, new_mask), -1) >= new_ap:
+                continue
+            seen[(target, new_mask)] = new_ap
+
+            # 上界不超过当前最优的分支不再展开；先用每个事件至少 2 点的粗上界排除，再算细上界
+            if count + 1 + new_ap // 2 <= best['events']:
+                continue
+            child_bound = board.upper_bound(target, new_mask, new_ap, count + 1)
+            if child_bound <= best['events']:
+                continue
+
+            segments.append(path)
+            search(target, new_mask, new_ap, count + 1, segments, child_bound)
+            segments.pop()
+            if best['events'] >= root_bound:
+                return
+
+    search(source, 0, action_points, 0, [], root_bound)
+
+    path = [start] + [board.cell(cell) for segment in best['segments'] for cell in segment]
+    bound = max(best['events'], state['open_bound'])
+    return {
+        'events': best['events'],
+        'bound': bound,
+        'optimal': bound == best['events'],
+        'path': path,
+        'triggered': [board.cell(segment[-1]) for segment in best['segments']],
+        'nodes': state['nodes'],
+    }
+
+
+def plan_min_events(grid, action_points, start=(0, 0), state_limit=2000000):
+    """
+    0-1 BFS 求行动值耗尽时最少会触发的不同事件数
+    状态为 (位置, 剩余行动值, 已触发集合)：走空地/已触发格代价 0，触发新事件代价 1
+    返回 {'events', 'path', 'triggered', 'states'}；超过 state_limit 仍未找到时 events 为 None
+    """
+    board = _Board(grid)
+    source = (board.index(start), action_points, 0)
+    cost = {source: 0}
+    parent = {source: None}
+    queue = deque([source])
+    end = None
+
+    while queue:
+        current = queue.popleft()
+        pos, ap, mask = current
+        if ap == 0:
+            end = current
+            break
+        if len(cost) > state_limit:
+            break
+
+        for n in board.neighbors[pos]:
+            bit = board.event_bit[n]
+            if bit and not mask & bit and ap - 1 > 0:
+                nxt, step = (n, ap - 2, mask | bit), 1
+            else:
+                nxt, step = (n, ap - 1, mask), 0
+            new_cost = cost[current] + step
+            if new_cost < cost.get(nxt, float('inf')):
+                cost[nxt] = new_cost
+                parent[nxt] = current
+                if step:
+                    queue.append(nxt)
+                else:
+                    queue.appendleft(nxt)
+
+    if end is None:
+        return {'events': None, 'path': [], 'triggered': [], 'states': len(cost)}
+
+    states = []
+    while end is not None:
+        states.append(end)
+        end = parent[end]
+    states.reverse()
+
+    triggered = [board.cell(b[0]) for a, b in zip(states, states[1:]) if b[2] != a[2]]
+    return {
+        'events': len(triggered),
+        'path': [board.cell(pos) for pos, _, _ in states],
+        'triggered': triggered,
+        'states': len(cost),
+    }
+
+
+def plan_routes(grid, action_points, start=(0, 0), node_limit=20000):
+    """
+    同时求最多/最少事件数，便于对每支队伍批量计算
+    最少事件搜索超过状态上限时 min_events 为 None、min_complete 为 False，min_states 为已展开的状态数
+    """
+    best = plan_max_events(grid, action_points, start, node_limit)
+    worst = plan_min_events(grid, action_points, start)
+    return {
+        'max_events': best['events'],
+        'max_bound': best['bound'],
+        'optimal': best['optimal'],
+        'max_path': best['path'],
+        'min_events': worst['events'],
+        'min_complete': worst['events'] is not None,
+        'min_states': worst['states'],
+        'min_path': worst['path'],
+    }
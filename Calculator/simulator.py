@@ -10,15 +10,22 @@ def calc_team_action_points(team, pt_per_action=5):
     print(f"队伍总pt: {total_pt}")
     return total_pt // pt_per_action
 
-def simulate_exploration(grid, action_points, start=(0, 0), simulations=10000):
+def simulate_exploration(grid, action_points, start=(0, 0), simulations=10000, policy=None, heatmap=None):
     """
     模拟队伍在地图上的探索：
     - grid: 事件布尔矩阵
     - action_points: 队伍可用行动值
     - start: 起点坐标
     - simulations: 模拟次数
-    事件可重复触发
+    - policy: 游走策略（walk_policies.POLICIES 中的名字或 WalkPolicy），指定时改用 NumPy 批量模拟
+    - heatmap: heatmap.CellCounts，传入时累加每格的到达与触发次数（未指定策略时按 uniform 批量模拟）
+    默认逐步随机移动，事件可重复触发
     """
+    if policy is not None or heatmap is not None:
+        from walk_policies import run_walks
+        events = run_walks(grid, action_points, policy or 'uniform', simulations, start, heatmap=heatmap)
+        return float(events.min()) / 2, float(events.max()) / 2, float(events.mean()) / 2
+
     rows, cols = len(grid), len(grid[0])
     max_events = 0
     min_events = float('inf')
@@ -56,3 +63,13 @@ def simulate_exploration(grid, action_points, start=(0, 0), simulations=10000):
 
     avg_events = total_events / simulations
     return min_events/2, max_events/2, avg_events/2
+
+
+def simulate_ap_curve(grid, max_action_points, start=(0, 0), simulations=10000, policy='uniform'):
+    """
+    行动值曲线：按 max_action_points 模拟一次，得到 0..max_action_points 每档行动值的事件数（平均、最少、最多、百分位）
+    用于找出达到目标事件数需要多少行动值，不必对每个候选行动值分别调用 simulate_exploration
+    默认策略 uniform 与 simulate_exploration 的逐步随机移动相同；结果同样做 /2 换算
+    """
+    from walk_policies import ap_curve
+    return ap_curve(grid, max_action_points, policy, simulations, start)
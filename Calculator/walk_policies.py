@@ -0,0 +1,237 @@
+"""
+可替换的随机游走策略，用 NumPy 一次推进一批队伍
+
+每个策略只提供"这一步往四个方向走的权重"，由 run_walks 对整批队伍同时计算、按权重抽样，
+不在每一步、每支队伍上调用 Python 函数，百万次模拟只需数秒
+规则与 simulate_exploration 相同：移动消耗 1 点，进入事件格后还有行动值则触发并再消耗 1 点
+ap_curve 只按最大行动值模拟一次，得到每一档行动值下的事件数分布
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# weights(walks, active, candidates, valid) -> (4, 活跃队伍数) 的非负权重
+# candidates/valid 也是 (4, 活跃队伍数)：每行一个方向，越界的方向 valid 为 False
+# repeat_events 为 False 时同一事件格只触发一次
+# 权重不应依赖剩余行动值，否则 ap_curve 中各档行动值的走法不再相同
+WalkPolicy = namedtuple('WalkPolicy', ['name', 'weights', 'repeat_events'])
+
+
+class Walks:
+    """一批队伍的状态：位置、剩余行动值、事件数、走过/触发过的格子"""
+
+    def __init__(self, grid, count, action_points, start, repeat_events=True):
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.cells = cells = self.rows * self.cols
+        self.count = count
+        self.repeat_events = repeat_events
+        self.is_event = np.array([bool(v) for row in grid for v in row])
+        self.event_cells = np.flatnonzero(self.is_event)
+
+        # 四个方向的邻居（按方向分行，便于整行运算），越界为 -1
+        r, c = np.divmod(np.arange(cells), self.cols)
+        self.neighbors = np.full((4, cells), -1, dtype=np.int32)
+        for k, (dr, dc) in enumerate([(1, 0), (-1, 0), (0, 1), (0, -1)]):
+            x, y = r + dr, c + dc
+            inside = (0 <= x) & (x < self.rows) & (0 <= y) & (y < self.cols)
+            self.neighbors[k, inside] = (x * self.cols + y)[inside]
+        # 任意两格的曼哈顿距离（地图没有障碍）
+        self.distance = (np.abs(r[:, None] - r[None, :]) + np.abs(c[:, None] - c[None, :])).astype(np.int16)
+
+        source = start[0] * self.cols + start[1]
+        self.position = np.full(count, source, dtype=np.int32)
+        self.ap = np.full(count, action_points, dtype=np.int32)
+        self.events = np.zeros(count, dtype=np.int32)
+        # 按 队伍 * 格子数 + 格子 展平存放；不重复触发时才记录已触发的格子
+        self.visited = np.zeros(count * cells, dtype=bool)
+        self.visited[np.arange(count) * cells + source] = True
+        self.triggered = np.zeros(count * cells, dtype=bool)
+
+    def flat(self, walk, cell):
+        return walk * self.cells + cell
+
+
+def uniform_weights(walks, active, candidates, valid):
+    """四个方向等概率"""
+    return valid
+
+
+def unvisited_weights(bias=4.0):
+    """没走过的格子权重为 bias，走过的为 1"""
+    def weights(walks, active, candidates, valid):
+        seen = walks.visited[walks.flat(active, np.where(valid, candidates, 0))]
+        return np.where(valid, np.where(seen, 1.0, bias), 0.0)
+    return weights
+
+
+def nearest_event_weights(walks, active, candidates, valid):
+    """
+    朝最近的可触发事件格走：旁边有可触发的事件格就在其中随机选一个，
+    否则朝最近的可触发事件格（目标到达前不变）走一步，只在使距离最小的方向中随机选
+    没有可触发的事件格时退化为等概率
+    """
+    safe = np.where(valid, candidates, 0)
+    open_event = valid & walks.is_event[safe] & ~walks.triggered[walks.flat(active, safe)]
+    weights = open_event.astype(float)
+
+    far = np.flatnonzero(~open_event.any(axis=0))
+    if not len(far):
+        return weights
+
+    if not hasattr(walks, 'target'):
+        walks.target = np.full(walks.count, -1, dtype=np.int32)
+    walkers, here = active[far], walks.position[active[far]]
+    target = walks.target[walkers]
+
+    # 目标未定、已触发或就在脚下时重新选最近的可触发事件格
+    stale = (target < 0) | walks.triggered[walks.flat(walkers, np.maximum(target, 0))] | (target == here)
+    if stale.any():
+        events = walks.event_cells
+        retarget = walkers[stale]
+        distance = walks.distance[here[stale][:, None], events[None, :]]
+        blocked = walks.triggered[walks.flat(retarget[:, None], events[None, :])] | (distance == 0)
+        distance = np.where(blocked, np.iinfo(np.int16).max, distance)
+        target[stale] = np.where(blocked.all(axis=1), -1, events[distance.argmin(axis=1)])
+        walks.target[walkers] = target
+
+    step = np.where(valid[:, far], walks.distance[safe[:, far], np.maximum(target, 0)], np.iinfo(np.int16).max)
+    closest = valid[:, far] & (step == step.min(axis=0))
+    weights[:, far] = np.where(target < 0, valid[:, far], closest)
+    return weights
+
+
+POLICIES = {
+    'uniform': WalkPolicy('uniform', uniform_weights, True),
+    'unvisited': WalkPolicy('unvisited', unvisited_weights(), True),
+    'greedy': WalkPolicy('greedy', nearest_event_weights, False),
+    'no_repeat': WalkPolicy('no_repeat', uniform_weights, False),
+}
+
+
+def _run_batch(grid, action_points, count, policy, start, rng, triggers=None, heatmap=None):
+    """
+    triggers 为 (count, action_points + 1) 的数组时，在 [队伍, 触发后累计花费] 处记 1
+    heatmap 为 heatmap.CellCounts 时，每一步把整批队伍的落点与触发格累加到各格子
+    """
+    walks = Walks(grid, count, action_points, start, policy.repeat_events)
+    active = np.arange(count)
+    if heatmap is not None:
+        heatmap.walks += count
+        heatmap.add(walks.position)
+
+    while True:
+        active = active[walks.ap[active] > 0]
+        if not len(active):
+            break
+        candidates = walks.neighbors[:, walks.position[active]]
+        valid = candidates >= 0
+        weights = policy.weights(walks, active, candidates, valid)
+
+        # 按累计权重抽样方向：累计值不超过随机数的方向个数即为所选方向
+        cumulative = np.cumsum(weights, axis=0, dtype=float)
+        total = cumulative[3]
+        stuck = total <= 0
+        if stuck.any():  # 权重全为 0 的队伍改为等概率，避免卡住
+            cumulative[:, stuck] = np.cumsum(valid[:, stuck], axis=0)
+            total = cumulative[3]
+        draw = np.minimum(rng.random(len(active)) * total, np.nextafter(total, 0))
+        choice = (cumulative[0] <= draw).astype(np.int32)
+        choice += cumulative[1] <= draw
+        choice += cumulative[2] <= draw
+        moved = candidates.ravel()[choice * len(active) + np.arange(len(active))]
+
+        walks.position[active] = moved
+        walks.visited[walks.flat(active, moved)] = True
+        walks.ap[active] -= 1
+
+        trigger = walks.is_event[moved] & (walks.ap[active] > 0)
+        if not walks.repeat_events:
+            trigger &= ~walks.triggered[walks.flat(active, moved)]
+            walks.triggered[walks.flat(active[trigger], moved[trigger])] = True
+        hit = active[trigger]
+        walks.events[hit] += 1
+        walks.ap[hit] -= 1
+        if triggers is not None:
+            triggers[hit, action_points - walks.ap[hit]] = 1
+        if heatmap is not None:
+            heatmap.add(moved, moved[trigger])
+
+    return walks.events
+
+
+def run_walks(grid, action_points, policy='uniform', walks=100000, start=(0, 0), batch_size=100000, seed=None,
+              heatmap=None):
+    """
+    按策略模拟 walks 支队伍，返回每支队伍触发的事件数（NumPy 数组，不做 /2 换算）
+    policy 可以是 POLICIES 中的名字或自定义的 WalkPolicy；按 batch_size 分批以限制内存
+    heatmap 为 heatmap.CellCounts 时同时累加每格的到达与触发次数
+    """
+    if isinstance(policy, str):
+        policy = POLICIES[policy]
+    rng = np.random.default_rng(seed)
+    results = []
+    for done in range(0, walks, batch_size):
+        results.append(_run_batch(grid, action_points, min(batch_size, walks - done), policy, start, rng,
+                                  heatmap=heatmap))
+    return np.concatenate(results) if results else np.zeros(0, dtype=np.int32)
+
+
+def compare_policies(grid, action_points, policies=None, walks=100000, start=(0, 0), seed=None):
+    """各策略的 (最少, 最多, 平均) 事件数，与 simulate_exploration 同样做 /2 换算"""
+    results = {}
+    for policy in policies or POLICIES:
+        events = run_walks(grid, action_points, policy, walks, start, seed=seed)
+        name = policy if isinstance(policy, str) else policy.name
+        results[name] = (float(events.min()) / 2, float(events.max()) / 2, float(events.mean()) / 2)
+    return results
+
+
+def ap_curve(grid, max_action_points, policy='uniform', walks=100000, start=(0, 0), batch_size=50000, seed=None,
+             percentiles=(5, 25, 50, 75, 95)):
+    """
+    一次模拟得到行动值 0..max_action_points 每一档的事件数分布
+    行动值为 B 的队伍与行动值更多的队伍在前 B 点的走法相同，只是最后踩到事件格时可能没有行动值触发，
+    所以只按最大行动值模拟一次，记下每次触发后的累计花费：花费不超过 B 的触发数就是行动值 B 时的事件数
+    返回 {'ap', 'mean', 'min', 'max', 'percentiles': {p: 数组}}，下标为行动值，与 simulate_exploration 同样做 /2 换算
+    """
+    if isinstance(policy, str):
+        policy = POLICIES[policy]
+    rng = np.random.default_rng(seed)
+    budgets = max_action_points + 1
+    # 每个事件至少花 2 点（移动 + 触发），行动值 B 时最多 B // 2 个事件
+    most = max_action_points // 2 + 1
+
+    # histogram[B, e]：行动值 B 时触发 e 个事件的队伍数，各批直接相加
+    histogram = np.zeros(budgets * most, dtype=np.int64)
+    offsets = np.arange(budgets, dtype=np.int32) * most
+    for done in range(0, walks, batch_size):
+        count = min(batch_size, walks - done)
+        triggers = np.zeros((count, budgets), dtype=np.uint8)
+        _run_batch(grid, max_action_points, count, policy, start, rng, triggers)
+        events = np.cumsum(triggers, axis=1, dtype=np.int32)
+        events += offsets
+        histogram += np.bincount(events.ravel(), minlength=budgets * most)
+    histogram = histogram.reshape(budgets, most)
+
+    counts = np.arange(most)
+    cumulative = np.cumsum(histogram, axis=1)
+    seen = histogram > 0
+    return {
+        'ap': np.arange(budgets),
+        'mean': (histogram @ counts) / max(walks, 1) / 2,
+        'min': seen.argmax(axis=1) / 2,
+        'max': (most - 1 - seen[:, ::-1].argmax(axis=1)) / 2,
+        # 第 p 百分位：累计队伍数首次达到 p% 的事件数
+        'percentiles': {p: (cumulative >= p / 100 * walks).argmax(axis=1) / 2 for p in percentiles},
+    }
+
+
+def ap_for_target(curve, target, stat='mean'):
+    """
+    曲线上达到 target 个事件（已 /2 换算）所需的最少行动值；stat 为 'mean'、'min'、'max' 或百分位数
+    行动值上限内达不到时返回 None
+    """
+    values = curve['percentiles'][stat] if not isinstance(stat, str) else curve[stat]
+    reached = np.flatnonzero(values >= target)
+    return int(curve['ap'][reached[0]]) if len(reached) else None
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+聊天气泡批量生成
+与 index.html 相同的表格格式与排版（位置 / 名字 / 文本 / 头像 / 气泡颜色 / 名字字色），
+一次读取多个 CSV / Excel 对话，多进程并行用 Pillow 渲染，每个对话输出一张 PNG
+
+字形宽度按 (字体, 字号, 字符) 缓存，折行时逐字累加，不再对每个前缀重新测量；
+头像按 (地址, 尺寸) 缓存解码并裁成圆形后的结果，同一角色在整批对话中只下载、解码一次
+
+用法：
+    python render_chats.py chapter1.xlsx chapter2.csv
+    python render_chats.py chats/ -o output --width 480 --scale 2 --workers 8
+    python render_chats.py chapter1.xlsx --all-sheets --no-uniform
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NAME_FONT = os.path.join(BASE_DIR, '..', 'Journal-generator', 'assets', 'font', 'fusion-pixel',
+                         'fusion-pixel-10px-monospaced-zh_hans.ttf.woff')
+# 网页中正文字体 ZhangHaiShanRX 指向本机的微软雅黑 / 黑体，这里按顺序查找，找不到时用像素字体
+TEXT_FONT_CANDIDATES = [
+    'C:/Windows/Fonts/msyh.ttc',
+    'C:/Windows/Fonts/simhei.ttf',
+    '/System/Library/Fonts/PingFang.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+]
+
+CONFIG = {
+    'MARGIN': 20,
+    'BUBBLE_MARGIN': 15,
+    'AVATAR_SIZE': 50,
+    'BUBBLE_PADDING': 15,
+    'LINE_SPACING': 8,
+    'MESSAGE_SPACING': 20,
+    'FONT_SIZE': 16,
+    'NAME_FONT_SIZE': 14,
+    'NAME_GAP': 6,
+    'DEFAULT_AVATAR_COLOR': '#CCCCCC',
+    'DEFAULT_LEFT_COLOR': '#FFFFFF',
+    'DEFAULT_RIGHT_COLOR': '#95EC69',
+}
+
+
+def find_text_font():
+    for path in TEXT_FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return NAME_FONT
+
+
+# ===== 缓存 =====
+
+@lru_cache(maxsize=None)
+def load_font(path, size):
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=65536)
+def glyph_width(path, size, char):
+    """单个字符的宽度，按字体和字号缓存"""
+    return load_font(path, size).getlength(char)
+
+
+def text_width(path, size, text):
+    return sum(glyph_width(path, size, char) for char in text)
+
+
+@lru_cache(maxsize=256)
+def load_avatar(source, size):
+    """
+    读取头像（网络地址或本地路径）并裁成 size x size 的圆形
+    读取失败返回 None（同样被缓存，不会对同一个坏地址反复请求）
+    """
+    try:
+        if source.startswith(('http://', 'https://')):
+            request = urllib.request.Request(source, headers={'User-Agent': 'Mozilla/5.0'})
+            with urllib.request.urlopen(request, timeout=15) as response:
+                image = Image.open(io.BytesIO(response.read()))
+        else:
+            image = Image.open(source)
+        image = image.convert('RGBA').resize((size, size), Image.LANCZOS)
+    except Exception as e:
+        print(f"⚠️ 头像加载失败 {source}: {e}")
+        return None
+
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size - 1, size - 1), fill=255)
+    image.putalpha(Image.composite(image.getchannel('A'), mask, mask))
+    return image
+
+
+# ===== 数据读取 =====
+
+def _is_header(row):
+    return str(row[0]).strip().lower() in ('位置', 'position')
+
+
+def read_conversations(path, all_sheets=False):
+    """读取表格，返回 [(对话名, 行列表)]；Excel 默认只读第一个工作表"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if path.lower().endswith('.csv'):
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            return [(stem, list(csv.reader(f)))]
+
+    sheets = pd.read_excel(path, header=None, dtype=object, sheet_name=None if all_sheets else 0)
+    if not all_sheets:
+        sheets = {None: sheets}
+    conversations = []
+    for sheet_name, df in sheets.items():
+        rows = [[None if pd.isna(v) else v for v in row] for row in df.itertuples(index=False)]
+        conversations.append((stem if sheet_name is None else f'{stem}-{sheet_name}', rows))
+    return conversations
+
+
+def parse_messages(rows, base_dir='.'):
+    """与 generateChatImage 相同：跳过缺位置/名字/文本的行，每个名字的头像和颜色以首次出现为准"""
+    messages, user_config = [], {}
+    for i, row in enumerate(rows):
+        row = list(row) + [None] * (6 - len(row))
+        if not row[0] or not row[1] or row[2] is None or (i == 0 and _is_header(row)):
+            continue
+
+        position = str(row[0]).strip().lower()
+        name = str(row[1]).strip()
+        text = str(row[2]).replace('\r\n', '\n').replace('\r', '\n').strip()
+        while text.endswith('\n'):
+            text = text[:-1].strip()
+
+        avatar = str(row[3]).strip() if row[3] else None
+        if avatar and not avatar.startswith(('http://', 'https://')):
+            avatar = os.path.normpath(os.path.join(base_dir, avatar))
+        if name not in user_config:
+            user_config[name] = {
+                'avatar': avatar,
+                'color': str(row[4]).strip() if row[4] else None,
+                'name_color': str(row[5]).strip() if row[5] else None,
+            }
+        messages.append({'position': position, 'name': name, 'text': text})
+    return messages, user_config
+
+
+# ===== 排版与渲染 =====
+
+def wrap_text(text, font_path, size, max_width):
+    """按字符折行，跳过空段落；宽度逐字累加"""
+    lines = []
+    for paragraph in text.split('\n'):
+        if not paragraph.strip():
+            continue
+        current, width = '', 0.0
+        for char in paragraph:
+            char_width = glyph_width(font_path, size, char)
+            if width + char_width <= max_width:
+                current += char
+                width += char_width
+            else:
+                if current:
+                    lines.append(current)
+                current, width = char, char_width
+        if current:
+            lines.append(current)
+    return lines or ['']
+
+
+def render_conversation(messages, user_config, max_bubble_width=400, uniform=True, scale=1, text_font=None):
+    """按 index.html 的布局画出整段对话，返回透明背景的 RGBA 图像"""
+    c = {key: value * scale if isinstance(value, (int, float)) else value for key, value in CONFIG.items()}
+    max_bubble_width *= scale
+    text_font = text_font or find_text_font()
+    padding = c['BUBBLE_PADDING']
+
+    layouts = []
+    for msg in messages:
+        name_width = text_width(NAME_FONT, c['NAME_FONT_SIZE'], msg['name'])
+        lines = wrap_text(msg['text'], text_font, c['FONT_SIZE'], max_bubble_width - padding * 2)
+        max_line_width = max([1] + [text_width(text_font, c['FONT_SIZE'], line) for line in lines])
+        natural = min(max(name_width, max_line_width) + padding * 2, max_bubble_width)
+        layouts.append({'lines': lines, 'width': natural})
+
+    if uniform and layouts:
+        uniform_width = max(layout['width'] for layout in layouts)
+        for layout, msg in zip(layouts, messages):
+            # 宽度变大后按新宽度重新折行
+            layout['width'] = uniform_width
+            layout['lines'] = wrap_text(msg['text'], text_font, c['FONT_SIZE'], uniform_width - padding * 2)
+
+    total_height = c['MARGIN']
+    for layout in layouts:
+        count = len(layout['lines'])
+        layout['text_height'] = count * c['FONT_SIZE'] + max(0, count - 1) * c['LINE_SPACING']
+        layout['height'] = padding * 2 + c['NAME_FONT_SIZE'] + c['NAME_GAP'] + layout['text_height']
+        total_height += layout['height'] + c['MESSAGE_SPACING']
+    total_height += c['MARGIN']
+
+    used_width = max([layout['width'] for layout in layouts] + [0])
+    canvas_width = used_width + c['MARGIN'] * 2 + c['AVATAR_SIZE'] + c['BUBBLE_MARGIN'] + 20 * scale
+
+    image = Image.new('RGBA', (round(canvas_width), round(total_height)), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    name_font = load_font(NAME_FONT, c['NAME_FONT_SIZE'])
+    body_font = load_font(text_font, c['FONT_SIZE'])
+    avatar_size = c['AVATAR_SIZE']
+
+    y = c['MARGIN']
+    for msg, layout in zip(messages, layouts):
+        config = user_config.get(msg['name'], {})
+        is_left = msg['position'] == 'left'
+
+        avatar_x = c['MARGIN'] if is_left else canvas_width - c['MARGIN'] - avatar_size
+        avatar = load_avatar(config['avatar'], round(avatar_size)) if config.get('avatar') else None
+        if avatar is not None:
+            image.alpha_composite(avatar, (round(avatar_x), round(y)))
+        else:
+            draw.ellipse((avatar_x, y, avatar_x + avatar_size, y + avatar_size), fill=c['DEFAULT_AVATAR_COLOR'])
+
+        bubble_width, bubble_height = layout['width'], layout['height']
+        bubble_x = (c['MARGIN'] + avatar_size + c['BUBBLE_MARGIN'] if is_left
+                    else canvas_width - c['MARGIN'] - avatar_size - c['BUBBLE_MARGIN'] - bubble_width)
+        background = config.get('color') or (c['DEFAULT_LEFT_COLOR'] if is_left else c['DEFAULT_RIGHT_COLOR'])
+        try:
+            draw.rounded_rectangle((bubble_x, y, bubble_x + bubble_width, y + bubble_height), radius=10 * scale,
+                                   fill=background, outline='#DDDDDD', width=max(1, round(scale)))
+        except ValueError:  # 颜色写错时用默认颜色
+            draw.rounded_rectangle((bubble_x, y, bubble_x + bubble_width, y + bubble_height), radius=10 * scale,
+                                   fill=c['DEFAULT_LEFT_COLOR'] if is_left else c['DEFAULT_RIGHT_COLOR'],
+                                   outline='#DDDDDD', width=max(1, round(scale)))
+
+        content_height = (c['FONT_SIZE'] + c['LINE_SPACING'] + c['NAME_FONT_SIZE'] + c['NAME_GAP']
+                          + layout['text_height'])
+        content_top = y + (bubble_height - content_height) / 2
+        name_y = content_top + c['FONT_SIZE'] + c['LINE_SPACING']
+        try:
+            draw.text((bubble_x + padding, name_y), msg['name'], font=name_font,
+                      fill=config.get('name_color') or '#888888', anchor='la')
+        except ValueError:
+            draw.text((bubble_x + padding, name_y), msg['name'], font=name_font, fill='#888888', anchor='la')
+
+        text_y = name_y + c['NAME_FONT_SIZE'] + c['NAME_GAP']
+        for line in layout['lines']:
+            draw.text((bubble_x + padding, text_y), line, font=body_font, fill='#000000', anchor='la')
+            text_y += c['FONT_SIZE'] + c['LINE_SPACING']
+
+        y += bubble_height + c['MESSAGE_SPACING']
+
+    return image
+
+
+# ===== 批量 =====
+
+def _render_file(path, output_dir, options):
+    """渲染一个文件中的对话，返回 [(输出路径, 消息数)]"""
+    results = []
+    for name, rows in read_conversations(path, options['all_sheets']):
+        messages, user_config = parse_messages(rows, os.path.dirname(os.path.abspath(path)))
+        if not messages:
+            print(f"⚠️ {name} 没有可用的消息，已跳过")
+            continue
+        image = render_conversation(messages, user_config, options['width'], options['uniform'],
+                                    options['scale'], options['text_font'])
+        output = os.path.join(output_dir, f'{name}.png')
+        image.save(output, 'PNG')
+        results.append((output, len(messages)))
+    return results
+
+
+def collect_inputs(paths):
+    """展开目录，收集其中的 CSV / Excel 文件"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path))
+                         if f.lower().endswith(('.csv', '.xlsx', '.xls')) and not f.startswith('~$'))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量生成聊天气泡图片')
+    parser.add_argument('inputs', nargs='+', help='CSV / Excel 文件或包含它们的目录')
+    parser.add_argument('-o', '--output-dir', default='output', help='输出目录')
+    parser.add_argument('--width', type=int, default=400, help='气泡最大宽度（200~600）')
+    parser.add_argument('--no-uniform', action='store_true', help='不统一气泡宽度')
+    parser.add_argument('--scale', type=float, default=1, help='输出倍率（2 为高清）')
+    parser.add_argument('--all-sheets', action='store_true', help='Excel 的每个工作表各生成一张图')
+    parser.add_argument('--text-font', help='正文字体文件（默认查找微软雅黑/黑体等）')
+    parser.add_argument('--workers', type=int, help='并行进程数（默认为 CPU 核数）')
+    args = parser.parse_args()
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("❌ 没有找到 CSV / Excel 文件")
+        return 1
+
+    text_font = args.text_font or find_text_font()
+    if text_font == NAME_FONT:
+        print("⚠️ 没有找到正文字体，改用像素字体（可用 --text-font 指定）")
+    os.makedirs(args.output_dir, exist_ok=True)
+    options = {
+        'width': min(max(args.width, 200), 600),
+        'uniform': not args.no_uniform,
+        'scale': args.scale,
+        'all_sheets': args.all_sheets,
+        'text_font': text_font,
+    }
+
+    start = time.perf_counter()
+    images = failed = 0
+    workers = min(args.workers or os.cpu_count() or 1, len(files))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_render_file, path, args.output_dir, options): path for path in files}
+        for future in as_completed(futures):
+            try:
+                for output, count in future.result():
+                    images += 1
+                    print(f"✅ {output}（{count} 条消息）")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {futures[future]} 生成失败: {e}")
+
+    print(f"🎉 共生成 {images} 张图片，失败 {failed} 个文件，用时 {time.perf_counter() - start:.1f} 秒")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
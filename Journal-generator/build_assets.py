@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+探索日志素材预处理
+把 assets/img 中的大图缩放到页面实际使用的尺寸（按导出倍率），转为 WebP 或调色板 PNG；
+6 个任务图标合成一张雪碧图；按数据中实际出现的字符裁剪 fusion-pixel 字体为 WOFF2
+
+生成到 assets/dist/（文件名带内容指纹）：
+    manifest.json   script.js / render_pages.py 读取的素材清单
+    assets.css      覆盖 style.css 中的背景图、图标与字体，index.html 在 style.css 之后引入
+
+用法：
+    python build_assets.py
+    python build_assets.py --data events.xlsx --data "https://docs.google.com/spreadsheets/d/..."
+    python build_assets.py --format png --scale 1
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+
+from PIL import Image
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:  # 未安装 fonttools 时不裁剪字体，页面继续使用完整字体
+    font_subset = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMG_DIR = os.path.join(BASE_DIR, 'assets', 'img')
+DIST_DIR = os.path.join(BASE_DIR, 'assets', 'dist')
+FONT_PATH = os.path.join(BASE_DIR, 'assets', 'font', 'fusion-pixel', 'fusion-pixel-10px-monospaced-zh_hans.ttf.woff')
+
+# style.css 中的显示尺寸（CSS 像素），高度为 None 时按比例
+LAYOUT_SIZES = {
+    'bkgd.png': (1230, 1729),
+    'event-box.png': (826, 455),
+    'event-cover.png': (826, 455),
+    'stamp-S.png': (200, None),
+    'stamp-A.png': (200, None),
+    'stamp-B.png': (200, None),
+    'stamp-C.png': (200, None),
+}
+# 哪些 CSS 规则使用哪张背景图
+CSS_BACKGROUNDS = {
+    'bkgd.png': '.page',
+    'event-box.png': '.event-content',
+    'event-cover.png': '.event-mask',
+}
+TASK_ICONS = ['nature', 'engineering', 'physical', 'diplomacy', 'special', 'wildcard']
+ICON_SIZE = 36
+
+# 页面上固定出现的文字（编号、页码、物资、NEW! 等）
+FIXED_TEXT = ''.join(chr(c) for c in range(0x20, 0x7F)) + '获得物资:：?？-'
+
+
+def fingerprint(content: bytes, length: int = 8) -> str:
+    return hashlib.sha256(content).hexdigest()[:length]
+
+
+def target_size(source_size, layout_size, scale):
+    """布局尺寸乘以导出倍率，但不超过原图（不放大）"""
+    width, height = layout_size
+    if height is None:
+        height = source_size[1] * width / source_size[0]
+    factor = min(scale, source_size[0] / width, source_size[1] / height)
+    return max(1, round(width * factor)), max(1, round(height * factor))
+
+
+def encode(image, fmt, quality):
+    """WebP（有损与无损中较小的一个，细密条纹等图案无损反而更小）或 256 色调色板 PNG"""
+    if fmt == 'webp':
+        candidates = []
+        for options in ({'quality': quality}, {'lossless': True}):
+            buffer = io.BytesIO()
+            image.save(buffer, 'WEBP', method=6, **options)
+            candidates.append(buffer.getvalue())
+        return min(candidates, key=len)
+    buffer = io.BytesIO()
+    image.quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def write_asset(name, content, fmt):
+    """按内容指纹命名写入 dist，返回文件名"""
+    stem = os.path.splitext(name)[0]
+    filename = f'{stem}.{fingerprint(content)}.{fmt}'
+    with open(os.path.join(DIST_DIR, filename), 'wb') as f:
+        f.write(content)
+    return filename
+
+
+def build_images(fmt, scale, quality, report):
+    images = {}
+    for name, layout_size in LAYOUT_SIZES.items():
+        path = os.path.join(IMG_DIR, name)
+        with Image.open(path) as source:
+            size = target_size(source.size, layout_size, scale)
+            image = source.convert('RGBA')
+            if size != image.size:
+                image = image.resize(size, Image.LANCZOS)
+        content = encode(image, fmt, quality)
+        filename = write_asset(name, content, fmt)
+        images[name] = {'file': filename, 'size': list(size)}
+        report.append((name, os.path.getsize(path), filename, len(content)))
+    return images
+
+
+def build_sprite(fmt, scale, quality, report):
+    """任务图标横向拼成一张图，每格 ICON_SIZE * scale"""
+    cell = round(ICON_SIZE * scale)
+    sprite = Image.new('RGBA', (cell * len(TASK_ICONS), cell), (0, 0, 0, 0))
+    source_bytes = 0
+    for i, icon in enumerate(TASK_ICONS):
+        path = os.path.join(IMG_DIR, f'task-{icon}.png')
+        source_bytes += os.path.getsize(path)
+        with Image.open(path) as image:
+            sprite.alpha_composite(image.convert('RGBA').resize((cell, cell), Image.LANCZOS), (i * cell, 0))
+    content = encode(sprite, fmt, quality)
+    filename = write_asset('task-icons', content, fmt)
+    report.append(('task-*.png', source_bytes, filename, len(content)))
+    return {'file': filename, 'icons': {icon: i for i, icon in enumerate(TASK_ICONS)}}
+
+
+def collect_text(sources):
+    """数据中出现的全部字符（编号、坐标、区域、描述、物资等）"""
+    from render_pages import load_rows, expand_rows
+
+    chars = set(FIXED_TEXT)
+    for source in sources:
+        rows, identifier = load_rows(source)
+        chars.update(identifier)
+        for row in expand_rows(rows):
+            for value in row.values():
+                chars.update(value)
+        print(f"🔤 {source}: {len(rows)} 行")
+    return {c for c in chars if c.isprintable() or c == ' '}
+
+
+def unicode_ranges(chars):
+    """码位集合压缩为 CSS unicode-range，如 U+20-7E, U+4E00"""
+    codes = sorted(ord(c) for c in chars)
+    ranges = []
+    for code in codes:
+        if ranges and code == ranges[-1][1] + 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return ', '.join(f'U+{lo:X}' if lo == hi else f'U+{lo:X}-{hi:X}' for lo, hi in ranges)
+
+
+def build_font(chars, report):
+    """裁剪字体为 WOFF2，只保留 chars 中的字形；缺少 fonttools/brotli 时跳过"""
+    if font_subset is None:
+        print("⚠️ 未安装 fonttools，跳过字体裁剪（pip install fonttools brotli）")
+        return None
+
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    try:
+        font = font_subset.load_font(FONT_PATH, options)
+        subsetter = font_subset.Subsetter(options)
+        subsetter.populate(text=''.join(sorted(chars)))
+        subsetter.subset(font)
+        buffer = io.BytesIO()
+        font_subset.save_font(font, buffer, options)
+    except ImportError:  # WOFF2 需要 brotli
+        print("⚠️ 未安装 brotli，无法生成 WOFF2，跳过字体裁剪")
+        return None
+
+    content = buffer.getvalue()
+    filename = write_asset('fusion-pixel', content, 'woff2')
+    report.append((os.path.basename(FONT_PATH), os.path.getsize(FONT_PATH), filename, len(content)))
+    return {'file': filename, 'unicode_range': unicode_ranges(chars), 'glyphs': len(chars)}
+
+
+def write_css(manifest):
+    """覆盖 style.css 中的素材路径；字体只在 unicode-range 内替换，其余字符仍用完整字体"""
+    lines = ['/* 由 build_assets.py 生成，请勿手动修改 */']
+    font = manifest.get('font')
+    if font:
+        lines.append("@font-face {\n  font-family: 'FusionPixel';\n"
+                     f"  src: url('{font['file']}') format('woff2');\n"
+                     f"  unicode-range: {font['unicode_range']};\n}}")
+
+    for name, selector in CSS_BACKGROUNDS.items():
+        lines.append(f"{selector} {{ background-image: url('{manifest['images'][name]['file']}'); }}")
+
+    sprite = manifest['sprite']
+    count = len(sprite['icons'])
+    lines.append(f".task-icon {{\n  background-image: url('{sprite['file']}');\n"
+                 f"  background-size: {ICON_SIZE * count}px {ICON_SIZE}px;\n  background-repeat: no-repeat;\n}}")
+    for icon, index in sprite['icons'].items():
+        lines.append(f'.task-{icon} {{ background-position: {-ICON_SIZE * index}px 0; }}')
+
+    with open(os.path.join(DIST_DIR, 'assets.css'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def print_report(report):
+    def fmt(size):
+        return f'{size / 1024:.1f} KB'
+
+    print()
+    for name, before, output, after in report:
+        print(f"  {name:<18}{fmt(before):>10}  →  {fmt(after):>10}  {output}")
+    total_before = sum(r[1] for r in report)
+    total_after = sum(r[3] for r in report)
+    print(f"  {'合计':<16}{fmt(total_before):>10}  →  {fmt(total_after):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预处理探索日志素材')
+    parser.add_argument('--data', action='append', default=[], help='事件表（CSV / Excel / Google Sheets，可多次指定），用于确定字体需要的字符')
+    parser.add_argument('--format', choices=['webp', 'png'], default='webp', help='图片格式：WebP 或 256 色调色板 PNG')
+    parser.add_argument('--scale', type=float, default=2, help='相对布局尺寸的倍率（导出为 scale 2）')
+    parser.add_argument('--quality', type=int, default=90, help='WebP 质量')
+    args = parser.parse_args()
+
+    # dist 目录完全由本脚本生成，先清空旧的指纹文件
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    report = []
+    manifest = {
+        'format': args.format,
+        'scale': args.scale,
+        'images': build_images(args.format, args.scale, args.quality, report),
+        'sprite': build_sprite(args.format, args.scale, args.quality, report),
+    }
+
+    if args.data:
+        try:
+            chars = collect_text(args.data)
+        except Exception as e:
+            print(f"❌ 读取数据失败: {e}")
+            return 1
+    else:
+        chars = set(FIXED_TEXT)
+        print("⚠️ 未指定 --data，字体只保留固定文字，其余字符由完整字体补齐")
+    manifest['font'] = build_font(chars, report)
+
+    with open(os.path.join(DIST_DIR, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    write_css(manifest)
+
+    print_report(report)
+    print(f"\n✅ 已生成到 {os.path.relpath(DIST_DIR)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+探索日志批量渲染
+读取与网页版相同的表格（CSV / Excel / Google Sheets，按列字母 A~L 取值），
+用 Pillow 按 style.css 的排版把每页合成为 PNG，多进程并行渲染后写入一个 zip
+
+用法：
+    python render_pages.py events.xlsx
+    python render_pages.py events.csv --encoding gbk --identifier CH01-#01 --start-page 2
+    python render_pages.py "https://docs.google.com/spreadsheets/d/.../edit#gid=0" -o ch01.zip --workers 8
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+import urllib.request
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMG_DIR = os.path.join(BASE_DIR, 'assets', 'img')
+DIST_DIR = os.path.join(BASE_DIR, 'assets', 'dist')
+PIXEL_FONT = os.path.join(BASE_DIR, 'assets', 'font', 'fusion-pixel', 'fusion-pixel-10px-monospaced-zh_hans.ttf.woff')
+DESCRIPTION_FONT = os.path.join(BASE_DIR, 'assets', 'font', 'zhanghaishanrx.ttf')
+
+# 以下尺寸均为网页中的 CSS 像素，渲染时乘以 scale（网页导出为 scale 2）
+PAGE_SIZE = (1230, 1729)
+BOX_SIZE = (826, 455)
+BOX_POSITIONS = [(332, 275), (332, 741), (332, 1207)]
+ITEMS_PER_PAGE = 3
+
+# 图标类型映射表（与 script.js 相同）
+ICON_MAPPING = {
+    '自然': 'nature',
+    '工程': 'engineering',
+    '体能': 'physical',
+    '社交': 'diplomacy',
+    '特殊': 'special',
+    '任意': 'wildcard',
+}
+VALID_GRADES = ['S', 'A', 'B', 'C']
+
+WHITE = (255, 255, 255, 255)
+DESCRIPTION_COLOR = (87, 118, 5, 255)
+PAGE_NUMBER_COLOR = (13, 10, 9, round(255 * 0.3))
+
+
+def is_completed(row):
+    return row.get('I', '') in ('是', 'true', '完成', '1')
+
+
+def has_follow_up(row):
+    return row.get('G', '') in ('是', 'true', '1')
+
+
+# ===== 数据读取 =====
+
+def _column_letters(df):
+    """只按列位置取值，列名改为 A, B, C, D..."""
+    df = df.fillna('').astype(str)
+    df.columns = [chr(65 + i) for i in range(len(df.columns))]
+    return [{k: v.strip() for k, v in row.items()}
+            for row in df.to_dict('records') if any(v.strip() for v in row.values())]
+
+
+def sheets_csv_url(url):
+    """Google Sheets 链接转 CSV 导出地址：优先 ?sheet=表名，否则用 #gid=（默认 0）"""
+    match = re.search(r'https://docs\.google\.com/spreadsheets/d/([a-zA-Z0-9-_]+)', url)
+    if not match:
+        raise ValueError('不是有效的 Google Sheets 链接（需要 docs.google.com/spreadsheets/d/...）')
+    sheet_id = match.group(1)
+    sheet_name = re.search(r'[?&]sheet=([^&#]+)', url, re.I)
+    if sheet_name:
+        name = urllib.parse.quote(urllib.parse.unquote(sheet_name.group(1)))
+        return f'https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={name}'
+    gid = re.search(r'[#?&]gid=(\d+)', url)
+    return f'https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid.group(1) if gid else "0"}'
+
+
+def load_rows(source, encoding='utf-8'):
+    """
+    读取事件表，返回 (行列表, A1 中的编号)
+    与网页版一致：CSV / Google Sheets 跳过首行表头；Excel 的 A1 为编号，其后为数据
+    """
+    if source.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(sheets_csv_url(source), timeout=30) as response:
+            text = response.read().decode('utf-8')
+        if re.search(r'<!doctype html>|<html', text, re.I):
+            raise ValueError('返回的不是 CSV 内容，可能权限未公开，或链接不是 docs.google.com/spreadsheets')
+        df = pd.read_csv(io.StringIO(text), header=None, dtype=str, keep_default_na=False)
+        return _column_letters(df.iloc[1:]), ''
+
+    if source.lower().endswith('.csv'):
+        encoding = 'utf-8-sig' if encoding == 'utf-8' else encoding
+        df = pd.read_csv(source, header=None, dtype=str, keep_default_na=False, encoding=encoding)
+        return _column_letters(df.iloc[1:]), ''
+
+    df = pd.read_excel(source, header=None, dtype=str)
+    if df.empty:
+        return [], ''
+    identifier = df.iat[0, 0]
+    identifier = identifier.strip() if isinstance(identifier, str) else ''
+    return _column_letters(df.iloc[1:]), identifier
+
+
+def expand_rows(rows):
+    """已完成（I列）且有后续（G列）的事件后插入后续剧情（H列），与 generateLayout 相同"""
+    expanded = []
+    for row in rows:
+        expanded.append(row)
+        if is_completed(row) and has_follow_up(row) and row.get('H'):
+            expanded.append({
+                'A': row.get('A', ''), 'B': row.get('B', ''), 'C': row.get('C', ''),
+                'D': row['H'],       # 后续剧情内容来自H列
+                'E': row.get('E', ''),
+                'F': '-',            # 物资为 "-" 表示后续剧情
+                'G': '否', 'H': '', 'I': '否',
+                'J': row.get('J', ''), 'K': row.get('K', ''), 'L': row.get('L', ''),
+            })
+    return expanded
+
+
+def paginate(rows, identifier, start_page):
+    """每页 3 条，返回 [(编号, 页码, 本页数据)]"""
+    return [(identifier, start_page + i // ITEMS_PER_PAGE, rows[i:i + ITEMS_PER_PAGE])
+            for i in range(0, len(rows), ITEMS_PER_PAGE)]
+
+
+# ===== 渲染 =====
+
+class Assets:
+    """
+    按 scale 预先缩放好的图片与字体，每个进程只加载一次
+    build_assets.py 已生成同尺寸的素材时直接读取，省去解码大图和缩放
+    """
+
+    def __init__(self, scale=2, description_font=None):
+        self.scale = scale
+        self.manifest = {}
+        manifest_path = os.path.join(DIST_DIR, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        self.page_size = self.px(PAGE_SIZE)
+        self.box_size = self.px(BOX_SIZE)
+
+        # 背景不透明，整页用 RGB 合成，事件框按自身透明度贴上去
+        background = Image.new('RGBA', self.page_size, WHITE)
+        background.alpha_composite(self.image('bkgd.png', self.page_size))
+        self.background = background.convert('RGB')
+        self.event_box = self.image('event-box.png', self.box_size)
+
+        # 遮罩 opacity 0.6
+        cover = self.image('event-cover.png', self.box_size)
+        cover.putalpha(cover.getchannel('A').point(lambda a: round(a * 0.6)))
+        self.cover = cover
+
+        self.stamps = {}
+        for grade in VALID_GRADES:
+            with Image.open(os.path.join(IMG_DIR, f'stamp-{grade}.png')) as stamp:
+                width = self.px(200)
+                size = (width, round(stamp.height * width / stamp.width))
+            self.stamps[grade] = self.image(f'stamp-{grade}.png', size)
+
+        self.icons = {}
+        icon_size = self.px((36, 36))
+        sprite = self.manifest.get('sprite')
+        sprite_path = os.path.join(DIST_DIR, sprite['file']) if sprite else None
+        if sprite_path and os.path.exists(sprite_path):
+            # 雪碧图只打开一次；高度与当前缩放的图标尺寸不符时（按其他 scale 构建的）改用原图
+            with Image.open(sprite_path) as sheet:
+                if sheet.height == icon_size[1]:
+                    rgba = sheet.convert('RGBA')
+                    for name, index in sprite['icons'].items():
+                        self.icons[name] = rgba.crop((index * icon_size[0], 0, (index + 1) * icon_size[0], icon_size[1]))
+        if not self.icons:
+            for name in set(ICON_MAPPING.values()):
+                path = os.path.join(IMG_DIR, f'task-{name}.png')
+                if os.path.exists(path):
+                    self.icons[name] = self.image(f'task-{name}.png', icon_size)
+
+        self.pixel_font_path = PIXEL_FONT
+        self.description_font_path = description_font or DESCRIPTION_FONT
+        if not os.path.exists(self.description_font_path):
+            self.description_font_path = PIXEL_FONT
+        self._fonts = {}
+
+    def px(self, value):
+        if isinstance(value, tuple):
+            return tuple(round(v * self.scale) for v in value)
+        return round(value * self.scale)
+
+    def image(self, name, size):
+        variant = self.manifest.get('images', {}).get(name)
+        if variant and tuple(variant['size']) == tuple(size):
+            path = os.path.join(DIST_DIR, variant['file'])
+            if os.path.exists(path):
+                with Image.open(path) as img:
+                    return img.convert('RGBA')
+        with Image.open(os.path.join(IMG_DIR, name)) as img:
+            return img.convert('RGBA').resize(size, Image.LANCZOS)
+
+    def font(self, size, description=False):
+        path = self.description_font_path if description else self.pixel_font_path
+        key = (path, size)
+        if key not in self._fonts:
+            self._fonts[key] = ImageFont.truetype(path, self.px(size))
+        return self._fonts[key]
+
+
+def _baseline(font, top, line_height):
+    """行高 line_height 的行框内文字垂直居中时的基线位置"""
+    ascent, descent = font.getmetrics()
+    return top + (line_height - ascent - descent) / 2 + ascent
+
+
+def _draw_text(layer, text, font, box, color, align='left', line_height=None):
+    """在 box=(left, top, width, height) 内单行绘制文字，垂直居中，按 align 水平对齐"""
+    left, top, width, height = box
+    draw = ImageDraw.Draw(layer)
+    text_width = font.getlength(text)
+    if align == 'right':
+        x = left + width - text_width
+    elif align == 'center':
+        x = left + (width - text_width) / 2
+    else:
+        x = left
+    draw.text((x, _baseline(font, top, line_height or height)), text, font=font, fill=color, anchor='ls')
+
+
+def _wrap(text, font, width):
+    """按字符折行（overflow-wrap: break-word），保留原有换行"""
+    lines = []
+    for paragraph in text.split('\n'):
+        line = ''
+        for char in paragraph:
+            if line and font.getlength(line + char) > width:
+                lines.append(line)
+                line = ''
+            line += char
+        lines.append(line)
+    return lines
+
+
+def render_box(assets, row):
+    """单个事件框（826x455），图层顺序与 style.css 的 z-index 一致"""
+    px = assets.px
+    content = assets.event_box.copy()
+
+    coordinate, area = row.get('B', ''), row.get('C', '')
+    description, event_type, reward = row.get('D', ''), row.get('E', ''), row.get('F', '')
+    completed = is_completed(row)
+    follow_up = reward == '-'
+
+    if event_type:
+        icon = assets.icons.get(ICON_MAPPING.get(event_type, event_type.lower()))
+        if icon is not None:
+            content.alpha_composite(icon, px((65, 55)))
+
+    if follow_up:
+        font = assets.font(26)
+        shadow = Image.new('RGBA', content.size, (0, 0, 0, 0))
+        _draw_text(shadow, 'NEW!', font, px((110 + 2, 59 + 2, 200, 26)), (0, 0, 0, 128), line_height=font.size * 1.2)
+        content.alpha_composite(shadow.filter(ImageFilter.GaussianBlur(px(2))))
+        _draw_text(content, 'NEW!', font, px((110, 59, 200, 26)), WHITE, line_height=font.size * 1.2)
+
+    if coordinate or area:
+        location = f"{coordinate}{' - ' + area if area else ''}"
+        _draw_text(content, location, assets.font(26), px((421, 45, 330, 53)), WHITE, align='right')
+
+    if description:
+        # 描述区 650x200，行高 1.4，超出部分裁掉
+        font = assets.font(24, description=True)
+        line_height = font.size * 1.4
+        clip = Image.new('RGBA', px((650, 200)), (0, 0, 0, 0))
+        for i, line in enumerate(_wrap(description, font, clip.width)):
+            top = i * line_height
+            if top >= clip.height:
+                break
+            _draw_text(clip, line, font, (0, top, clip.width, line_height), DESCRIPTION_COLOR)
+        content.alpha_composite(clip, px((86, 120)))
+
+    if completed:
+        content.alpha_composite(assets.cover)
+
+    if not follow_up:
+        text = f'获得物资:{reward}' if completed else '获得物资:?'
+        _draw_text(content, text, assets.font(24), px((450, 325, 260, 55)), WHITE, align='right')
+
+    grade = row.get('L', '').upper()
+    if completed and grade in assets.stamps:
+        stamp = assets.stamps[grade]
+        center_x, center_y = content.width * 0.5, content.height * 0.48
+        content.alpha_composite(stamp, (round(center_x - stamp.width / 2), round(center_y - stamp.height / 2)))
+
+    return content
+
+
+def _empty_box(assets):
+    """没有数据的 .box：半透明底色 + 白色虚线边框"""
+    box = Image.new('RGBA', assets.box_size, (255, 255, 255, round(255 * 0.05)))
+    draw = ImageDraw.Draw(box)
+    width, height = box.size
+    dash, color, line = assets.px(4), (255, 255, 255, round(255 * 0.2)), max(1, assets.px(1))
+    for x in range(0, width, dash * 2):
+        draw.rectangle((x, 0, x + dash - 1, line - 1), fill=color)
+        draw.rectangle((x, height - line, x + dash - 1, height - 1), fill=color)
+    for y in range(0, height, dash * 2):
+        draw.rectangle((0, y, line - 1, y + dash - 1), fill=color)
+        draw.rectangle((width - line, y, width - 1, y + dash - 1), fill=color)
+    return box
+
+
+def render_page(assets, identifier, page_number, rows):
+    """合成一整页，返回 RGB 图像"""
+    px = assets.px
+    page = assets.background.copy()
+
+    _draw_text(page, identifier, assets.font(48), px((100, 0, 328, 80)), WHITE, align='center')
+
+    for i, position in enumerate(BOX_POSITIONS):
+        box = render_box(assets, rows[i]) if i < len(rows) else _empty_box(assets)
+        page.paste(box, px(position), box)
+
+    # 半透明页码先画在透明图层上再贴
+    number = Image.new('RGBA', px((150, 120)), (0, 0, 0, 0))
+    _draw_text(number, str(page_number).zfill(2), assets.font(120), (0, 0) + number.size,
+               PAGE_NUMBER_COLOR, align='center')
+    page.paste(number, px((65, 1565)), number)
+    return page
+
+
+# ===== 并行与打包 =====
+
+_worker_assets = None
+_worker_options = {}
+
+
+def _init_worker(scale, description_font, compress_level):
+    global _worker_assets
+    _worker_assets = Assets(scale, description_font)
+    _worker_options['compress_level'] = compress_level
+
+
+def _render_job(job):
+    identifier, page_number, rows = job
+    image = render_page(_worker_assets, identifier, page_number, rows)
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', compress_level=_worker_options['compress_level'])
+    return f'{identifier}-{str(page_number).zfill(2)}.png', buffer.getvalue()
+
+
+def render_zip(jobs, output, workers=None, scale=2, description_font=None, compress_level=6):
+    """并行渲染全部页面，按页码顺序写入 zip（PNG 已压缩，zip 内不再压缩）"""
+    workers = workers or os.cpu_count() or 1
+    init_args = (scale, description_font, compress_level)
+
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+        if workers == 1:
+            _init_worker(*init_args)
+            results = map(_render_job, jobs)
+            for done, (name, data) in enumerate(results, 1):
+                archive.writestr(name, data)
+                print(f"\r🖼️ 渲染 {done}/{len(jobs)}", end='', flush=True)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                chunksize = max(1, len(jobs) // (workers * 4))
+                for done, (name, data) in enumerate(pool.map(_render_job, jobs, chunksize=chunksize), 1):
+                    archive.writestr(name, data)
+                    print(f"\r🖼️ 渲染 {done}/{len(jobs)}", end='', flush=True)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量渲染探索日志页面并打包为 zip')
+    parser.add_argument('source', help='CSV / Excel 文件或 Google Sheets 链接')
+    parser.add_argument('-o', '--output', help='输出 zip 文件（默认 <编号>.zip）')
+    parser.add_argument('--identifier', help='编号（默认取 Excel 的 A1，否则为 PROLOGUE）')
+    parser.add_argument('--start-page', type=int, default=2, help='起始页码')
+    parser.add_argument('--encoding', default='utf-8', choices=['utf-8', 'gbk', 'big5'], help='CSV 编码')
+    parser.add_argument('--scale', type=float, default=2, help='导出清晰度（与网页导出的 scale 相同）')
+    parser.add_argument('--workers', type=int, help='渲染进程数（默认为 CPU 核数）')
+    parser.add_argument('--compress-level', type=int, default=6, choices=range(10), metavar='0-9',
+                        help='PNG 压缩级别，越低越快、文件越大')
+    parser.add_argument('--description-font', help='事件描述字体（默认 assets/font/zhanghaishanrx.ttf）')
+    args = parser.parse_args()
+
+    try:
+        rows, identifier_from_a1 = load_rows(args.source, args.encoding)
+    except Exception as e:
+        print(f"❌ 读取数据失败: {e}")
+        return 1
+    if not rows:
+        print("❌ 没有可用的数据")
+        return 1
+
+    identifier = args.identifier or identifier_from_a1 or 'PROLOGUE'
+    jobs = paginate(expand_rows(rows), identifier, args.start_page)
+    output = args.output or re.sub(r'[\\/:*?"<>|]', '_', identifier) + '.zip'
+
+    description_font = args.description_font or DESCRIPTION_FONT
+    if not os.path.exists(description_font):
+        print(f"⚠️ 找不到描述字体 {description_font}，改用像素字体")
+
+    print(f"📄 {len(rows)} 条事件，共 {len(jobs)} 页（编号 {identifier}，从第 {args.start_page} 页开始）")
+    start = time.perf_counter()
+    render_zip(jobs, output, args.workers, args.scale, args.description_font, args.compress_level)
+    elapsed = time.perf_counter() - start
+    print(f"✅ 已导出 {output}，用时 {elapsed:.1f} 秒（{len(jobs) / elapsed * 60:.0f} 页/分钟）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
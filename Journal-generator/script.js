@@ -84,6 +84,7 @@ class LayoutGenerator {
     this.startPageNumber = 2;
     this.identifier = 'DP-01';
     this.isGenerated = false;
+    this.assetManifest = null;
     this.init();
   }
 
@@ -91,6 +92,22 @@ class LayoutGenerator {
     this.setupDataImport();
     this.setupExport();
     this.setupSettings();
+    this.loadAssetManifest();
+  }
+
+  // 读取 build_assets.py 生成的素材清单（缩放后的印章、图标雪碧图）；未生成时使用原图
+  async loadAssetManifest() {
+    try {
+      const res = await fetch('./assets/dist/manifest.json');
+      if (res.ok) this.assetManifest = await res.json();
+    } catch (e) {
+      this.assetManifest = null;
+    }
+  }
+
+  assetUrl(name) {
+    const image = this.assetManifest?.images?.[name];
+    return image ? `./assets/dist/${image.file}` : `./assets/img/${name}`;
   }
 
   setupDataImport() {
@@ -588,18 +605,25 @@ class LayoutGenerator {
 
     // 图标:使用CSS样式类
     if (eventType) {
-      const icon = document.createElement('img');
-      icon.className = 'event-icon';
-
       const mappedIconType = iconMapping[eventType] || eventType.toLowerCase();
-      icon.src = `./assets/img/task-${mappedIconType}.png`;
 
-      icon.onerror = () => {
-        console.warn(`图标文件不存在: task-${mappedIconType}.png`);
-        icon.style.display = 'none';
-      };
+      if (this.assetManifest?.sprite?.icons?.[mappedIconType] !== undefined) {
+        // 雪碧图:背景位置见 assets/dist/assets.css
+        const icon = document.createElement('div');
+        icon.className = `event-icon task-icon task-${mappedIconType}`;
+        content.appendChild(icon);
+      } else {
+        const icon = document.createElement('img');
+        icon.className = 'event-icon';
+        icon.src = `./assets/img/task-${mappedIconType}.png`;
 
-      content.appendChild(icon);
+        icon.onerror = () => {
+          console.warn(`图标文件不存在: task-${mappedIconType}.png`);
+          icon.style.display = 'none';
+        };
+
+        content.appendChild(icon);
+      }
     }
 
     // 如果是后续剧情,在图标后面添加 NEW! 标识
@@ -645,7 +669,7 @@ class LayoutGenerator {
       const validGrades = ['S', 'A', 'B', 'C'];
       if (validGrades.includes(grade)) {
         const stamp = document.createElement('img');
-        stamp.src = `./assets/img/stamp-${grade}.png`;
+        stamp.src = this.assetUrl(`stamp-${grade}.png`);
         stamp.className = 'event-stamp';
         content.appendChild(stamp);
       }
@@ -1,14 +1,28 @@
-from flask import Flask, render_template, request, jsonify
+import talent_path  # 共享索引库 talent_index，需在其他模块之前导入
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from data_handler import DataHandler
 from search_engine import SearchEngine
+from change_feed import ChangeFeed, change_key
 from config import Config
+import metrics
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# 初始化数据处理器和搜索引擎
-data_handler = DataHandler()
+# 初始化数据处理器和搜索引擎；数据在后台线程加载，服务立即开始监听，加载完成前 /ready 返回 503
+data_handler = DataHandler(autoload=False)
 search_engine = SearchEngine(data_handler)
+# 每次重新加载的增量推送给 /changes 的订阅者
+change_feed = ChangeFeed()
+data_handler.subscribe(change_feed.publish)
+data_handler.load_async(on_loaded=search_engine.warm)
+
+
+@app.before_request
+def refresh_snapshot():
+    """其他 worker 重新加载后，本进程在下一个请求时切换到新的索引文件"""
+    if data_handler.refresh_if_changed():
+        search_engine.warm()
 
 
 @app.route('/')
@@ -29,6 +43,12 @@ def search():
             'message': '请输入要查询的才能名称'
         })
 
+    if not data_handler.ready.is_set():
+        return jsonify({
+            'success': False,
+            'message': '数据加载中，请稍后重试'
+        }), 503
+
     try:
         result = search_engine.search(query)
 
@@ -36,6 +56,7 @@ def search():
             # 构造返回数据，不直接暴露完整职业列表
             response_data = {
                 'occupation': result['data']['occupation'],
+                'key': change_key(result['data']['occupation']),  # 对应 /changes 推送中的 key
                 'has_aliases': len(result['data']['aliases']) > 0,
                 'match_type': result['match_type'],
                 'status': result['data']['status'],
@@ -52,19 +73,24 @@ def search():
                 'data': response_data
             })
         else:
-            # 提供一些搜索建议（但不暴露完整列表）
-            suggestions = search_engine.get_suggestions(query)
+            # 拼音对应多个同音职业时列出全部候选，否则提供一些搜索建议（但不暴露完整列表）
+            if 'candidates' in result:
+                suggestions = result['candidates']
+            else:
+                suggestions = search_engine.get_suggestions(query)[:2]  # 最多返回2个建议
             return jsonify({
                 'success': False,
                 'message': result['message'],
-                'suggestions': suggestions[:2] if suggestions else []  # 最多返回2个建议
+                'suggestions': suggestions
             })
 
-    except Exception as e:
+    except Exception:
+        app.logger.exception("搜索出错: %r", query)
+        metrics.REQUEST_ERRORS.inc(endpoint='search')
         return jsonify({
             'success': False,
             'message': '搜索过程中出现错误，请稍后重试'
-        })
+        }), 500
 
 
 @app.route('/reload', methods=['POST'])
@@ -72,15 +98,28 @@ def reload_data():
     """重新加载数据接口（可选，用于更新数据）"""
     try:
         data_handler.reload_data()
+        search_engine.warm()
         return jsonify({
             'success': True,
             'message': '数据重新加载成功'
         })
     except Exception as e:
+        app.logger.exception("重新加载数据出错")
+        metrics.REQUEST_ERRORS.inc(endpoint='reload')
         return jsonify({
             'success': False,
-            'message': '数据加载失败'
-        })
+            'message': f'数据加载失败，继续使用上一份数据（{len(data_handler.occupations_data)} 条）',
+            'error': str(e)
+        }), 500
+
+
+@app.route('/changes')
+def changes():
+    """数据变更推送（Server-Sent Events），客户端状态随重新加载的增量更新，无需轮询"""
+    last_id = request.headers.get('Last-Event-ID')
+    stream = change_feed.stream(last_id, on_idle=refresh_snapshot)
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route('/stats')
@@ -93,6 +132,22 @@ def stats():
     })
 
 
+@app.route('/ready')
+def ready():
+    """
+    就绪检查，供负载均衡与自动扩缩容判断：没有可用数据（首次加载中或加载失败）时返回 503；
+    最近一次重新加载失败但仍有上一份快照时返回 200，state 为 degraded，error 为失败原因
+    """
+    status = data_handler.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus 指标接口"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
 if __name__ == '__main__':
     print(f"职业搜索系统启动中...")
     print(f"数据源: {'在线表格' if Config.DATA_SOURCE == 'online' else '本地Excel文件'}")
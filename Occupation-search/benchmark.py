@@ -0,0 +1,243 @@
+"""
+搜索服务压测脚本
+生成 1k/10k/100k 行的模拟才能表格，由本地服务模拟 Google Sheets 的 CSV 导出，
+按 Zipf 分布回放查询（精确 / 别称 / 错字 / 不存在），分别测 SearchEngine 接口与 HTTP 接口的 QPS 与延迟分位数
+两者执行相同的调用序列（search，未找到时再 get_suggestions），差值即 HTTP 与序列化的开销
+
+用法：
+    python benchmark.py
+    python benchmark.py --sizes 1000 10000 --queries 2000 --concurrency 8
+    python benchmark.py --no-cache --max-seconds 30 --json bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pandas as pd
+
+import talent_path  # 共享索引库 talent_index，需在其他模块之前导入
+from config import Config
+from talent_index.sample import generate_sheet, make_typo, percentile, random_cjk
+
+# 查询类型及其占比
+QUERY_MIX = {'exact': 0.6, 'alias': 0.15, 'typo': 0.15, 'miss': 0.1}
+
+
+class SheetServer:
+    """本地模拟 Google Sheets 导出接口：/spreadsheets/d/<id>/export?format=csv|tsv"""
+
+    def __init__(self):
+        self.sheets = {}
+        sheets = self.sheets
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = re.match(r'/spreadsheets/d/([\w-]+)/export\?format=(csv|tsv)', self.path)
+                if not match or match.group(1) not in sheets:
+                    self.send_error(404)
+                    return
+                df = sheets[match.group(1)]
+                body = df.to_csv(index=False, sep=',' if match.group(2) == 'csv' else '\t').encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f'http://127.0.0.1:{self.httpd.server_port}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, sheet_id, df):
+        self.sheets[sheet_id] = df
+        return f'{self.base_url}/spreadsheets/d/{sheet_id}/edit'
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+def build_queries(df, count, seed=0, zipf_s=1.1):
+    """按 Zipf 分布挑选热门条目，再按 QUERY_MIX 生成查询 [(类型, 查询词)]"""
+    rng = random.Random(seed)
+    names = df['才能称号'].tolist()
+    aliases = [alias.split('，') if alias else [] for alias in df['别称'].tolist()]
+    weights = [1 / (rank + 1) ** zipf_s for rank in range(len(names))]
+    kinds = list(QUERY_MIX)
+
+    queries = []
+    for kind, row in zip(rng.choices(kinds, [QUERY_MIX[k] for k in kinds], k=count),
+                         rng.choices(range(len(names)), weights, k=count)):
+        if kind == 'alias' and not aliases[row]:
+            kind = 'exact'
+        if kind == 'exact':
+            query = names[row]
+        elif kind == 'alias':
+            query = rng.choice(aliases[row])
+        elif kind == 'typo':
+            query = make_typo(rng, names[row])
+        else:
+            query = random_cjk(rng, 3, 6) + '？'
+        queries.append((kind, query))
+    return queries
+
+
+def replay(call, queries, concurrency=1, max_seconds=None):
+    """回放查询，返回 QPS 与各类型/整体的延迟分位数（毫秒）；超过 max_seconds 后停止"""
+    deadline = time.perf_counter() + max_seconds if max_seconds else None
+    results = []
+    errors = []
+
+    def run(item):
+        if deadline and time.perf_counter() > deadline:
+            return
+        kind, query = item
+        start = time.perf_counter()
+        try:
+            call(query)
+        except Exception as e:
+            errors.append(repr(e))
+            return
+        results.append((kind, (time.perf_counter() - start) * 1000))
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        for item in queries:
+            run(item)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(run, queries))
+    elapsed = time.perf_counter() - start
+
+    def summarize(latencies):
+        latencies = sorted(latencies)
+        return {
+            'count': len(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+        }
+
+    summary = summarize(latency for _, latency in results)
+    summary['qps'] = len(results) / elapsed if elapsed else 0.0
+    summary['errors'] = len(errors)
+    summary['by_kind'] = {kind: summarize(latency for k, latency in results if k == kind) for kind in QUERY_MIX}
+    return summary
+
+
+def engine_search(engine):
+    """与 /search 路由相同的调用序列：未找到时还会计算拼写建议，两条路径的错字 / 不存在查询才可比"""
+    def call(query):
+        result = engine.search(query)
+        if not result['found'] and 'candidates' not in result:
+            engine.get_suggestions(query)
+    return call
+
+
+def http_search(base_url):
+    def call(query):
+        request = urllib.request.Request(
+            f'{base_url}/search',
+            data=json.dumps({'query': query}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(request) as response:
+            response.read()
+    return call
+
+
+def print_summary(label, summary):
+    print(f"  {label:<14}QPS {summary['qps']:>9.1f} | p50 {summary['p50']:>8.2f} ms | "
+          f"p95 {summary['p95']:>8.2f} ms | p99 {summary['p99']:>8.2f} ms | "
+          f"完成 {summary['count']} 次, 失败 {summary['errors']} 次")
+    for kind, stats in summary['by_kind'].items():
+        if stats['count']:
+            print(f"    {kind:<8}p50 {stats['p50']:>8.2f} ms | p99 {stats['p99']:>8.2f} ms ({stats['count']} 次)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='职业搜索服务压测')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='模拟表格行数')
+    parser.add_argument('--queries', type=int, default=1000, help='每档回放的查询数')
+    parser.add_argument('--concurrency', type=int, default=4, help='HTTP 压测并发数')
+    parser.add_argument('--zipf', type=float, default=1.1, help='查询热度的 Zipf 指数')
+    parser.add_argument('--max-seconds', type=float, default=60, help='每个阶段的最长回放时间（秒）')
+    parser.add_argument('--no-cache', action='store_true', help='关闭搜索结果缓存')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', type=str, help='将结果写入 JSON 文件')
+    parser.add_argument('--verbose', action='store_true', help='显示数据加载过程的输出')
+    args = parser.parse_args()
+
+    sheet_server = SheetServer()
+    workdir = tempfile.mkdtemp(prefix='occupation-bench-')
+
+    # 所有数据都走本地模拟服务，索引写到临时目录，不影响 data/
+    Config.DATA_SOURCE = 'online'
+    Config.SHEETS_EXPORT_BASE = sheet_server.base_url
+    Config.TENCENT_SHEET_URL = sheet_server.publish('empty', pd.DataFrame({'才能称号': ['占位']}))
+    Config.INDEX_PATH = os.path.join(workdir, 'talents.tidx')
+    Config.INDEX_MAX_AGE = 0
+    if args.no_cache:
+        Config.SEARCH_CACHE_SIZE = 0
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        import app
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    http_server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{http_server.server_port}'
+
+    report = []
+    try:
+        for size in args.sizes:
+            print(f"=== {size} 行 ===")
+            df = generate_sheet(size, args.seed)
+            Config.TENCENT_SHEET_URL = sheet_server.publish(f'bench{size}', df)
+
+            start = time.perf_counter()
+            with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+                app.data_handler.reload_data()
+            load_seconds = time.perf_counter() - start
+            print(f"  数据加载 {load_seconds:.2f} 秒，共 {len(app.data_handler.occupations_data)} 条")
+
+            queries = build_queries(df, args.queries, args.seed, args.zipf)
+            engine_summary = replay(engine_search(app.search_engine), queries, 1, args.max_seconds)
+            print_summary('SearchEngine', engine_summary)
+            # 清空缓存，HTTP 阶段与 SearchEngine 阶段从同样的冷缓存开始
+            app.search_engine.clear_cache()
+            http_summary = replay(http_search(base_url), queries, args.concurrency, args.max_seconds)
+            print_summary(f'HTTP x{args.concurrency}', http_summary)
+            print()
+
+            report.append({'rows': size, 'load_seconds': load_seconds,
+                           'engine': engine_summary, 'http': http_summary})
+    finally:
+        http_server.shutdown()
+        sheet_server.close()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.json}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
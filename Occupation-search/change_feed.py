@@ -0,0 +1,123 @@
+"""
+数据变更推送（Server-Sent Events）
+DataHandler 每次应用增量后发布一条事件，列出新增 / 修改 / 删除的职业；
+客户端用 EventSource 订阅 /changes，当前显示的职业状态变化时直接更新，不必重新搜索或轮询整个数据集
+
+与搜索接口一样不暴露职业列表：事件中只有名称的哈希（与 /search 返回的 key、Static-search 的 simpleHash 相同）
+事件 id 为 <本进程标识>-<递增序号>；断线重连时按 Last-Event-ID 补发缓冲区内错过的事件，
+错过太多、或 id 不是本进程发出的（多个 worker 之间重连到了另一个进程）时发送 reset，客户端应重新搜索
+
+每个订阅连接占用一个线程，需以多线程（或 gevent）方式运行 Flask / gunicorn
+"""
+
+import json
+import os
+import threading
+import uuid
+import time
+from collections import deque
+
+from config import Config
+from metrics import CHANGE_FEED_CLIENTS
+
+from talent_index import STATUS_LABELS, simple_hash
+
+
+def change_key(name):
+    """客户端用来对应职业的键：名称的哈希"""
+    return simple_hash(name)
+
+
+def _change(op, record):
+    change = {'key': change_key(record['name']), 'op': op}
+    if op != 'delete':
+        change.update(status=record['status'],
+                      chinese_status=STATUS_LABELS.get(record['status'], '未知状态'),
+                      has_aliases=len(record['aliases']) > 0)
+    return change
+
+
+class ChangeFeed:
+    """最近的数据增量（环形缓冲）以及向订阅连接推送它们的 SSE 流"""
+
+    def __init__(self, history=None):
+        self._events = deque(maxlen=history or Config.CHANGE_FEED_HISTORY)
+        self._sequence = 0
+        # 每个进程（每个 ChangeFeed）不同，其他 worker 发出的序号不能在这里补发
+        self.feed_id = f'{os.getpid():x}{uuid.uuid4().hex[:6]}'
+
+        self._condition = threading.Condition()
+        self._clients = 0
+        CHANGE_FEED_CLIENTS.set_function(lambda: self._clients)
+
+    def publish(self, version, delta):
+        """DataHandler.subscribe 的回调：把 RecordDelta 转成事件"""
+        changes = ([_change('insert', record) for record in delta.inserted] +
+                   [_change('update', after) for _, after in delta.updated] +
+                   [_change('delete', record) for record in delta.deleted])
+        if not changes:
+            return
+        data = json.dumps({'version': version, 'changes': changes}, ensure_ascii=False)
+        with self._condition:
+            self._sequence += 1
+            self._events.append((self._sequence, data))
+            self._condition.notify_all()
+
+    def _events_after(self, position):
+        return [(sequence, data) for sequence, data in self._events if sequence > position]
+
+    def event_id(self, sequence):
+        return f'{self.feed_id}-{sequence}'
+
+    def _parse_id(self, last_id):
+        """本进程发出的事件 id 返回其序号，其他进程发出的或无法解析的返回 None"""
+        feed_id, _, sequence = str(last_id).rpartition('-')
+        if feed_id != self.feed_id or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def _missed(self, sequence):
+        """sequence 之后的事件已不能完整补发（超出缓冲区）"""
+        if sequence > self._sequence:
+            return True
+        return bool(self._events) and sequence < self._events[0][0] - 1
+
+    def stream(self, last_id=None, on_idle=None):
+        """
+        SSE 文本流：先补发 last_id（客户端的 Last-Event-ID）之后的事件，再等待新事件
+        每隔 Config.INDEX_CHECK_INTERVAL 秒调用一次 on_idle（检查其他 worker 是否发布了新索引），
+        每隔 Config.CHANGE_FEED_HEARTBEAT 秒发一行注释保活
+        """
+        with self._condition:
+            self._clients += 1
+            sequence = self._parse_id(last_id) if last_id else None
+            reset = bool(last_id) and (sequence is None or self._missed(sequence))
+            position = self._sequence if not last_id or reset else sequence
+        try:
+            yield f'retry: {Config.CHANGE_FEED_RETRY_MS}\n\n'
+            if reset:
+                yield f'id: {self.event_id(position)}\nevent: reset\ndata: {{}}\n\n'
+
+            last_sent = time.monotonic()
+            while True:
+                with self._condition:
+                    events = self._events_after(position)
+                    if not events:
+                        self._condition.wait(Config.INDEX_CHECK_INTERVAL)
+                        events = self._events_after(position)
+
+                if not events:
+                    if on_idle is not None:
+                        on_idle()
+                    if time.monotonic() - last_sent >= Config.CHANGE_FEED_HEARTBEAT:
+                        last_sent = time.monotonic()
+                        yield ': keep-alive\n\n'
+                    continue
+
+                for sequence, data in events:
+                    yield f'id: {self.event_id(sequence)}\nevent: delta\ndata: {data}\n\n'
+                    position = sequence
+                last_sent = time.monotonic()
+        finally:
+            with self._condition:
+                self._clients -= 1
@@ -2,14 +2,28 @@
 class Config:
     # Google Sheets相关配置
     TENCENT_SHEET_URL = "https://docs.google.com/spreadsheets/d/1zgmpW6Txc2_DYZ-XxHjxbYVqKR0mm928/edit?usp=sharing&ouid=114134414249936425386&rtpof=true&sd=true"
+    # 导出CSV/TSV所用的地址，压测时指向本地模拟服务
+    SHEETS_EXPORT_BASE = "https://docs.google.com"
 
     # 本地文件路径
     LOCAL_EXCEL_PATH = "data/occupations.xlsx"
 
+    # 编译后的索引文件（加载表格后自动生成；DATA_SOURCE 为 'index' 时直接映射）
+    INDEX_PATH = "data/talents.tidx"
+    INDEX_MAX_AGE = 300  # 启动时索引文件在此秒数内更新过则直接映射，不重新下载
+    INDEX_CHECK_INTERVAL = 2  # 检查其他 worker 是否发布了新索引的间隔（秒）
+
+    # 变更推送（/changes，Server-Sent Events）
+    CHANGE_FEED_HISTORY = 256  # 保留最近多少条变更事件，供断线重连补发
+    CHANGE_FEED_HEARTBEAT = 15  # 没有变更时发送保活注释的间隔（秒）
+    CHANGE_FEED_RETRY_MS = 3000  # 断线后客户端重连间隔（毫秒）
+
     # 搜索匹配阈值
     FUZZY_MATCH_THRESHOLD = 70  # 模糊匹配相似度阈值（0-100）
+    SUGGESTION_MAX_DISTANCE = 2  # 搜索建议允许的最大编辑距离（越大建议索引越大）
+    SEARCH_CACHE_SIZE = 1024  # 搜索结果缓存条数，0 为关闭
 
-    # 数据源配置 ('local' 或 'online')
+    # 数据源配置 ('local'、'online' 或 'index')
     DATA_SOURCE = 'online'
 
     # Flask配置
@@ -1,31 +1,240 @@
-import pandas as pd
-import requests
-from io import BytesIO, StringIO
+import os
+import threading
+import time
+from collections.abc import Sequence
+from io import StringIO
 from config import Config
 import re
-from bs4 import BeautifulSoup
-import chardet
+
+# pandas、requests、chardet 只在解析表格时才导入（见 load_from_local / load_from_google_sheets），
+# 直接映射索引文件的进程不需要加载它们，服务可以立即开始监听
+
+from talent_index import (STATUS_LABELS, TalentIndex, compile_index, is_current, publish_lock, build_phonetic_index,
+                          update_phonetic_index, diff_records)
+from talent_index.delta import is_empty, names_changed
+from metrics import DATA_LOADS, DATA_LOAD_SECONDS, DATA_AGE_SECONDS, DATA_RECORDS, DATA_DELTA_RECORDS
+
+
+class OccupationView(Sequence):
+    """索引文件上的只读职业列表：按需解码记录，各 worker 通过页缓存共享同一份数据"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return to_occupation(self.index.record(i))
+
+
+def to_occupation(record):
+    return {
+        'occupation': record['name'],
+        'aliases': record['aliases'],
+        'status': record['status'],
+        'chinese_status': STATUS_LABELS.get(record['status'], '未知状态'),
+        'all_names': [record['name']] + record['aliases']
+    }
 
 
 class DataHandler:
-    def __init__(self):
+    def __init__(self, autoload=True):
+        """autoload 为 False 时不在构造时加载数据，由调用方调用 load_data 或 load_async"""
         self.occupations_data = []
-        self.load_data()
+        # 每次替换数据时递增；names_version 只在可搜索的名称（名称、别称）变化时递增，
+        # 只改状态的重新加载不必重建名称表、建议索引与拼音索引
+        self.version = 0
+        self.names_version = 0
+        # 数据变更订阅者，每次应用增量后以 (version, RecordDelta) 调用
+        self._listeners = []
+        # 拼音 / 首字母键 -> 名称列表，随数据一起替换（未安装 pypinyin 时为空）
+        self.phonetic_index = {}
+        self._last_check = 0
+        # 首次成功加载后置位；后台加载与 /reload 不同时进行
+        self.ready = threading.Event()
+        self.last_error = None
+        self._load_lock = threading.Lock()
+        self._loader = None
+        DATA_AGE_SECONDS.set_function(self.data_age)
+        DATA_RECORDS.set_function(lambda: len(self.occupations_data))
+        if autoload:
+            try:
+                self.load_data()
+            except Exception:
+                pass  # 已记录在 last_error，可通过 /reload 重试
 
-    def load_data(self):
-        """根据配置加载数据"""
+    def load_async(self, on_loaded=None):
+        """在后台线程加载数据，立即返回；加载成功后调用 on_loaded()"""
+        def run():
+            try:
+                self.load_data()
+            except Exception:
+                return  # 已记录在 last_error，/ready 报告 failed
+            if on_loaded is not None:
+                on_loaded()
+
+        self._loader = threading.Thread(target=run, name='data-loader', daemon=True)
+        self._loader.start()
+        return self._loader
+
+    def subscribe(self, callback):
+        """注册数据变更回调 callback(version, delta)；首次加载不算变更，不会回调"""
+        self._listeners.append(callback)
+
+    def status(self):
+        """
+        就绪状态：loading（首次加载中）、ready、
+        degraded（最近一次加载失败，仍在使用上一份快照）、failed（没有可用快照且加载失败，可通过 /reload 重试）
+        ready / degraded 时可以提供查询
+        """
+        usable = self.ready.is_set() and self.index is not None
+        if usable:
+            state = 'degraded' if self.last_error else 'ready'
+        elif self._loader is not None and self._loader.is_alive():
+            state = 'loading'
+        else:
+            state = 'failed' if self.last_error else 'loading'
+        return {
+            'state': state,
+            'ready': usable,
+            'records': len(self.occupations_data),
+            'version': self.version,
+            'error': self.last_error,
+        }
+
+    @property
+    def index(self):
+        # 尚未加载或加载失败时 occupations_data 是普通列表（list.index 是方法）
+        occupations = self.occupations_data
+        return occupations.index if isinstance(occupations, OccupationView) else None
+
+    def load_data(self, force=False):
+        """
+        根据配置加载数据，失败时抛出异常并保留上一份成功加载的快照（下次加载仍按它计算增量）
+        多个 worker 共用 Config.INDEX_PATH：只有拿到发布锁的进程下载表格并原子替换索引文件，
+        其余进程等锁后直接映射，不再各自下载
+        """
+        with self._load_lock:
+            self._load_data(force)
+
+    def _load_data(self, force):
+        requested = time.time()
+        start = time.perf_counter()
         try:
-            if Config.DATA_SOURCE == 'online':
-                self.load_from_google_sheets()
+            if Config.DATA_SOURCE == 'index':
+                self.load_from_index()
             else:
-                self.load_from_local()
+                with publish_lock(Config.INDEX_PATH):
+                    if self._index_is_fresh(requested if force else requested - Config.INDEX_MAX_AGE):
+                        # 等锁期间其他 worker 已发布了足够新的数据
+                        self.load_from_index()
+                    elif Config.DATA_SOURCE == 'online':
+                        self.load_from_google_sheets()
+                    else:
+                        self.load_from_local()
             print(f"成功加载 {len(self.occupations_data)} 条职业数据")
+            self.last_error = None
+            self.ready.set()
+            DATA_LOADS.inc(result='success')
+        except Exception as e:
+            print(f"数据加载失败: {e}（继续使用上一份数据，共 {len(self.occupations_data)} 条）")
+            self.last_error = str(e)
+            DATA_LOADS.inc(result='failure')
+            raise
+        finally:
+            DATA_LOAD_SECONDS.set(time.perf_counter() - start)
+
+    def data_age(self):
+        """当前索引文件生成至今的秒数，未加载时为 None"""
+        index = self.index
+        return time.time() - index.created if index is not None else None
+
+    def _index_is_fresh(self, since):
+        """索引文件在 since 之后发布且为当前格式版本；旧版本的文件视为过期，重新从表格编译"""
+        try:
+            return os.path.getmtime(Config.INDEX_PATH) >= since and is_current(Config.INDEX_PATH)
+        except OSError:
+            return False
+
+    def current_records(self):
+        """当前快照的全部记录 [{name, status, aliases, keywords}]，未加载时为空"""
+        index = self.index
+        return list(index.records()) if index is not None else []
+
+    def load_from_index(self, path=None, delta=None):
+        """
+        直接映射已编译的索引文件（python -m talent_index build ...），无需解析表格
+        已有数据时按行比较新旧快照（或使用调用方已算好的 delta），只把增量应用到拼音索引并通知订阅者
+        """
+        index = TalentIndex(path or Config.INDEX_PATH)
+        previous = self.index
+        if previous is not None and delta is None:
+            delta = diff_records(previous.records(), index.records())
+
+        # 整体替换视图；旧映射在正在处理的请求结束后随引用释放
+        self.occupations_data = OccupationView(index)
+        self.version += 1
+        if previous is None:
+            self.phonetic_index = build_phonetic_index(index.searchable_names())
+            self.names_version += 1
+            print(f"已映射索引文件 {index.path}（版本 {index.version}）")
+            return
+
+        if names_changed(delta):
+            removed = [name for record in delta.deleted for name in [record['name']] + record['aliases']]
+            added = [name for record in delta.inserted for name in [record['name']] + record['aliases']]
+            for before, after in delta.updated:
+                removed += [before['name']] + before['aliases']
+                added += [after['name']] + after['aliases']
+            self.phonetic_index = update_phonetic_index(self.phonetic_index, removed, added)
+            self.names_version += 1
+        for op, records in zip(('insert', 'update', 'delete'), delta):
+            DATA_DELTA_RECORDS.inc(len(records), op=op)
+        print(f"已映射索引文件 {index.path}（版本 {index.version}）：新增 {len(delta.inserted)}、"
+              f"修改 {len(delta.updated)}、删除 {len(delta.deleted)}")
+        for callback in self._listeners:
+            try:
+                callback(self.version, delta)
+            except Exception as e:
+                print(f"数据变更回调失败: {e}")
+
+    def refresh_if_changed(self):
+        """其他 worker 发布新索引后重新映射；按 Config.INDEX_CHECK_INTERVAL 节流，只做一次 stat"""
+        now = time.time()
+        if now - self._last_check < Config.INDEX_CHECK_INTERVAL:
+            return False
+        self._last_check = now
+
+        index = self.index
+        if index is not None and not index.changed_on_disk():
+            return False
+        # 还没有可用的索引文件（不存在或是旧版本），等本进程的加载流程重新编译
+        if index is None and not is_current(Config.INDEX_PATH):
+            return False
+        # 正在加载（首次加载或 /reload）时跳过，加载完成后自然是最新数据
+        if not self._load_lock.acquire(blocking=False):
+            return False
+        try:
+            self.load_from_index()
+            self.ready.set()
         except Exception as e:
-            print(f"数据加载失败: {e}")
-            self.occupations_data = []
+            print(f"重新映射索引文件失败: {e}")
+            return False
+        finally:
+            self._load_lock.release()
+        return True
 
     def load_from_local(self):
         """从本地Excel文件加载数据"""
+        import pandas as pd
+
         # 尝试不同的编码方式读取Excel
         try:
             df = pd.read_excel(Config.LOCAL_EXCEL_PATH, engine='openpyxl')
@@ -35,9 +244,7 @@ class DataHandler:
                 df = pd.read_excel(Config.LOCAL_EXCEL_PATH, engine='xlrd')
                 print("使用xlrd引擎成功读取Excel文件")
             except:
-                # 如果Excel读取失败，尝试先转换为CSV
-                print("Excel读取失败，请确保文件格式正确")
-                return
+                raise ValueError(f"Excel读取失败，请确保文件格式正确: {Config.LOCAL_EXCEL_PATH}")
 
         self.process_dataframe(df)
 
@@ -46,6 +253,10 @@ class DataHandler:
         if not Config.TENCENT_SHEET_URL:
             raise ValueError("Google Sheets URL未配置")
 
+        import chardet
+        import pandas as pd
+        import requests
+
         sheet_url = Config.TENCENT_SHEET_URL
 
         # 提取文档ID
@@ -54,7 +265,7 @@ class DataHandler:
             raise ValueError("无效的Google Sheets链接格式")
 
         sheet_id = match.group(1)
-        csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
+        csv_url = f"{Config.SHEETS_EXPORT_BASE}/spreadsheets/d/{sheet_id}/export?format=csv"
 
         print(f"Google Sheets CSV导出链接: {csv_url}")
 
@@ -98,7 +309,6 @@ class DataHandler:
                     raise ValueError("无法解码CSV内容，请检查文件编码")
 
             # 使用pandas读取CSV
-            from io import StringIO
             df = pd.read_csv(StringIO(content))
 
             print(f"成功从Google Sheets读取 {len(df)} 行数据")
@@ -120,7 +330,7 @@ class DataHandler:
             print(f"CSV方法失败: {e}")
 
             # 尝试TSV格式作为备选
-            tsv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=tsv"
+            tsv_url = f"{Config.SHEETS_EXPORT_BASE}/spreadsheets/d/{sheet_id}/export?format=tsv"
             print(f"尝试TSV格式: {tsv_url}")
 
             try:
@@ -150,109 +360,64 @@ class DataHandler:
         raise ValueError("无法从Google Sheets获取数据，请检查链接权限设置")
 
     def process_dataframe(self, df):
-        """处理DataFrame，提取职业信息"""
-        self.occupations_data = []
+        """处理DataFrame，提取职业信息，并编译为索引文件供查询与静态页共用"""
+        from talent_index.ingest import detect_columns, normalize_frame, merge_records
 
         print(f"处理DataFrame - 列名: {df.columns.tolist()}")
         print(f"DataFrame形状: {df.shape}")
 
-        # 处理可能的列名变体
-        occupation_col = None
-        alias_col = None
-        status_col = None
-
-        # 查找匹配的列名
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if any(keyword in col_lower for keyword in ['才能', '职业', 'occupation', 'job']):
-                occupation_col = col
-            elif any(keyword in col_lower for keyword in ['别称', 'alias', '别名']):
-                alias_col = col
-            elif any(keyword in col_lower for keyword in ['状态', 'status', '审核']):
-                status_col = col
-
-        print(f"识别的列: 职业={occupation_col}, 别称={alias_col}, 状态={status_col}")
-
-        if not occupation_col:
-            # 如果找不到明确的职业列，使用第一列
-            occupation_col = df.columns[0]
-            print(f"未找到职业列，使用第一列: {occupation_col}")
-
-        for index, row in df.iterrows():
-            try:
-                # 获取职业名称
-                occupation = ""
-                if occupation_col and pd.notna(row.get(occupation_col)):
-                    occupation = str(row[occupation_col]).strip()
-
-                # 获取别称
-                aliases = ""
-                if alias_col and pd.notna(row.get(alias_col)):
-                    aliases = str(row[alias_col]).strip()
-
-                # 获取状态
-                status = ""
-                if status_col and pd.notna(row.get(status_col)):
-                    status = str(row[status_col]).strip()
-
-                # 只处理有效的职业名称
-                if occupation and occupation != 'nan':
-                    # 处理别称
-                    alias_list = []
-                    if aliases and aliases != 'nan':
-                        # 支持多种分隔符
-                        import re
-                        alias_list = [alias.strip() for alias in re.split('[,，、;；/]', aliases) if alias.strip()]
-
-                    # 状态映射
-                    status_map = {
-                        'Occupied': '已被占用',
-                        'Hold': '暂时保留',
-                        'Available': '可用',
-                        '已占用': '已被占用',
-                        '保留': '暂时保留',
-                        '可用': '可用'
-                    }
-
-                    chinese_status = status_map.get(status, '未知状态')
-
-                    occupation_data = {
-                        'occupation': occupation,
-                        'aliases': alias_list,
-                        'status': status,
-                        'chinese_status': chinese_status,
-                        'all_names': [occupation] + alias_list
-                    }
-
-                    self.occupations_data.append(occupation_data)
-
-                    print(f"处理职业 #{index + 1}: {occupation} (状态: {status})")
-                    if alias_list:
-                        print(f"  别称: {alias_list}")
+        occupation_col, status_col, alias_col, fuzzy_col = detect_columns(df.columns)
+        print(f"识别的列: 职业={occupation_col}, 别称={alias_col}, 状态={status_col}, 模糊词={fuzzy_col}")
 
-            except Exception as e:
-                print(f"处理第{index + 1}行时出错: {e}")
-                continue
+        # 无法识别的状态保留为空，显示为"未知状态"
+        frame = normalize_frame(df, occupation_col, status_col, alias_col, fuzzy_col, default_status='')
+        records = merge_records([frame])
+
+        # 与当前快照逐行比较，没有变化时不重新编译、不发布，缓存与各索引保持不变
+        delta = None
+        if self.index is not None:
+            delta = diff_records(self.current_records(), records)
+            if is_empty(delta):
+                print(f"数据无变化，保留当前快照（{len(self.occupations_data)} 个职业）")
+                return
+
+        for index, record in enumerate(records):
+            print(f"处理职业 #{index + 1}: {record['name']} (状态: {record['status']})")
+            if record['aliases']:
+                print(f"  别称: {record['aliases']}")
+
+        stats = compile_index(records, Config.INDEX_PATH)
+        print(f"索引文件已更新: {Config.INDEX_PATH} ({stats['bytes'] / 1024:.1f} KB)")
+        self.load_from_index(delta=delta)
 
         print(f"最终成功处理了 {len(self.occupations_data)} 个职业")
 
     def get_all_searchable_names(self):
         """获取所有可搜索的名称列表"""
+        occupations = self.occupations_data
+        if isinstance(occupations, OccupationView):
+            return occupations.index.searchable_names()
         all_names = []
-        for item in self.occupations_data:
+        for item in occupations:
             all_names.extend(item['all_names'])
         return all_names
 
     def get_occupation_info(self, name):
         """根据名称获取职业信息"""
-        for item in self.occupations_data:
+        occupations = self.occupations_data
+        if isinstance(occupations, OccupationView):
+            for record_id in occupations.index.lookup(name):
+                if name in occupations[record_id]['all_names']:
+                    return occupations[record_id]
+            return None
+        for item in occupations:
             if name in item['all_names']:
                 return item
         return None
 
     def reload_data(self):
-        """重新加载数据"""
-        self.load_data()
+        """重新加载数据（总是重新获取表格，除非其他 worker 在此期间刚发布过）；失败时抛出异常"""
+        self.load_data(force=True)
 
     def print_debug_info(self):
         """打印调试信息"""
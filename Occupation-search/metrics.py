@@ -0,0 +1,172 @@
+"""
+轻量的 Prometheus 指标
+只实现本服务用到的 Counter / Gauge / Histogram，输出 Prometheus 文本格式（/metrics），不引入额外依赖
+每次记录只有一次加锁和一次二分查找，可以放在搜索热路径上
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 搜索各阶段耗时的分桶（秒），覆盖 0.1 毫秒到 2.5 秒
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        return []
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for suffix, labelvalues, extra, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labelnames, labelvalues, extra)} '
+                         f'{_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [('', key, None, value) for key, value in self._values.items()]
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        """取值时才计算（如数据年龄），无标签"""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            value = self._function()
+            return [] if value is None else [('', (), None, value)]
+        with self._lock:
+            return [('', key, None, value) for key, value in self._values.items()]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+
+        samples = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append(('_bucket', key, ('le', _format_value(float(bound))), cumulative))
+            samples.append(('_sum', key, None, total))
+            samples.append(('_count', key, None, cumulative))
+        return samples
+
+
+REGISTRY = []
+
+
+def render():
+    """全部指标的 Prometheus 文本格式"""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+
+# 搜索
+SEARCH_STAGE_SECONDS = Histogram('occupation_search_stage_seconds', '搜索各阶段耗时（秒）', ['stage'])
+SEARCH_RESULTS = Counter('occupation_search_results_total', '按匹配类型统计的搜索次数', ['match_type'])
+SEARCH_CACHE = Counter('occupation_search_cache_total', '搜索结果缓存命中/未命中次数', ['result'])
+SEARCH_CACHE_HIT_RATIO = Gauge('occupation_search_cache_hit_ratio', '搜索结果缓存命中率')
+REQUEST_ERRORS = Counter('occupation_request_errors_total', '接口处理异常次数', ['endpoint'])
+
+# 数据加载
+DATA_LOADS = Counter('occupation_data_loads_total', '数据加载次数', ['result'])
+DATA_LOAD_SECONDS = Gauge('occupation_data_load_seconds', '最近一次数据加载耗时（秒）')
+DATA_AGE_SECONDS = Gauge('occupation_data_age_seconds', '当前索引文件生成至今的秒数')
+DATA_RECORDS = Gauge('occupation_data_records', '当前加载的职业条数')
+DATA_DELTA_RECORDS = Counter('occupation_data_delta_records_total', '重新加载时变化的记录数', ['op'])
+
+# 变更推送
+CHANGE_FEED_CLIENTS = Gauge('occupation_change_feed_clients', '当前订阅 /changes 的连接数')
+
+
+def _cache_hit_ratio():
+    hits, misses = SEARCH_CACHE.get(result='hit'), SEARCH_CACHE.get(result='miss')
+    return hits / (hits + misses) if hits + misses else None
+
+
+SEARCH_CACHE_HIT_RATIO.set_function(_cache_hit_ratio)
@@ -1,11 +1,24 @@
-from fuzzywuzzy import fuzz
-from difflib import get_close_matches
+from collections import OrderedDict, namedtuple
 from config import Config
+from metrics import SEARCH_STAGE_SECONDS, SEARCH_RESULTS, SEARCH_CACHE
+
+from talent_index import normalize_text, SuggestionIndex, phonetic_lookup
+from talent_index.phonetic import has_cjk
+
+# 可搜索名称表：原名称、归一化名称、归一化名称 -> 原名称、拼写建议索引
+NameTable = namedtuple('NameTable', ['version', 'names', 'normalized', 'lookup', 'suggestions'])
 
 
 class SearchEngine:
     def __init__(self, data_handler):
         self.data_handler = data_handler
+        # 搜索结果 LRU 缓存，键中带名称版本号：名称变化后旧结果自然失效，
+        # 只改状态时由 apply_delta 淘汰涉及被修改职业的条目，其余结果继续有效
+        self._cache = OrderedDict()
+        # 名称表随名称版本更新
+        self._names = NameTable(None, [], [], {}, SuggestionIndex([]))
+        data_handler.subscribe(self.apply_delta)
+        self.warm()
 
     def search(self, query):
         """主搜索函数"""
@@ -16,28 +29,122 @@ class SearchEngine:
             }
 
         query = query.strip()
-        all_names = self.data_handler.get_all_searchable_names()
+        version = self.data_handler.version
+        cache_key = (self.data_handler.names_version, query)
+        result = self._cache_get(cache_key)
+        if result is None:
+            with SEARCH_STAGE_SECONDS.time(stage='total'):
+                result = self._search(query)
+            # 搜索期间数据已更新时结果可能是旧状态，不写入缓存
+            if self.data_handler.version == version:
+                self._cache_put(cache_key, result)
+
+        SEARCH_RESULTS.inc(match_type=result.get('match_type', 'none'))
+        return result
+
+    def clear_cache(self):
+        """清空搜索结果缓存（压测在两个阶段之间调用，让后一阶段也从冷缓存开始）"""
+        self._cache.clear()
+
+    def warm(self):
+        """加载/重新加载数据后立即重建名称表和建议索引，不让第一个未命中的查询承担构建耗时"""
+        self._searchable_names()
+
+    def apply_delta(self, version, delta):
+        """DataHandler 应用增量后的回调：淘汰结果涉及被修改/删除职业的缓存条目，名称有变化时增量更新名称表"""
+        changed = ({record['name'] for record in delta.deleted} |
+                   {record['name'] for pair in delta.updated for record in pair})
+        for key, result in list(self._cache.items()):
+            data = result.get('data')
+            if data and data['occupation'] in changed:
+                self._cache.pop(key, None)
+        self.warm()
+
+    def _searchable_names(self):
+        """
+        名称表按名称版本缓存；与 Static-search 相同的归一化（NFKC、小写、去空格），全角/大小写变体也能命中
+        拼写建议索引在已有名称表上只增删变化的名称，首次加载时整体构建
+        """
+        version = self.data_handler.names_version
+        if self._names.version != version:
+            previous = self._names
+            all_names = self.data_handler.get_all_searchable_names()
+            normalized = [normalize_text(name) for name in all_names]
+            lookup = {}
+            for name, key in zip(all_names, normalized):
+                lookup.setdefault(key, name)
+            if previous.version is None or not previous.lookup:
+                suggestions = SuggestionIndex(lookup, max_distance=Config.SUGGESTION_MAX_DISTANCE)
+            else:
+                suggestions = previous.suggestions.updated(
+                    added=[key for key in lookup if key not in previous.lookup],
+                    removed=[key for key in previous.lookup if key not in lookup])
+            self._names = NameTable(version, all_names, normalized, lookup, suggestions)
+        return self._names
+
+    def _search(self, query):
+        with SEARCH_STAGE_SECONDS.time(stage='names'):
+            names = self._searchable_names()
 
         # 1. 精确匹配
-        exact_match = self.exact_search(query, all_names)
+        with SEARCH_STAGE_SECONDS.time(stage='exact'):
+            exact_match = self.exact_search(query, names)
         if exact_match:
             return exact_match
 
-        # 2. 模糊匹配
-        fuzzy_match = self.fuzzy_search(query, all_names)
+        # 2. 拼音匹配（拼音、首字母或同音字，查表命中）
+        # 不含汉字的查询先查拼音表，命中时省去模糊匹配对全部名称的相似度计算；
+        # 含汉字的查询先做模糊匹配，同音字只兜底字面上对不上的查询
+        latin = not has_cjk(normalize_text(query))
+        if latin:
+            phonetic_match = self._timed_phonetic_search(query)
+            if phonetic_match:
+                return phonetic_match
+
+        # 3. 模糊匹配
+        with SEARCH_STAGE_SECONDS.time(stage='fuzzy'):
+            fuzzy_match = self.fuzzy_search(query, names)
         if fuzzy_match:
             return fuzzy_match
 
-        # 3. 未找到
+        if not latin:
+            phonetic_match = self._timed_phonetic_search(query)
+            if phonetic_match:
+                return phonetic_match
+
+        # 4. 未找到
         return {
             'found': False,
             'message': f'未找到与 "{query}" 相关的职业信息'
         }
 
-    def exact_search(self, query, all_names):
-        """精确搜索"""
-        if query in all_names:
-            occupation_info = self.data_handler.get_occupation_info(query)
+    def _cache_get(self, key):
+        if Config.SEARCH_CACHE_SIZE <= 0:
+            return None
+        try:
+            result = self._cache[key]
+            self._cache.move_to_end(key)
+        except KeyError:
+            SEARCH_CACHE.inc(result='miss')
+            return None
+        SEARCH_CACHE.inc(result='hit')
+        return result
+
+    def _cache_put(self, key, result):
+        if Config.SEARCH_CACHE_SIZE <= 0:
+            return
+        self._cache[key] = result
+        while len(self._cache) > Config.SEARCH_CACHE_SIZE:
+            try:
+                self._cache.popitem(last=False)
+            except KeyError:
+                break
+
+    def exact_search(self, query, names):
+        """精确搜索（比较归一化后的名称）"""
+        name = names.lookup.get(normalize_text(query))
+        if name is not None:
+            occupation_info = self.data_handler.get_occupation_info(name)
             status_emoji = {
                 'Occupied': '🔒',
                 'Hold': '⏸️',
@@ -54,15 +161,57 @@ class SearchEngine:
             }
         return None
 
-    def fuzzy_search(self, query, all_names):
+    def _timed_phonetic_search(self, query):
+        with SEARCH_STAGE_SECONDS.time(stage='phonetic'):
+            return self.phonetic_search(query)
+
+    def phonetic_search(self, query):
+        """
+        拼音搜索：查询词的拼音键在 DataHandler 加载时生成的拼音索引中查找
+        只对应一个职业时视为找到；多个同音职业时不替玩家选，列出全部候选（candidates）
+        """
+        phonetic_index = self.data_handler.phonetic_index
+        if not phonetic_index:
+            return None
+        names = [name for name in phonetic_lookup(phonetic_index, query)
+                 if self.data_handler.get_occupation_info(name) is not None]
+        if not names:
+            return None
+        if len(names) > 1:
+            return {
+                'found': False,
+                'message': f'"{query}" 按拼音对应多个职业：{"、".join(names)}',
+                'candidates': names
+            }
+
+        occupation_info = self.data_handler.get_occupation_info(names[0])
+        status_emoji = {
+            'Occupied': '🔒',
+            'Hold': '⏸️',
+            'Available': '✅',
+            '': '❓'
+        }
+        emoji = status_emoji.get(occupation_info['status'], '❓')
+
+        return {
+            'found': True,
+            'match_type': 'phonetic',
+            'message': f'{emoji} 按拼音找到职业：{occupation_info["occupation"]} - 状态：{occupation_info["chinese_status"]}',
+            'data': occupation_info
+        }
+
+    def fuzzy_search(self, query, names):
         """模糊搜索"""
+        from fuzzywuzzy import fuzz  # 首次模糊匹配时才导入，不拖慢启动
+
         best_matches = []
+        query = normalize_text(query)
 
         # 使用fuzzywuzzy进行模糊匹配
-        for name in all_names:
-            ratio = fuzz.ratio(query, name)
-            partial_ratio = fuzz.partial_ratio(query, name)
-            token_ratio = fuzz.token_sort_ratio(query, name)
+        for name, normalized in zip(names.names, names.normalized):
+            ratio = fuzz.ratio(query, normalized)
+            partial_ratio = fuzz.partial_ratio(query, normalized)
+            token_ratio = fuzz.token_sort_ratio(query, normalized)
 
             # 取最高的相似度
             max_ratio = max(ratio, partial_ratio, token_ratio)
@@ -96,7 +245,9 @@ class SearchEngine:
         return None
 
     def get_suggestions(self, query, max_suggestions=3):
-        """获取搜索建议"""
-        all_names = self.data_handler.get_all_searchable_names()
-        suggestions = get_close_matches(query, all_names, n=max_suggestions, cutoff=0.6)
+        """获取搜索建议（查预先构建的 SymSpell 删除字典，不逐个名称比较）"""
+        with SEARCH_STAGE_SECONDS.time(stage='suggestions'):
+            names = self._searchable_names()
+            matches = names.suggestions.lookup(query, limit=max_suggestions, cutoff=0.6)
+            suggestions = [names.lookup[match] for match in matches]
         return suggestions
\ No newline at end of file
@@ -5,8 +5,12 @@ document.addEventListener('DOMContentLoaded', function() {
     const result = document.getElementById('result');
     const statsInfo = document.getElementById('statsInfo');
     
+    // 当前显示的职业对应的键（与 /changes 推送中的 key 相同）
+    let currentKey = null;
+    
     // 初始化
     loadStats();
+    subscribeChanges();
     
     // 搜索按钮点击事件
     searchBtn.addEventListener('click', performSearch);
@@ -61,6 +65,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // 显示成功结果
     function showSuccessResult(data) {
+        currentKey = data.data ? data.data.key : null;
         let html = `<div class="main-message">${data.message}</div>`;
         
         if (data.data) {
@@ -70,6 +75,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 html += '<strong>✓ 精确匹配</strong>';
             } else if (data.data.match_type === 'fuzzy') {
                 html += `<strong>~ 模糊匹配</strong>`;
+            } else if (data.data.match_type === 'phonetic') {
+                html += `<strong>♪ 拼音匹配</strong>`;
             }
             
             if (data.data.has_aliases) {
@@ -98,6 +105,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // 显示错误结果
     function showErrorResult(data) {
+        currentKey = null;
         let html = `<div class="main-message">${data.message}</div>`;
         
         if (data.suggestions && data.suggestions.length > 0) {
@@ -158,6 +166,37 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // 订阅数据变更：当前显示的职业状态变化或被删除时直接更新结果，不必重新搜索
+    function subscribeChanges() {
+        if (!window.EventSource) return;
+        const changes = new EventSource('/changes');
+        
+        changes.addEventListener('delta', event => {
+            const delta = JSON.parse(event.data);
+            loadStats();
+            const change = delta.changes.find(c => c.key === currentKey);
+            if (!change) return;
+            
+            if (change.op === 'delete') {
+                currentKey = null;
+                showResult('<div class="main-message">该职业已从列表中移除，请重新搜索</div>', 'error');
+                return;
+            }
+            const badge = result.querySelector('.status-badge');
+            if (badge) {
+                badge.className = `status-badge ${getStatusClass(change.status)}`;
+                badge.textContent = `状态: ${change.chinese_status}`;
+            }
+        });
+        
+        // 错过的变更太多时服务端发送 reset，重新搜索当前内容
+        changes.addEventListener('reset', () => {
+            if (currentKey && searchInput.value.trim()) {
+                performSearch();
+            }
+        });
+    }
+    
     // 输入框获得焦点时清空结果
     searchInput.addEventListener('focus', function() {
         if (result.classList.contains('error') || result.classList.contains('suggestions')) {
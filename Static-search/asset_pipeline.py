@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态资源发布流水线
+压缩页面代码，将数据拆成带内容指纹的分片，并生成 .gz / .br 预压缩文件
+数据更新时只有内容变化的分片文件名会改变，回访用户只需重新下载这些分片
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只生成 .gz
+    brotli = None
+
+DATA_DIR = 'data'
+
+
+# 内容必须原样保留的元素：脚本（模板字符串、内联数据）、预格式文本、文本框
+RAW_BLOCK = re.compile(r'(<(script|pre|textarea)\b[^>]*>.*?</\2\s*>)', flags=re.S | re.I)
+
+
+def minify_html(html: str) -> str:
+    """
+    保守的压缩：只去掉标记与样式中的行首缩进、行尾空白和空行，换行保留为一个空白字符，渲染结果不变
+    <script> / <pre> / <textarea> 原样保留，注释也不删除（脚本中的 // 行可能是字符串内容）
+    """
+    parts = RAW_BLOCK.split(html)
+    # split 每三项为：标记、原样块、标签名
+    for i in range(0, len(parts), 3):
+        parts[i] = re.sub(r'[ \t]*\n\s*', '\n', parts[i])
+    return ''.join(part for i, part in enumerate(parts) if i % 3 != 2).strip()
+
+
+def fingerprint(content: bytes, length: int = 8) -> str:
+    """内容哈希，用于文件名"""
+    return hashlib.sha256(content).hexdigest()[:length]
+
+
+def write_precompressed(path: str, content: bytes) -> dict:
+    """写入原文件及其 .gz / .br 预压缩版本，返回各版本大小"""
+    with open(path, 'wb') as f:
+        f.write(content)
+    sizes = {'raw': len(content)}
+
+    gz_content = gzip.compress(content, compresslevel=9, mtime=0)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gz_content)
+    sizes['gz'] = len(gz_content)
+
+    if brotli is not None:
+        br_content = brotli.compress(content, quality=11)
+        with open(path + '.br', 'wb') as f:
+            f.write(br_content)
+        sizes['br'] = len(br_content)
+
+    return sizes
+
+
+def build_dist(processor, template_path: str, dist_dir: str, shard_count: int = 8) -> list:
+    """
+    生成可部署目录：
+    - dist/index.html      压缩后的页面，只内联分片清单
+    - dist/data/*.json     带内容指纹的数据分片，可长期缓存
+    返回每个资源的大小报告
+    """
+    data_dir = os.path.join(dist_dir, DATA_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+
+    report = []
+    manifest = []
+    written = set()
+
+    for name, (key, data) in processor.split_data_shards(shard_count).items():
+        with processor.stage('serialize'):
+            content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        filename = f'{name}.{fingerprint(content)}.json'
+        with processor.stage('write'):
+            sizes = write_precompressed(os.path.join(data_dir, filename), content)
+
+        manifest.append({'key': key, 'url': f'{DATA_DIR}/{filename}'})
+        written.add(filename)
+        report.append((f'{DATA_DIR}/{filename}', sizes))
+
+    # 清理上次构建留下的旧分片
+    for filename in os.listdir(data_dir):
+        base = re.sub(r'\.(gz|br)$', '', filename)
+        if base.endswith('.json') and base not in written:
+            os.remove(os.path.join(data_dir, filename))
+
+    placeholder = {
+        'hashes': {},
+        'fuzzy_map': {},
+        'prefix_trie': {'order': [], 'nodes': {}},
+        'total_count': processor.processed_data['total_count']
+    }
+    html_content = minify_html(processor.render_html(template_path, placeholder, manifest))
+    with processor.stage('write'):
+        sizes = write_precompressed(os.path.join(dist_dir, 'index.html'), html_content.encode('utf-8'))
+    report.insert(0, ('index.html', sizes))
+
+    return report
+
+
+def print_size_report(report: list):
+    """打印每个资源的原始/压缩后大小"""
+    def fmt(size):
+        return f'{size / 1024:.1f} KB' if size is not None else '-'
+
+    print(f"{'资源':<40}{'原始':>12}{'gzip':>12}{'brotli':>12}")
+    total = {'raw': 0, 'gz': 0, 'br': 0}
+    for name, sizes in report:
+        print(f"{name:<40}{fmt(sizes['raw']):>12}{fmt(sizes['gz']):>12}{fmt(sizes.get('br')):>12}")
+        for key in total:
+            total[key] += sizes.get(key, 0)
+    print(f"{'合计':<40}{fmt(total['raw']):>12}{fmt(total['gz']):>12}"
+          f"{fmt(total['br'] if brotli is not None else None):>12}")
+    if brotli is None:
+        print("提示：未安装 brotli，已跳过 .br 文件（pip install brotli）")
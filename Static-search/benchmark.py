@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态页面搜索基准
+用 DataProcessor 构建模拟才能表（或 --file 指定的数据源），得到三种产物：
+    memory  内存中的 processed_data（参照结果）
+    inline  generate_static_html 生成的内联数据页面
+    dist    build_dist 生成的压缩页面 + 指纹分片
+按 Zipf 分布回放查询（精确 / 别称 / 拼音 / 前缀 / 错字 / 不存在），在每种产物上运行 client_search 移植的页面搜索逻辑，
+报告与参照结果的一致率、查找开销、延迟分位数、加载耗时与传输体积
+--baseline 可加入已部署的页面（例如上一版的 index.html），发布前核对新的构建是否改变了搜索结果
+
+延迟是 Python 移植版的耗时，只用于横向比较格式与数据规模；开销计数（哈希查找、扫描条目、编辑距离格子）与运行环境无关
+
+用法：
+    python benchmark.py
+    python benchmark.py --sizes 1000 10000 --queries 500
+    python benchmark.py --file 才能表.xlsx --baseline ../deploy/index.html --json bench.json
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import talent_path  # 共享索引库 talent_index，需在其他模块之前导入
+from asset_pipeline import build_dist
+from build import detect_source_type
+from client_search import ClientSearch, load_page, page_data, page_files
+from data_processor import DataProcessor
+from talent_index import phonetic_keys
+from talent_index.sample import generate_sheet, make_typo, percentile, random_cjk
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template.html')
+
+# 查询类型及其占比；没有别称 / 拼音键的条目退回精确查询
+QUERY_MIX = {'exact': 0.45, 'alias': 0.15, 'pinyin': 0.1, 'prefix': 0.1, 'typo': 0.1, 'miss': 0.1}
+COST_KEYS = ('lookups', 'scanned', 'cells')
+
+
+def build_queries(data, count, seed=0, zipf_s=1.1):
+    """从页面数据中取名称与别称，按 Zipf 分布挑选热门条目，再按 QUERY_MIX 生成查询 [(类型, 查询词)]"""
+    rng = random.Random(seed)
+    entries = [entry for entry in data['hashes'].values() if not entry.get('is_alias')]
+    weights = [1 / (rank + 1) ** zipf_s for rank in range(len(entries))]
+    kinds = list(QUERY_MIX)
+
+    queries = []
+    for kind, row in zip(rng.choices(kinds, [QUERY_MIX[k] for k in kinds], k=count),
+                         rng.choices(range(len(entries)), weights, k=count)):
+        name = entries[row]['main_name']
+        aliases = entries[row].get('aliases') or []
+        keys = phonetic_keys(name) if kind == 'pinyin' else []
+        if (kind == 'alias' and not aliases) or (kind == 'pinyin' and not keys):
+            kind = 'exact'
+        if kind == 'exact':
+            query = name
+        elif kind == 'alias':
+            query = rng.choice(aliases)
+        elif kind == 'pinyin':
+            query = rng.choice(keys)
+        elif kind == 'prefix':
+            query = name[:max(2, len(name) // 2)]
+        elif kind == 'typo':
+            query = make_typo(rng, name)
+        else:
+            query = random_cjk(rng, 3, 6) + '？'
+        queries.append((kind, query.strip() or name))
+    return queries
+
+
+def payload_sizes(paths):
+    """各文件原始大小与 gzip -9 压缩后大小之和（字节）"""
+    raw = gz = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        raw += len(content)
+        gz += len(gzip.compress(content, compresslevel=9, mtime=0))
+    return {'raw': raw, 'gz': gz}
+
+
+def timed_load(path):
+    """读取页面（及分片）并解析 JSON，返回 (数据, 毫秒)"""
+    start = time.perf_counter()
+    data = load_page(path)
+    return data, (time.perf_counter() - start) * 1000
+
+
+def build_formats(processor, workdir, shard_count, baseline=None):
+    """生成各格式的产物，返回 {格式: {'data', 'load_ms', 'payload'}}"""
+    formats = {'memory': {'data': page_data(processor.processed_data), 'load_ms': None, 'payload': None}}
+
+    inline_path = os.path.join(workdir, 'index.html')
+    processor.generate_static_html(TEMPLATE_PATH, inline_path)
+    data, load_ms = timed_load(inline_path)
+    formats['inline'] = {'data': data, 'load_ms': load_ms, 'payload': payload_sizes([inline_path])}
+
+    dist_dir = os.path.join(workdir, 'dist')
+    build_dist(processor, TEMPLATE_PATH, dist_dir, shard_count)
+    dist_page = os.path.join(dist_dir, 'index.html')
+    data, load_ms = timed_load(dist_page)
+    # 首屏只需页面本身，分片在页面加载后并行下载
+    formats['dist'] = {'data': data, 'load_ms': load_ms, 'payload': payload_sizes(page_files(dist_page)),
+                       'first_paint': payload_sizes([dist_page])}
+
+    if baseline:
+        data, load_ms = timed_load(baseline)
+        formats['baseline'] = {'data': data, 'load_ms': load_ms, 'payload': payload_sizes(page_files(baseline))}
+    return formats
+
+
+def replay(searcher, queries, max_seconds=None):
+    """依次回放查询，返回 (结果列表, 延迟与开销汇总)；超过 max_seconds 后停止"""
+    deadline = time.perf_counter() + max_seconds if max_seconds else None
+    results, samples = [], []
+    for kind, query in queries:
+        if deadline and time.perf_counter() > deadline:
+            break
+        cost = {}
+        start = time.perf_counter()
+        results.append(searcher.search(query, cost))
+        samples.append((kind, (time.perf_counter() - start) * 1000, cost))
+
+    def summarize(selected):
+        latencies = sorted(latency for _, latency, _ in selected)
+        summary = {
+            'count': len(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+        }
+        for key in COST_KEYS:
+            summary[key] = sum(cost.get(key, 0) for _, _, cost in selected) / len(selected) if selected else 0
+        return summary
+
+    summary = summarize(samples)
+    summary['by_kind'] = {kind: summarize([s for s in samples if s[0] == kind]) for kind in QUERY_MIX}
+    return results, summary
+
+
+def compare(reference, results, queries, show=5):
+    """逐条比较两组结果（只比较都已回放的查询），返回一致条数与前 show 条差异"""
+    same = 0
+    mismatches = []
+    for (kind, query), expected, actual in zip(queries, reference, results):
+        if expected == actual:
+            same += 1
+        elif len(mismatches) < show:
+            mismatches.append({'kind': kind, 'query': query, 'expected': expected, 'actual': actual})
+    return same, mismatches
+
+
+def _describe(result):
+    if result['success']:
+        return f"精确 {result['data']['main_name']}"
+    return ' / '.join(f"{m['name']}({m['type']})" for m in result['suggestions']) or '无结果'
+
+
+def print_format(name, info, summary, parity):
+    def kb(size):
+        return f'{size / 1024:.1f} KB'
+
+    line = f"  {name:<9}p50 {summary['p50']:>7.2f} ms | p99 {summary['p99']:>7.2f} ms"
+    line += f" | 查找 {summary['lookups']:.1f} 扫描 {summary['scanned']:.0f} 格子 {summary['cells']:.0f}"
+    if parity is not None:
+        same, total = parity
+        line += f" | 一致 {same}/{total}"
+    print(line)
+    if info['payload']:
+        extra = ''
+        if 'first_paint' in info:
+            extra = f"（首屏 {kb(info['first_paint']['raw'])} / gzip {kb(info['first_paint']['gz'])}）"
+        print(f"  {'':<9}加载 {info['load_ms']:.1f} ms | 体积 {kb(info['payload']['raw'])} / "
+              f"gzip {kb(info['payload']['gz'])}{extra}")
+
+
+def run_case(label, processor, args):
+    """对一份已加载的数据构建全部格式并回放查询"""
+    workdir = tempfile.mkdtemp(prefix='static-bench-')
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+        formats = build_formats(processor, workdir, args.shards, args.baseline)
+    print(f"=== {label}：{processor.processed_data['total_count']} 条，"
+          f"哈希 {len(processor.processed_data['hashes'])} 个（产物位于 {workdir}）===")
+
+    queries = build_queries(formats['memory']['data'], args.queries, args.seed, args.zipf)
+    reference = None
+    case = {'label': label, 'total_count': processor.processed_data['total_count'], 'formats': {}}
+    for name, info in formats.items():
+        results, summary = replay(ClientSearch(info['data']), queries, args.max_seconds)
+        parity = mismatches = None
+        if reference is None:
+            reference = results
+        else:
+            same, mismatches = compare(reference, results, queries)
+            parity = (same, min(len(reference), len(results)))
+        print_format(name, info, summary, parity)
+        for mismatch in mismatches or []:
+            print(f"    ❌ [{mismatch['kind']}] {mismatch['query']}: "
+                  f"{_describe(mismatch['expected'])} -> {_describe(mismatch['actual'])}")
+
+        case['formats'][name] = {'load_ms': info['load_ms'], 'payload': info['payload'],
+                                 'first_paint': info.get('first_paint'), 'search': summary,
+                                 'parity': parity, 'mismatches': mismatches}
+
+    by_kind = case['formats']['memory']['search']['by_kind']
+    print('  ' + ' | '.join(f"{kind} {stats['p50']:.2f} ms" for kind, stats in by_kind.items() if stats['count']))
+    print()
+    return case
+
+
+def load_processor(sources, verbose=False):
+    processor = DataProcessor()
+    with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+        if not processor.load_sources(sources):
+            return None
+    return processor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='静态页面搜索基准：各输出格式的结果一致性、查找开销与体积')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='模拟表格行数')
+    parser.add_argument('--file', type=str, nargs='+', help='改用真实数据源（Excel / Google Sheets URL / .tidx）')
+    parser.add_argument('--baseline', type=str, help='已部署的页面（index.html），与本次构建的结果比较')
+    parser.add_argument('--queries', type=int, default=500, help='每档回放的查询数')
+    parser.add_argument('--shards', type=int, default=8, help='dist 格式的分片数')
+    parser.add_argument('--zipf', type=float, default=1.1, help='查询热度的 Zipf 指数')
+    parser.add_argument('--max-seconds', type=float, default=60, help='每个格式的最长回放时间（秒）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', type=str, help='将结果写入 JSON 文件')
+    parser.add_argument('--verbose', action='store_true', help='显示构建过程的输出')
+    args = parser.parse_args()
+
+    report = []
+    if args.file:
+        processor = load_processor([(detect_source_type(path), path) for path in args.file], args.verbose)
+        if processor is None:
+            print("❌ 数据加载失败")
+            return 1
+        report.append(run_case(', '.join(os.path.basename(path) for path in args.file), processor, args))
+    else:
+        for size in args.sizes:
+            path = os.path.join(tempfile.mkdtemp(prefix='static-bench-'), f'bench{size}.xlsx')
+            generate_sheet(size, args.seed, keywords=True).to_excel(path, index=False)
+            processor = load_processor([('excel', path)], args.verbose)
+            if processor is None:
+                print("❌ 数据加载失败")
+                return 1
+            report.append(run_case(f'{size} 行', processor, args))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.json}")
+
+    failed = [case['label'] for case in report
+              if any(f['parity'] and f['parity'][0] < f['parity'][1] for f in case['formats'].values())]
+    if failed:
+        print(f"❌ 结果不一致：{', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,27 +10,35 @@
 import os
 import sys
 import argparse
+import talent_path  # 共享索引库 talent_index，需在其他模块之前导入
 from data_processor import DataProcessor
+from asset_pipeline import build_dist, print_size_report
 
 
-def auto_detect_source():
-    """自动检测数据源"""
-    excel_files = [f for f in os.listdir('.') if f.endswith(('.xlsx', '.xls'))]
+def detect_source_type(path):
+    """根据路径判断数据源类型"""
+    if path.startswith(('http://', 'https://')):
+        return 'sheets'
+    if path.endswith('.tidx'):
+        return 'index'
+    return 'excel'
 
-    if excel_files:
-        return 'excel', excel_files[0]
 
-    # 检查是否有配置文件包含Google Sheets URL
+def auto_detect_sources():
+    """自动检测数据源：当前目录下的全部Excel文件，以及config.txt中的Google Sheets URL（每行一个）"""
+    sources = [('excel', f) for f in sorted(os.listdir('.')) if f.endswith(('.xlsx', '.xls'))]
+
     if os.path.exists('config.txt'):
         try:
             with open('config.txt', 'r', encoding='utf-8') as f:
-                url = f.read().strip()
-                if 'docs.google.com/spreadsheets' in url:
-                    return 'sheets', url
+                for line in f:
+                    url = line.strip()
+                    if 'docs.google.com/spreadsheets' in url:
+                        sources.append(('sheets', url))
         except:
             pass
 
-    return None, None
+    return sources
 
 
 def create_template():
@@ -46,11 +54,18 @@ def create_template():
 
 def main():
     parser = argparse.ArgumentParser(description='一键构建静态职业查询网页')
-    parser.add_argument('--source', choices=['excel', 'sheets', 'auto'], default='auto',
+    parser.add_argument('--source', choices=['excel', 'sheets', 'index', 'auto'], default='auto',
                         help='数据源类型（auto为自动检测）')
-    parser.add_argument('--file', type=str, help='Excel文件路径或Google Sheets URL')
+    parser.add_argument('--file', type=str, nargs='+', help='Excel文件、Google Sheets URL 或 .tidx 索引文件（可多个，合并为一个索引）')
+    parser.add_argument('--workers', type=int, help='并发读取数据源的最大线程/进程数')
     parser.add_argument('--output', type=str, default='index.html', help='输出文件名')
     parser.add_argument('--debug', action='store_true', help='生成调试信息')
+    parser.add_argument('--dist', type=str, help='额外生成可部署目录（压缩页面、指纹分片、.gz/.br 预压缩）')
+    parser.add_argument('--shards', type=int, default=8, help='--dist 模式下 hashes/fuzzy_map 的分片数')
+    parser.add_argument('--profile', action='store_true', help='统计各阶段耗时，结果写入 _debug.json')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='另外开启 tracemalloc 再构建一遍，统计各阶段内存峰值（不影响计时）')
+    parser.add_argument('--profile-out', type=str, help='同时运行 cProfile 并将 pstats 结果保存到此文件')
 
     args = parser.parse_args()
 
@@ -61,34 +76,33 @@ def main():
         return 1
 
     # 确定数据源
-    if args.source == 'auto':
-        source_type, source_path = auto_detect_source()
-        if not source_type:
+    if args.file:
+        sources = [(detect_source_type(path) if args.source == 'auto' else args.source, path) for path in args.file]
+    elif args.source == 'auto':
+        sources = auto_detect_sources()
+        if not sources:
             print("❌ 未找到数据源！")
             print("请执行以下操作之一：")
             print("1. 将Excel文件(.xlsx/.xls)放在当前目录")
-            print("2. 创建config.txt文件，内容为Google Sheets的URL")
+            print("2. 创建config.txt文件，内容为Google Sheets的URL（每行一个）")
             print("3. 使用 --file 参数手动指定数据源")
             return 1
     else:
-        source_type = args.source
-        source_path = args.file
-        if not source_path:
-            print("❌ 请使用 --file 参数指定数据源路径")
-            return 1
+        print("❌ 请使用 --file 参数指定数据源路径")
+        return 1
 
-    print(f"📊 检测到数据源: {source_type}")
-    print(f"📁 数据路径: {source_path}")
+    print(f"📊 检测到 {len(sources)} 个数据源:")
+    for source_type, source_path in sources:
+        print(f"📁 [{source_type}] {source_path}")
     print()
 
     # 创建处理器并加载数据
     processor = DataProcessor(debug=args.debug)
+    if args.profile or args.profile_out or args.profile_memory:
+        processor.start_profiling(cprofile=bool(args.profile_out))
 
     print("🔄 正在加载数据...")
-    if source_type == 'excel':
-        success = processor.load_from_excel(source_path)
-    else:
-        success = processor.load_from_google_sheets(source_path)
+    success = processor.load_sources(sources, max_workers=args.workers)
 
     if not success:
         print("❌ 数据加载失败")
@@ -106,8 +120,25 @@ def main():
     print("✅ 静态网页生成成功")
     print()
 
+    # 生成预压缩的部署目录
+    if args.dist:
+        print(f"🔄 正在生成部署目录 {args.dist} ...")
+        report = build_dist(processor, 'template.html', args.dist, args.shards)
+        print_size_report(report)
+        print()
+
+    # 性能分析结果
+    if processor.profile:
+        processor.stop_profiling(args.profile_out)
+        if args.profile_memory:
+            print("🔄 正在单独构建一遍以统计内存峰值...")
+            processor.profile_memory(sources, 'template.html', max_workers=args.workers)
+        print("⏱️  构建阶段耗时：")
+        processor.print_profile_report()
+        print()
+
     # 生成调试信息
-    if args.debug:
+    if args.debug or processor.profile:
         debug_file = args.output.replace('.html', '_debug.json')
         processor.save_debug_info(debug_file)
         print(f"🔍 调试信息已保存到: {debug_file}")
@@ -116,6 +147,8 @@ def main():
     print("=" * 50)
     print("🎉 构建完成！")
     print(f"📄 输出文件: {args.output}")
+    if args.dist:
+        print(f"📦 部署目录: {args.dist}")
     print(f"📊 总数据量: {processor.processed_data['total_count']} 条记录")
     print(f"🔐 哈希条目: {len(processor.processed_data['hashes'])} 个")
     print()
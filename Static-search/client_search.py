@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态页面搜索逻辑的 Python 参考实现
+逐行移植 template.html 中的 searchInData / prefixLookup / calculateSimilarity，直接读取 DataProcessor 产出的数据：
+内存中的 processed_data、内联数据的 index.html、或 build.py --dist 生成的目录（分片清单 + data/*.json）
+返回值与页面的 searchInData 相同，构建后即可离线核对结果、统计查找开销；修改页面搜索逻辑时需同步修改此处
+
+与浏览器保持一致的细节：
+- hashes 的键都是 32 位以内的非负整数字符串，JavaScript 遍历对象时按数值升序而不是插入顺序
+- 字符串长度与编辑距离按 UTF-16 码元计算（BMP 以外的字符算两个）
+"""
+
+import json
+import os
+
+try:
+    from rapidfuzz.distance import Levenshtein
+except ImportError:  # 未安装 rapidfuzz 时使用纯 Python 的编辑距离
+    Levenshtein = None
+
+import talent_path  # 共享索引库 talent_index（直接运行本脚本时需要）
+from talent_index import normalize_text, simple_hash
+from talent_index.phonetic import compact
+
+DATA_KEYS = ('hashes', 'fuzzy_map', 'prefix_trie', 'total_count')
+SUGGESTION_LIMIT = 8
+SIMILARITY_CUTOFF = 0.6
+
+
+def page_data(processed_data: dict) -> dict:
+    """processed_data 中注入页面的部分（与 generate_static_html 相同）"""
+    return {key: processed_data[key] for key in DATA_KEYS}
+
+
+def _read_js_value(html: str, name: str, required: bool = True):
+    """读取页面中 const NAME = <JSON>; 的值"""
+    marker = f'const {name} = '
+    start = html.find(marker)
+    if start < 0:
+        if not required:
+            return None
+        raise ValueError(f"页面中没有 {name}")
+    try:
+        value, _ = json.JSONDecoder().raw_decode(html, start + len(marker))
+    except json.JSONDecodeError:
+        raise ValueError(f"{name} 不是构建后的数据（是否传入了未注入数据的模板？）")
+    return value
+
+
+def page_files(path: str) -> list:
+    """页面本身及其引用的全部分片文件路径（浏览器打开页面要下载的数据）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        shards = _read_js_value(f.read(), 'DATA_SHARDS', required=False)
+    base = os.path.dirname(os.path.abspath(path))
+    return [path] + [os.path.join(base, shard['url']) for shard in shards or []]
+
+
+def load_page(path: str) -> dict:
+    """
+    读取构建好的页面，返回页面搜索时看到的 ENCRYPTED_DATA
+    DATA_SHARDS 不为 null 时按 loadDataShards 的方式读取同目录下的分片并合并
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    data = _read_js_value(html, 'ENCRYPTED_DATA')
+    # 加入分片之前构建的页面没有 DATA_SHARDS
+    shards = _read_js_value(html, 'DATA_SHARDS', required=False)
+
+    base = os.path.dirname(os.path.abspath(path))
+    for shard in shards or []:
+        with open(os.path.join(base, shard['url']), 'r', encoding='utf-8') as f:
+            part = json.load(f)
+        if shard['key'] == 'prefix_trie':
+            data['prefix_trie'] = part
+        else:
+            data[shard['key']].update(part)
+    return data
+
+
+def js_length(text: str) -> int:
+    """JavaScript 的 String.length"""
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+def _code_units(text: str):
+    """BMP 内的字符串原样返回，否则拆成 UTF-16 码元序列（编辑距离按码元计算）"""
+    if len(text) == js_length(text):
+        return text
+    raw = text.encode('utf-16-le')
+    return [int.from_bytes(raw[i:i + 2], 'little') for i in range(0, len(raw), 2)]
+
+
+def _base36(value: int) -> str:
+    """与页面的 Number.prototype.toString(36) 相同（非负整数）"""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    key = ''
+    while True:
+        value, rem = divmod(value, 36)
+        key = digits[rem] + key
+        if value == 0:
+            return key
+
+
+def edit_distance(a, b) -> int:
+    """标准 Levenshtein 距离（与页面的 calculateSimilarity 相同，不计相邻交换）"""
+    if Levenshtein is not None:
+        return Levenshtein.distance(a, b)
+    previous = list(range(len(a) + 1))
+    for i in range(1, len(b) + 1):
+        current = [i] + [0] * len(a)
+        for j in range(1, len(a) + 1):
+            if b[i - 1] == a[j - 1]:
+                current[j] = previous[j - 1]
+            else:
+                current[j] = min(previous[j - 1], current[j - 1], previous[j]) + 1
+        previous = current
+    return previous[-1]
+
+
+def calculate_similarity(a: str, b: str) -> float:
+    """(较长者长度 - 编辑距离) / 较长者长度；与页面一致，一方为空时返回另一方的长度"""
+    return _similarity(_code_units(a), _code_units(b))
+
+
+def _similarity(a, b) -> float:
+    if isinstance(a, str) != isinstance(b, str):
+        # 只有一方含 BMP 以外的字符时，另一方也转成码元序列再比较
+        a = [ord(c) for c in a] if isinstance(a, str) else a
+        b = [ord(c) for c in b] if isinstance(b, str) else b
+    if len(a) == 0:
+        return len(b)
+    if len(b) == 0:
+        return len(a)
+    max_len = max(len(a), len(b))
+    return (max_len - edit_distance(a, b)) / max_len
+
+
+def chinese_status(status) -> str:
+    """页面的 getChineseStatus"""
+    return status if status in ('Available', 'Occupied', 'Hold') else '未知'
+
+
+class ClientSearch:
+    """
+    对一份 ENCRYPTED_DATA 执行页面的搜索流程
+    search 的 cost 参数传入字典时累加本次查找的开销，与运行环境无关，可用来比较不同数据格式：
+        lookups  哈希表查找次数（hashes / fuzzy_map / 前缀节点）
+        scanned  两轮全表扫描遍历的条目数
+        cells    编辑距离的动态规划格子数
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.hashes = data['hashes']
+        self.fuzzy_map = data['fuzzy_map']
+        self.prefix_trie = data.get('prefix_trie')
+        # 全表扫描的遍历顺序与浏览器相同；别称条目只计入扫描数，不参与匹配
+        self._scan = []
+        for _, entry in sorted(self.hashes.items(), key=lambda item: int(item[0])):
+            if not entry.get('is_alias'):
+                name_lower = entry['main_name'].lower()
+                self._scan.append((entry['main_name'], name_lower, _code_units(name_lower)))
+
+    @staticmethod
+    def _count(cost, key, amount=1):
+        if cost is not None:
+            cost[key] = cost.get(key, 0) + amount
+
+    def prefix_lookup(self, query: str, limit: int, cost: dict = None) -> list:
+        """从最长前缀开始查找已记录的区间，再用名称校验（哈希冲突时继续回退）"""
+        trie = self.prefix_trie
+        query_lower = normalize_text(query)
+        if not trie or not query_lower:
+            return []
+
+        for length in range(len(query_lower), 0, -1):
+            self._count(cost, 'lookups')
+            node = trie['nodes'].get(_base36(int(simple_hash(query_lower[:length]))))
+            if node is None:
+                continue
+            ranges = [node, node + 1] if isinstance(node, int) else node
+
+            names = []
+            for r in range(0, len(ranges), 2):
+                for i in range(ranges[r], ranges[r + 1]):
+                    if len(names) >= limit:
+                        break
+                    self._count(cost, 'lookups')
+                    data = self.hashes.get(trie['order'][i])
+                    if data and not data.get('is_alias') and normalize_text(data['main_name']).startswith(query_lower):
+                        names.append(data['main_name'])
+            if names:
+                return names
+        return []
+
+    def search(self, query: str, cost: dict = None) -> dict:
+        """页面的 searchInData；query 为输入框内容（页面在调用前已去掉首尾空白）"""
+        query_hash = simple_hash(query)
+        query_lower = normalize_text(query)
+
+        # 1. 精确匹配
+        self._count(cost, 'lookups')
+        data = self.hashes.get(query_hash)
+        if data:
+            display_name = data['main_name'] if data.get('is_alias') else query
+            return {
+                'success': True,
+                'message': f"找到职业才能：{display_name}",
+                'data': {
+                    'match_type': 'exact',
+                    'status': data.get('status'),
+                    'chinese_status': chinese_status(data.get('status')),
+                    'has_aliases': bool(data.get('aliases')),
+                    'main_name': data.get('main_name') or query,
+                },
+            }
+
+        # 2. 模糊匹配（fuzzy_map），原样查不到时去掉拼音分隔符再查
+        fuzzy_matches = []
+        matched = set()
+        self._count(cost, 'lookups')
+        fuzzy_hash = query_hash if query_hash in self.fuzzy_map else simple_hash(compact(query_lower))
+        if fuzzy_hash != query_hash:
+            self._count(cost, 'lookups')
+        for related_hash in self.fuzzy_map.get(fuzzy_hash, ()):
+            self._count(cost, 'lookups')
+            data = self.hashes.get(related_hash)
+            if data and not data.get('is_alias'):
+                fuzzy_matches.append({'name': data['main_name'], 'score': 0.9, 'type': 'fuzzy'})
+                matched.add(data['main_name'])
+
+        # 前缀匹配（prefix_trie）
+        if js_length(query_lower) >= 2:
+            for name in self.prefix_lookup(query, SUGGESTION_LIMIT, cost):
+                if name not in matched:
+                    fuzzy_matches.append({'name': name, 'score': 0.9, 'type': 'fuzzy'})
+                    matched.add(name)
+
+        # 3. 关键词部分匹配
+        self._count(cost, 'scanned', len(self.hashes))
+        partial_matches = []
+        for name, name_lower, _ in self._scan:
+            if (query_lower in name_lower or name_lower in query_lower) and name not in matched:
+                partial_matches.append({'name': name, 'score': 0.8, 'type': 'partial'})
+        partial_names = {match['name'] for match in partial_matches}
+
+        # 4. 相似度匹配
+        self._count(cost, 'scanned', len(self.hashes))
+        similar_matches = []
+        query_units = _code_units(query_lower)
+        for name, _, name_units in self._scan:
+            self._count(cost, 'cells', len(query_units) * len(name_units))
+            similarity = _similarity(query_units, name_units)
+            if similarity >= SIMILARITY_CUTOFF and name not in matched and name not in partial_names:
+                similar_matches.append({'name': name, 'score': similarity, 'type': 'similar'})
+
+        # 合并后按分数稳定排序（与 Array.prototype.sort 相同），最多保留 8 条
+        all_matches = fuzzy_matches + partial_matches + similar_matches
+        all_matches.sort(key=lambda match: -match['score'])
+        all_matches = all_matches[:SUGGESTION_LIMIT]
+
+        if all_matches:
+            return {'success': False, 'message': f'未找到"{query}"的精确匹配', 'suggestions': all_matches}
+        return {'success': False, 'message': f'未找到"{query}"相关的职业才能', 'suggestions': []}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='在构建好的静态页面数据上执行页面的搜索逻辑')
+    parser.add_argument('page', help='构建好的 index.html（内联数据或 --dist 目录中的页面）')
+    parser.add_argument('queries', nargs='+', help='查询词')
+    args = parser.parse_args()
+
+    searcher = ClientSearch(load_page(args.page))
+    for query in args.queries:
+        cost = {}
+        result = searcher.search(query.strip(), cost)
+        print(f"🔍 {query}: {result['message']}")
+        for match in result.get('suggestions', []):
+            print(f"    {match['name']}  {match['type']} {match['score']:.2f}")
+        print(f"    开销: {cost}")
+
+
+if __name__ == '__main__':
+    main()
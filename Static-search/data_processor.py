@@ -7,295 +7,605 @@
 
 import pandas as pd
 import json
-import re
+import os
+import io
+import time
 import argparse
+import cProfile
+import pstats
+import tracemalloc
+from collections import defaultdict
+import contextlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import jieba
-import unicodedata
 from rapidfuzz import fuzz
 
+import talent_path  # 共享索引库 talent_index（直接运行本脚本时需要）
+from talent_index import normalize_text, simple_hash, simple_hashes, hash_values, pinyin_available, phonetic_keys
+from talent_index.ingest import (EMPTY_VALUES, STATUS_MAP, STATUS_PRIORITY, read_source,
+                                 is_normalized, detect_columns, normalize_frame)
+
+
+def _reset_traced_peak(base: int) -> int:
+    """
+    重新开始统计内存峰值，返回之后读到的峰值需要加上的基数（字节）
+    tracemalloc.reset_peak 需要 Python 3.9；3.8 上清空已有记录后从零统计，把清空前仍在追踪的占用累加进基数
+    （之后释放的旧内存不会从基数中扣除，峰值只是近似值）
+    """
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+        return 0
+    base += tracemalloc.get_traced_memory()[0]
+    tracemalloc.clear_traces()
+    return base
+
 
 class DataProcessor:
-    def __init__(self, debug=False):
+    EMPTY_VALUES = EMPTY_VALUES
+    STATUS_MAP = STATUS_MAP
+    # 合并重复条目时状态取更严格者
+    STATUS_PRIORITY = STATUS_PRIORITY
+
+    def __init__(self, debug=False, profile=False):
         self.debug = debug
+        self.profile = profile
         self.processed_data = {
             'hashes': {},
             'fuzzy_map': {},
+            'prefix_trie': {'order': [], 'nodes': {}},
             'reverse_map': {},  # 用于调试，实际不会输出到前端
+            'conflicts': [],  # 多数据源合并时的冲突，仅写入调试信息
             'total_count': 0
         }
+        # 构建期间用集合去重，输出前再固化为有序列表
+        self._fuzzy_postings = defaultdict(set)
+        self._entry_sources = {}
+        self._main_hashes = {}
+        # --profile 模式下的阶段耗时与内存峰值
+        self.stage_stats = {}
+        self._profiler = None
+        self._profile_started = None
+        # 为 True 时多个本地工作簿也在本进程内读取（内存追踪需要）
+        self.in_process = False
+        # 内存追踪基数（Python 3.8 没有 tracemalloc.reset_peak 时使用）
+        self._traced_base = 0
 
     def log(self, *args, **kwargs):
         """仅在 debug 模式下输出日志"""
         if self.debug:
             print(*args, **kwargs)
 
+    @contextmanager
+    def stage(self, name: str):
+        """记录一个构建阶段的耗时（仅 profile 模式）；内存追踪开启时同时记录内存峰值"""
+        if not self.profile:
+            yield
+            return
+
+        if tracemalloc.is_tracing():
+            self._traced_base = _reset_traced_peak(self._traced_base)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.stage_stats.setdefault(name, {'seconds': 0.0, 'calls': 0, 'peak_mb': None})
+            stats['seconds'] += time.perf_counter() - start
+            stats['calls'] += 1
+            if tracemalloc.is_tracing():
+                peak_mb = (self._traced_base + tracemalloc.get_traced_memory()[1]) / 1024 / 1024
+                stats['peak_mb'] = max(stats['peak_mb'] or 0.0, peak_mb)
+
+    def start_profiling(self, cprofile: bool = False, memory: bool = False):
+        """
+        开启阶段计时，可选同时开启 cProfile
+        memory 为 True 时开启 tracemalloc 记录内存峰值；追踪本身会拖慢构建，计时用的构建不要开启，
+        内存请用 profile_memory 单独跑一遍
+        """
+        self.profile = True
+        self._profile_started = time.perf_counter()
+        if memory:
+            self._traced_base = 0
+            tracemalloc.start()
+        if cprofile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profiling(self, pstats_path: str = None):
+        """停止追踪，汇总结果；指定路径时导出 pstats 文件"""
+        summary = {
+            'total_seconds': time.perf_counter() - self._profile_started,
+            'stages': self.stage_stats,
+            'traced_peak_mb': None,
+        }
+        if tracemalloc.is_tracing():
+            # 没有 reset_peak 时每个阶段开始都会清空记录，整体峰值取各阶段峰值中的最大者
+            stage_peaks = [stats['peak_mb'] for stats in self.stage_stats.values() if stats['peak_mb'] is not None]
+            summary['traced_peak_mb'] = max([(self._traced_base + tracemalloc.get_traced_memory()[1]) / 1024 / 1024] + stage_peaks)
+            tracemalloc.stop()
+
+        try:
+            import resource
+            # Linux 下单位为 KB；只含本进程，并发解析多个工作簿的子进程不计入
+            summary['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            pass
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            if pstats_path:
+                self._profiler.dump_stats(pstats_path)
+                summary['pstats_file'] = pstats_path
+            stream = io.StringIO()
+            pstats.Stats(self._profiler, stream=stream).sort_stats('cumulative').print_stats(20)
+            summary['top_functions'] = stream.getvalue().strip().splitlines()
+
+        self.processed_data['profile'] = summary
+        return summary
+
+    def profile_memory(self, sources: list, template_path: str, **load_kwargs):
+        """
+        用开启 tracemalloc 的新处理器把同样的数据源再构建一遍，把各阶段内存峰值并入本次的 profile 结果
+        这一遍在本进程内读取全部数据源（不用进程池），子进程占用的内存也能被追踪到；耗时仍以计时那一遍为准
+        """
+        shadow = DataProcessor(debug=False)
+        shadow.in_process = True
+        shadow.start_profiling(memory=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if shadow.load_sources(sources, **load_kwargs):
+                shadow.generate_static_html(template_path, os.devnull)
+        memory = shadow.stop_profiling()
+
+        summary = self.processed_data.get('profile')
+        if summary is None:
+            return memory
+        summary['traced_peak_mb'] = memory['traced_peak_mb']
+        for name, stats in memory['stages'].items():
+            if name in summary['stages']:
+                summary['stages'][name]['peak_mb'] = stats['peak_mb']
+        return summary
+
+    def print_profile_report(self):
+        summary = self.processed_data.get('profile')
+        if not summary:
+            return
+
+        def mb(value):
+            return f'{value:.1f}' if value is not None else '-'
+
+        total = summary['total_seconds']
+        print(f"{'阶段':<14}{'耗时(秒)':>12}{'占比':>8}{'调用':>6}{'内存峰值(MB)':>16}")
+        for name, stats in summary['stages'].items():
+            share = stats['seconds'] / total * 100 if total else 0
+            print(f"{name:<14}{stats['seconds']:>12.3f}{share:>7.1f}%{stats['calls']:>6}{mb(stats['peak_mb']):>16}")
+        print(f"{'总计':<14}{total:>12.3f}")
+        if summary['traced_peak_mb'] is not None:
+            print(f"追踪内存峰值：{summary['traced_peak_mb']:.1f} MB（单独一遍构建测得，含全部数据源的解析）")
+        else:
+            print("未统计内存峰值（需要时加 --profile-memory，单独再构建一遍测量）")
+        if 'max_rss_mb' in summary:
+            print(f"进程最大常驻内存：{summary['max_rss_mb']:.1f} MB（不含并发解析多个工作簿的子进程）")
+        if 'pstats_file' in summary:
+            print(f"cProfile 结果已保存：{summary['pstats_file']}")
+
     def simple_hash(self, text: str) -> str:
         """简单哈希函数，与JavaScript版本保持一致"""
-        # 统一大小写、去空格、Unicode 归一化（NFKC）
-        text = unicodedata.normalize("NFKC", str(text)).lower().strip()
-        hash_value = 0
-        for char in text:
-            char_code = ord(char)
-            hash_value = ((hash_value << 5) - hash_value) + char_code
-            hash_value = ((hash_value + 0x80000000) % 0x100000000) - 0x80000000
-        return str(abs(hash_value))
+        return simple_hash(text)
 
     def load_from_excel(self, file_path: str, name_column: str = None, status_column: str = None,
                         aliases_column: str = None, fuzzy_column: str = None):
-        """从Excel文件加载数据"""
-        try:
-            df = pd.read_excel(file_path)
-            print(f"成功读取Excel文件：{file_path}")
-            print(f"数据行数：{len(df)}")
-            print(f"列名：{list(df.columns)}")
-
-            if not name_column:
-                name_column = self._detect_name_column(df.columns)
-            if not status_column:
-                status_column = self._detect_status_column(df.columns)
-            if not aliases_column:
-                aliases_column = self._detect_aliases_column(df.columns)
-            if not fuzzy_column:
-                fuzzy_column = self._detect_fuzzy_column(df.columns)
-
-            print(f"使用列映射：")
-            print(f"  职业名称列：{name_column}")
-            print(f"  状态列：{status_column}")
-            print(f"  别称列：{aliases_column}")
-            print(f"  模糊词列：{fuzzy_column}")
-
-            self._process_dataframe(df, name_column, status_column, aliases_column, fuzzy_column)
-
-        except Exception as e:
-            print(f"读取Excel文件失败：{e}")
-            return False
-        return True
+        """从Excel文件加载数据（读取全部工作表）"""
+        return self.load_sources([('excel', file_path)], name_column, status_column, aliases_column, fuzzy_column)
 
     def load_from_google_sheets(self, sheet_url: str, name_column: str = None, status_column: str = None,
                                 aliases_column: str = None, fuzzy_column: str = None):
         """从Google Sheets加载数据"""
+        return self.load_sources([('sheets', sheet_url)], name_column, status_column, aliases_column, fuzzy_column)
+
+    def load_sources(self, sources: list, name_column: str = None, status_column: str = None,
+                     aliases_column: str = None, fuzzy_column: str = None, max_workers: int = None):
+        """
+        一次读取多个数据源 [(类型, 路径/URL)] 并合并为一个去重后的索引
+        远程表格用线程池并发下载，多个本地工作簿用进程池并发解析，总耗时接近最慢的单个数据源
+        """
         try:
-            if '/edit' in sheet_url:
-                csv_url = sheet_url.replace('/edit#gid=', '/export?format=csv&gid=').replace('/edit',
-                                                                                             '/export?format=csv')
-            else:
-                csv_url = sheet_url
-
-            df = pd.read_csv(csv_url)
-            print(f"成功读取Google Sheets：{sheet_url}")
-            print(f"数据行数：{len(df)}")
-            print(f"列名：{list(df.columns)}")
-
-            if not name_column:
-                name_column = self._detect_name_column(df.columns)
-            if not status_column:
-                status_column = self._detect_status_column(df.columns)
-            if not aliases_column:
-                aliases_column = self._detect_aliases_column(df.columns)
-            if not fuzzy_column:
-                fuzzy_column = self._detect_fuzzy_column(df.columns)
-
-            print(f"使用列映射：")
-            print(f"  职业名称列：{name_column}")
-            print(f"  状态列：{status_column}")
-            print(f"  别称列：{aliases_column}")
-            print(f"  模糊词列：{fuzzy_column}")
-
-            self._process_dataframe(df, name_column, status_column, aliases_column, fuzzy_column)
-
+            with self.stage('load'):
+                frames = self._read_sources(sources, max_workers, name_column)
         except Exception as e:
-            print(f"读取Google Sheets失败：{e}")
+            print(f"读取数据源失败：{e}")
             return False
-        return True
 
-    def _detect_name_column(self, columns) -> str:
-        name_keywords = ['名称', 'name', '职业', 'job', 'occupation', 'title', '才能', 'talent']
-        for col in columns:
-            col_lower = str(col).lower()
-            if any(keyword in col_lower for keyword in name_keywords):
-                return col
-        return columns[0] if len(columns) > 0 else None
-
-    def _detect_status_column(self, columns) -> str:
-        status_keywords = ['状态', 'status', '情况', 'state', '可用', 'available']
-        for col in columns:
-            col_lower = str(col).lower()
-            if any(keyword in col_lower for keyword in status_keywords):
-                return col
-        for col in columns:
-            return col if col != self._detect_name_column(columns) else None
-        return None
-
-    def _detect_aliases_column(self, columns) -> str:
-        alias_keywords = ['别称', 'alias', 'aliases', '别名', 'alternative', '其他', 'other']
-        for col in columns:
-            col_lower = str(col).lower()
-            if any(keyword in col_lower for keyword in alias_keywords):
-                return col
-        return None
-
-    def _detect_fuzzy_column(self, columns) -> str:
-        fuzzy_keywords = ['模糊词', '模糊', 'fuzzy', '关键词', 'keyword', 'keywords', '标签', 'tag', 'tags']
-        for col in columns:
-            col_lower = str(col).lower()
-            if any(keyword in col_lower for keyword in fuzzy_keywords):
-                return col
-        return None
+        try:
+            for label, df in frames:
+                if df.empty:
+                    print(f"跳过空工作表：{label}")
+                    continue
 
-    def _process_dataframe(self, df: pd.DataFrame, name_column: str, status_column: str, aliases_column: str,
-                           fuzzy_column: str):
-        processed_count = 0
+                print(f"成功读取：{label}")
+                print(f"数据行数：{len(df)}")
+                print(f"列名：{list(df.columns)}")
+                if is_normalized(df):
+                    # 编译好的索引文件已清洗过，跳过列识别
+                    columns = (None, None, None, None)
+                else:
+                    columns = self._resolve_columns(df.columns, name_column, status_column, aliases_column,
+                                                    fuzzy_column)
+                self._ingest_dataframe(df, *columns, source=label)
 
-        for index, row in df.iterrows():
-            name = str(row[name_column]).strip() if pd.notna(row[name_column]) else ""
-            if not name or name.lower() in ['nan', 'none', '']:
-                continue
+            self._finalize()
+            self._report_conflicts()
 
-            status = str(row[status_column]).strip() if status_column and pd.notna(row[status_column]) else "Available"
-            status = self._normalize_status(status)
+        except Exception as e:
+            print(f"处理数据失败：{e}")
+            return False
+        return True
 
-            aliases = []
-            if aliases_column and pd.notna(row[aliases_column]):
-                aliases_str = str(row[aliases_column]).strip()
-                if aliases_str and aliases_str.lower() not in ['nan', 'none', '']:
-                    aliases = [alias.strip() for alias in re.split(r'[,，;；|/]', aliases_str) if alias.strip()]
+    def _read_sources(self, sources: list, max_workers: int = None, name_column: str = None) -> list:
+        """并发读取所有数据源，按传入顺序返回 [(来源标签, DataFrame)]"""
+        remote = [source for source in sources if source[0] == 'sheets']
+        local = [source for source in sources if source[0] != 'sheets']
 
-            fuzzy_keywords = []
-            if fuzzy_column and pd.notna(row[fuzzy_column]):
-                fuzzy_str = str(row[fuzzy_column]).strip()
-                if fuzzy_str and fuzzy_str.lower() not in ['nan', 'none', '']:
-                    fuzzy_keywords = [kw.strip() for kw in re.split(r'[,，;；|/\s]', fuzzy_str) if kw.strip()]
+        # 单个本地文件直接在线程中读取，避免进程启动开销
+        threads = ThreadPoolExecutor(max_workers=max_workers or max(len(remote) + (len(local) == 1), 1))
+        processes = threads
+        if len(local) > 1 and not self.in_process:
+            processes = ProcessPoolExecutor(max_workers=max_workers or len(local))
+        try:
+            futures = []
+            for source in sources:
+                pool = threads if source[0] == 'sheets' else processes
+                futures.append(pool.submit(read_source, *source, name_column))
+            results = [future.result() for future in futures]
+        finally:
+            threads.shutdown()
+            if processes is not threads:
+                processes.shutdown()
+
+        return [frame for result in results for frame in result]
+
+    def _resolve_columns(self, columns, name_column: str = None, status_column: str = None,
+                         aliases_column: str = None, fuzzy_column: str = None) -> tuple:
+        name_column, status_column, aliases_column, fuzzy_column = detect_columns(
+            columns, name_column, status_column, aliases_column, fuzzy_column)
+
+        print(f"使用列映射：")
+        print(f"  职业名称列：{name_column}")
+        print(f"  状态列：{status_column}")
+        print(f"  别称列：{aliases_column}")
+        print(f"  模糊词列：{fuzzy_column}")
+        return name_column, status_column, aliases_column, fuzzy_column
 
-            main_hash = self.simple_hash(name)
+    def _process_dataframe(self, df: pd.DataFrame, name_column: str, status_column: str, aliases_column: str,
+                           fuzzy_column: str):
+        self._ingest_dataframe(df, name_column, status_column, aliases_column, fuzzy_column)
+        self._finalize()
+
+    def _ingest_dataframe(self, df: pd.DataFrame, name_column: str, status_column: str, aliases_column: str,
+                          fuzzy_column: str, source: str = None):
+        # 整列处理：先清洗、归一化、切分，再统一建立映射，避免逐行 iterrows
+        with self.stage('normalize'):
+            frame = normalize_frame(df, name_column, status_column, aliases_column, fuzzy_column)
+            # 前端只区分三种状态，未知状态按可用处理
+            frame['status'] = frame['status'].replace('', 'Available')
+            fuzzy_keywords = frame['keywords']
+
+        with self.stage('hash'):
+            frame['main_hash'] = self._hash_column(frame['name'])
+            alias_hash_map = self._hash_lookup(alias for aliases in frame['aliases'] for alias in aliases)
+            keyword_hash_map = self._hash_lookup(kw for keywords in fuzzy_keywords for kw in keywords)
+
+        with self.stage('index'):
+            self._index_frame(frame, alias_hash_map, source)
+
+        with self.stage('fuzzy-map'):
+            for name, keywords, main_hash in zip(frame['name'], fuzzy_keywords, frame['main_hash']):
+                if keywords:
+                    self.log(f"处理 '{name}' 的模糊词: {keywords}")
+                for fuzzy_kw in keywords:
+                    self._add_to_fuzzy_map(keyword_hash_map[fuzzy_kw], main_hash,
+                                           f"添加映射: '{fuzzy_kw}' -> '{name}' (hash:{main_hash})")
+
+        print(f"✅ 成功处理 {len(frame)} 条记录")
+
+    def _index_frame(self, frame: pd.DataFrame, alias_hash_map: dict, source: str = None):
+        """将整理好的记录写入 hashes / reverse_map，合并重复条目并记录冲突"""
+        hashes = self.processed_data['hashes']
+        reverse_map = self.processed_data['reverse_map']
+
+        for name, status, aliases, main_hash in zip(frame['name'], frame['status'], frame['aliases'],
+                                                    frame['main_hash']):
+            existing = hashes.get(main_hash)
+            merged = []
+            if existing is not None and not existing.get('is_alias', False):
+                if normalize_text(existing['main_name']) != normalize_text(name):
+                    # 名称不同但哈希相同：页面按哈希查找，无法同时保留，保留先出现的条目
+                    self._add_conflict('collision', main_hash, source, existing, name, status)
+                    continue
+                # 重复条目（与 merge_records 相同，按归一化名称判断）：保留先出现的名称，合并别称，状态取更严格者
+                if existing['status'] != status or existing['main_name'] != name:
+                    self._add_conflict('duplicate', main_hash, source, existing, name, status)
+                name = existing['main_name']
+                status = max(existing['status'], status, key=self.STATUS_PRIORITY.get)
+                merged = existing['aliases']
+            for alias in aliases:
+                if alias != name and alias not in merged:
+                    merged = merged + [alias]
+            aliases = merged
 
-            self.processed_data['hashes'][main_hash] = {
+            self._entry_sources[main_hash] = source
+            self._main_hashes[name] = main_hash
+            hashes[main_hash] = {
                 'status': status,
                 'aliases': aliases,
                 'main_name': name
             }
-            self.processed_data['reverse_map'][main_hash] = name
+            reverse_map[main_hash] = name
 
             for alias in aliases:
                 if alias == name:
                     continue
-                alias_hash = self.simple_hash(alias)
-                self.processed_data['hashes'][alias_hash] = {
+                # 合并进来的旧别称不在本表的哈希表中
+                alias_hash = alias_hash_map.get(alias) or simple_hash(alias)
+                existing = hashes.get(alias_hash)
+                if existing is None or existing['main_name'] != name:
+                    if existing is not None:
+                        self._add_conflict('alias', alias_hash, source, existing, name, status)
+                    self._entry_sources[alias_hash] = source
+                hashes[alias_hash] = {
                     'status': status,
                     'aliases': [],
                     'is_alias': True,
                     'main_name': name
                 }
-                self.processed_data['reverse_map'][alias_hash] = f"{alias} (别称: {name})"
+                reverse_map[alias_hash] = f"{alias} (别称: {name})"
 
-            # 调试输出
-            self.log(f"处理 '{name}' 的模糊词: {fuzzy_keywords}")
-            for fuzzy_kw in fuzzy_keywords:
-                fuzzy_hash = self.simple_hash(fuzzy_kw)
-                if fuzzy_hash not in self.processed_data['fuzzy_map']:
-                    self.processed_data['fuzzy_map'][fuzzy_hash] = []
-                if main_hash not in self.processed_data['fuzzy_map'][fuzzy_hash]:
-                    self.processed_data['fuzzy_map'][fuzzy_hash].append(main_hash)
-                    self.log(f"  添加映射: '{fuzzy_kw}' (hash:{fuzzy_hash}) -> '{name}' (hash:{main_hash})")
+    def _finalize(self):
+        """所有数据源读入后统一生成模糊映射、前缀树与统计"""
+        hashes = self.processed_data['hashes']
 
-            processed_count += 1
+        # 重复条目合并后，别称条目跟随主条目的状态
+        for data in hashes.values():
+            if data.get('is_alias', False):
+                main = hashes.get(self._main_hashes.get(data['main_name']))
+                if main is not None and not main.get('is_alias', False):
+                    data['status'] = main['status']
 
-        self.processed_data['total_count'] = processed_count
-        print(f"✅ 成功处理 {processed_count} 条记录")
+        self.processed_data['total_count'] = sum(1 for data in hashes.values() if not data.get('is_alias', False))
 
         self._generate_smart_fuzzy_mapping()
+        with self.stage('fuzzy-map'):
+            self._freeze_fuzzy_map()
+        with self.stage('trie'):
+            self._build_prefix_trie()
+
+    def _add_conflict(self, kind: str, hash_key: str, source: str, existing: dict, name: str, status: str):
+        self.processed_data['conflicts'].append({
+            'type': kind,
+            'hash': hash_key,
+            'existing': {'name': existing['main_name'], 'status': existing['status'],
+                         'source': self._entry_sources.get(hash_key)},
+            'incoming': {'name': name, 'status': status, 'source': source}
+        })
+
+    def _report_conflicts(self):
+        conflicts = self.processed_data['conflicts']
+        if not conflicts:
+            return
 
-    def _normalize_status(self, status: str) -> str:
-        status = status.lower()
-        if status in ['available', '可用', '空闲', '未占用']:
-            return 'Available'
-        elif status in ['occupied', '已占用', '占用', '使用中']:
-            return 'Occupied'
-        elif status in ['hold', 'holding', '保留', '预留', '暂停']:
-            return 'Hold'
-        else:
-            return 'Available'
+        print(f"⚠️  合并时发现 {len(conflicts)} 处冲突（重复条目状态取更严格者，别称以后出现的为准，哈希冲突保留先出现的条目）")
+        for conflict in conflicts[:10]:
+            existing, incoming = conflict['existing'], conflict['incoming']
+            label = {'duplicate': '重复条目', 'collision': '哈希冲突'}.get(conflict['type'], '别称冲突')
+            print(f"  {label}: '{existing['name']}'({existing['status']}, {existing['source']}) <-> "
+                  f"'{incoming['name']}'({incoming['status']}, {incoming['source']})")
+        if len(conflicts) > 10:
+            print(f"  ... 其余 {len(conflicts) - 10} 处见调试信息")
+
+    def _hash_column(self, series: pd.Series) -> list:
+        """对整列计算哈希，相同取值只计算一次"""
+        codes, uniques = pd.factorize(series)
+        hashed = simple_hashes(uniques)
+        return [hashed[code] for code in codes]
+
+    def _hash_lookup(self, texts) -> dict:
+        """为一批字符串建立 文本 -> 哈希 的查找表（去重后批量计算）"""
+        texts = list(dict.fromkeys(texts))
+        return dict(zip(texts, simple_hashes(texts)))
 
     def _generate_smart_fuzzy_mapping(self):
         self.log("生成智能模糊匹配映射...")
 
         main_names = []
+        alias_names = []
         for hash_key, data in self.processed_data['hashes'].items():
             if not data.get('is_alias', False):
                 main_names.append((hash_key, data['main_name']))
+                alias_names.extend((hash_key, alias) for alias in data['aliases'])
 
         self.log(f"处理 {len(main_names)} 个主要名称")
 
+        # 先分词，收集所有 (词, 主哈希) 对，再对去重后的词批量计算哈希
+        with self.stage('segment'):
+            segments = {}
+            for _, main_name in main_names:
+                try:
+                    segments[main_name] = jieba.lcut(main_name)
+                    self.log(f"  '{main_name}' jieba分词结果: {segments[main_name]}")
+                except Exception as e:
+                    self.log(f"  jieba分词失败: {e}")
+
+        pairs = []
         for main_hash, main_name in main_names:
-            self.log(f"为 '{main_name}' 生成模糊映射")
+            pairs.append((main_name, main_hash, "完整名称"))
 
-            name_hash = self.simple_hash(main_name)
-            self._add_to_fuzzy_map(name_hash, main_hash, f"完整名称: {main_name}")
-
-            try:
-                keywords = list(jieba.cut(main_name))
-                self.log(f"  jieba分词结果: {keywords}")
+            for keyword in segments.get(main_name, []):
+                keyword = keyword.strip()
+                if len(keyword) <= 1 or not keyword or keyword.isspace():
+                    continue
+                if all(not c.isalnum() for c in keyword):
+                    continue
+                pairs.append((keyword, main_hash, "关键词"))
 
-                for keyword in keywords:
-                    keyword = keyword.strip()
-                    if len(keyword) <= 1 or not keyword or keyword.isspace():
-                        continue
-                    if all(not c.isalnum() for c in keyword):
-                        continue
-                    keyword_hash = self.simple_hash(keyword)
-                    self._add_to_fuzzy_map(keyword_hash, main_hash, f"关键词: {keyword} -> {main_name}")
+        # 名称与别称的拼音 / 首字母键也写入 fuzzy_map，前端把去掉分隔符的输入哈希后直接查表
+        # 键与 Occupation-search 的拼音索引同由 phonetic_keys 生成，首字母不足 MIN_INITIALS 个字母时不写入，两边命中一致
+        with self.stage('phonetic'):
+            if not pinyin_available():
+                print("⚠️ 未安装 pypinyin，跳过拼音键（pip install pypinyin）")
+            else:
+                for main_hash, name in main_names + alias_names:
+                    for key in phonetic_keys(name):
+                        pairs.append((key, main_hash, "拼音"))
 
-            except Exception as e:
-                self.log(f"  jieba分词失败: {e}")
+        with self.stage('hash'):
+            hash_map = self._hash_lookup(text for text, _, _ in pairs)
 
-            if len(main_name) >= 2:
-                for i in range(2, min(len(main_name) + 1, 5)):
-                    prefix = main_name[:i]
-                    prefix_hash = self.simple_hash(prefix)
-                    self._add_to_fuzzy_map(prefix_hash, main_hash, f"前缀: {prefix} -> {main_name}")
+        with self.stage('fuzzy-map'):
+            for text, main_hash, kind in pairs:
+                self._add_to_fuzzy_map(hash_map[text], main_hash, f"{kind}: {text} -> {main_hash}")
 
-        self.log(f"生成了 {len(self.processed_data['fuzzy_map'])} 个模糊匹配映射")
+        self.log(f"生成了 {len(self._fuzzy_postings)} 个模糊匹配映射")
 
     def _add_to_fuzzy_map(self, fuzzy_hash, main_hash, debug_info):
-        if fuzzy_hash not in self.processed_data['fuzzy_map']:
-            self.processed_data['fuzzy_map'][fuzzy_hash] = []
-        if main_hash not in self.processed_data['fuzzy_map'][fuzzy_hash]:
-            self.processed_data['fuzzy_map'][fuzzy_hash].append(main_hash)
+        postings = self._fuzzy_postings[fuzzy_hash]
+        if main_hash not in postings:
+            postings.add(main_hash)
             self.log(f"    {debug_info}")
 
+    def _freeze_fuzzy_map(self):
+        """将构建期的集合固化为有序列表，供输出使用"""
+        self.processed_data['fuzzy_map'] = {
+            fuzzy_hash: sorted(main_hashes) for fuzzy_hash, main_hashes in self._fuzzy_postings.items()
+        }
+
+    def _build_prefix_trie(self):
+        """
+        生成哈希化的压缩前缀树，供输入时实时联想使用
+        - order: 按归一化名称排序后的主哈希列表，同一前缀的名称在其中连续
+        - nodes: 前缀哈希(36进制) -> [起, 止, ...] 区间列表或单个下标，只记录区间发生收缩的前缀（首字符总是记录）
+        前端取输入的最长已记录前缀得到区间，再用 main_name 校验，不暴露前缀明文
+        """
+        entries = sorted(
+            (normalize_text(data['main_name']), hash_key)
+            for hash_key, data in self.processed_data['hashes'].items()
+            if not data.get('is_alias', False)
+        )
+        names = [name for name, _ in entries]
+        prefixes = []
+
+        stack = [(0, len(names), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            i = lo
+            while i < hi:
+                if len(names[i]) <= depth:
+                    i += 1
+                    continue
+                char = names[i][depth]
+                j = i + 1
+                while j < hi and len(names[j]) > depth and names[j][depth] == char:
+                    j += 1
+                if depth == 0 or (i, j) != (lo, hi):
+                    prefixes.append((names[i][:depth + 1], i, j))
+                if j - i > 1:
+                    stack.append((i, j, depth + 1))
+                i = j
+
+        # 前缀哈希批量计算；哈希冲突时追加区间，由前端逐一校验
+        nodes = {}
+        keys = self._trie_keys([prefix for prefix, _, _ in prefixes])
+        for key, (_, i, j) in zip(keys, prefixes):
+            nodes.setdefault(key, []).extend((i, j))
+
+        # 只含单个名称的区间直接记为起点下标，进一步压缩体积
+        for key, ranges in nodes.items():
+            if len(ranges) == 2 and ranges[1] == ranges[0] + 1:
+                nodes[key] = ranges[0]
+
+        self.processed_data['prefix_trie'] = {
+            'order': [hash_key for _, hash_key in entries],
+            'nodes': nodes
+        }
+        self.log(f"生成了 {len(nodes)} 个前缀节点")
+
+    def _trie_keys(self, prefixes: list) -> list:
+        """前缀节点键：simple_hash 的36进制表示，比十进制更短"""
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+        keys = []
+        for value in hash_values(prefixes):
+            key = ''
+            while True:
+                value, rem = divmod(value, 36)
+                key = digits[rem] + key
+                if value == 0:
+                    break
+            keys.append(key)
+        return keys
+
     def generate_static_html(self, template_path: str, output_path: str):
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-
             data_to_inject = {
                 'hashes': self.processed_data['hashes'],
                 'fuzzy_map': self.processed_data['fuzzy_map'],
+                'prefix_trie': self.processed_data['prefix_trie'],
                 'total_count': self.processed_data['total_count']
             }
 
-            data_json = json.dumps(data_to_inject, ensure_ascii=False, separators=(',', ':'))
+            html_content = self.render_html(template_path, data_to_inject)
 
-            html_content = html_content.replace(
-                'const ENCRYPTED_DATA = {\n            // 示例数据结构，实际数据会在构建时注入\n            hashes: {\n                // "hash1": { status: "Available", aliases: ["alias1", "alias2"] },\n                // "hash2": { status: "Occupied", aliases: [] }\n            },\n            fuzzy_map: {\n                // "fuzzy_hash1": ["hash1", "hash2"]\n            },\n            total_count: 0\n        };',
-                f'const ENCRYPTED_DATA = {data_json};'
-            )
-
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            with self.stage('write'):
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
 
             print(f"✅ 成功生成静态HTML文件：{output_path}")
-            print(f"📊 数据统计：总记录数 {self.processed_data['total_count']} | 哈希 {len(self.processed_data['hashes'])} | 模糊映射 {len(self.processed_data['fuzzy_map'])}")
+            print(f"📊 数据统计：总记录数 {self.processed_data['total_count']} | 哈希 {len(self.processed_data['hashes'])} | 模糊映射 {len(self.processed_data['fuzzy_map'])} | 前缀节点 {len(self.processed_data['prefix_trie']['nodes'])}")
 
         except Exception as e:
             print(f"生成静态HTML失败：{e}")
             return False
         return True
 
+    def render_html(self, template_path: str, data_to_inject: dict, shards: list = None) -> str:
+        """将数据（或分片清单）注入模板，返回页面内容"""
+        with open(template_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+
+        with self.stage('serialize'):
+            data_json = json.dumps(data_to_inject, ensure_ascii=False, separators=(',', ':'))
+
+        html_content = html_content.replace(
+            'const ENCRYPTED_DATA = {\n            // 示例数据结构，实际数据会在构建时注入\n            hashes: {\n                // "hash1": { status: "Available", aliases: ["alias1", "alias2"] },\n                // "hash2": { status: "Occupied", aliases: [] }\n            },\n            fuzzy_map: {\n                // "fuzzy_hash1": ["hash1", "hash2"]\n            },\n            prefix_trie: {\n                // order: ["hash1", "hash2"], nodes: { "k1": [0, 2], "k2": 1 }\n                order: [],\n                nodes: {}\n            },\n            total_count: 0\n        };',
+            f'const ENCRYPTED_DATA = {data_json};'
+        )
+
+        if shards is not None:
+            shards_json = json.dumps(shards, ensure_ascii=False, separators=(',', ':'))
+            html_content = html_content.replace('const DATA_SHARDS = null;', f'const DATA_SHARDS = {shards_json};')
+
+        return html_content
+
+    def split_data_shards(self, shard_count: int = 8) -> dict:
+        """
+        将前端数据拆成多个分片：hashes 与 fuzzy_map 按哈希取模分桶，prefix_trie 单独一片
+        单条记录变化时只有所在分片的内容哈希会改变
+        返回 {分片名: (数据键, 分片数据)}
+        """
+        shards = {}
+        for key in ('hashes', 'fuzzy_map'):
+            buckets = [{} for _ in range(shard_count)]
+            for hash_key, value in self.processed_data[key].items():
+                buckets[int(hash_key) % shard_count][hash_key] = value
+            for i, bucket in enumerate(buckets):
+                shards[f'{key}-{i}'] = (key, bucket)
+        shards['prefix_trie'] = ('prefix_trie', self.processed_data['prefix_trie'])
+        return shards
+
     def save_debug_info(self, output_path: str):
         debug_data = {
             'reverse_map': self.processed_data['reverse_map'],
             'fuzzy_map_sample': dict(list(self.processed_data['fuzzy_map'].items())[:20]),
             'total_count': self.processed_data['total_count'],
+            'conflicts': self.processed_data['conflicts'],
+            'profile': self.processed_data.get('profile'),
             'sample_hashes': {k: v for k, v in list(self.processed_data['hashes'].items())[:10]},
             'fuzzy_map_stats': {
                 'total_fuzzy_entries': len(self.processed_data['fuzzy_map']),
@@ -319,8 +629,9 @@ class DataProcessor:
 
 def main():
     parser = argparse.ArgumentParser(description='职业才能数据预处理工具')
-    parser.add_argument('--excel', type=str, help='Excel文件路径')
-    parser.add_argument('--sheets', type=str, help='Google Sheets URL')
+    parser.add_argument('--excel', type=str, nargs='+', default=[], help='Excel文件路径（可多个）')
+    parser.add_argument('--sheets', type=str, nargs='+', default=[], help='Google Sheets URL（可多个）')
+    parser.add_argument('--index', type=str, nargs='+', default=[], help='python -m talent_index 编译的索引文件（可多个）')
     parser.add_argument('--template', type=str, default='template.html', help='HTML模板文件路径')
     parser.add_argument('--output', type=str, default='index.html', help='输出HTML文件路径')
     parser.add_argument('--debug', action='store_true', help='启用调试输出')
@@ -329,33 +640,44 @@ def main():
     parser.add_argument('--status-col', type=str, help='状态列名')
     parser.add_argument('--aliases-col', type=str, help='别称列名')
     parser.add_argument('--fuzzy-col', type=str, help='模糊词列名')
+    parser.add_argument('--profile', action='store_true', help='统计各阶段耗时，结果写入调试信息')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='另外开启 tracemalloc 再构建一遍，统计各阶段内存峰值（不影响计时）')
+    parser.add_argument('--profile-out', type=str, help='同时运行 cProfile 并将 pstats 结果保存到此文件')
 
     args = parser.parse_args()
 
-    if not args.excel and not args.sheets:
-        print("错误：必须指定 --excel 或 --sheets 参数")
+    if not args.excel and not args.sheets and not args.index:
+        print("错误：必须指定 --excel、--sheets 或 --index 参数")
         return
 
     processor = DataProcessor(debug=args.debug)
+    if args.profile or args.profile_out or args.profile_memory:
+        processor.start_profiling(cprofile=bool(args.profile_out))
 
-    if args.excel:
-        if not processor.load_from_excel(args.excel, args.name_col, args.status_col, args.aliases_col, args.fuzzy_col):
-            return
-    elif args.sheets:
-        if not processor.load_from_google_sheets(args.sheets, args.name_col, args.status_col, args.aliases_col,
-                                                 args.fuzzy_col):
-            return
+    sources = ([('excel', path) for path in args.excel] + [('sheets', url) for url in args.sheets] +
+               [('index', path) for path in args.index])
+    if not processor.load_sources(sources, args.name_col, args.status_col, args.aliases_col, args.fuzzy_col):
+        return
 
     if not processor.generate_static_html(args.template, args.output):
         return
 
-    if args.debug:
+    if processor.profile:
+        processor.stop_profiling(args.profile_out)
+        if args.profile_memory:
+            processor.profile_memory(sources, args.template, name_column=args.name_col, status_column=args.status_col,
+                                     aliases_column=args.aliases_col, fuzzy_column=args.fuzzy_col)
+        print("\n⏱️  构建阶段耗时：")
+        processor.print_profile_report()
+
+    if args.debug or processor.profile:
         debug_file = args.debug_file or args.output.replace('.html', '_debug.json')
         processor.save_debug_info(debug_file)
 
     print("\n🎉 处理完成！")
     print(f"📄 静态网页已生成：{args.output}")
-    if args.debug:
+    if args.debug or processor.profile:
         print(f"🔍 调试数据已保存：{debug_file}")
 
 
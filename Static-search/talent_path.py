@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+让入口脚本能导入仓库根目录下的共享索引库 talent_index，入口脚本在导入其他模块之前 import 本模块即可
+已安装（在仓库根目录执行 pip install -e .）时直接使用安装的版本；未安装且在仓库内运行时把仓库根目录加入 sys.path
+"""
+
+import os
+import sys
+
+try:
+    import talent_index  # noqa: F401
+except ImportError:
+    _root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if not os.path.isdir(os.path.join(_root, 'talent_index')):
+        raise ImportError("找不到共享索引库 talent_index：请在仓库根目录执行 pip install -e . 后再运行") from None
+    sys.path.insert(0, _root)
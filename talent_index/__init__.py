@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+共享才能索引库
+表格只解析一次，编译为带版本号、可 mmap 的索引文件（名称、别称、模糊词、二字片段）
+Occupation-search 直接映射该文件查询，Static-search 读取后序列化为前端数据
+SuggestionIndex 为拼写建议提供 SymSpell 删除字典，在加载数据时于内存中构建
+build_phonetic_index 生成拼音 / 首字母键索引（需要 pypinyin，首次使用时才导入）
+diff_records 按行比较新旧记录，重新加载时只应用增量
+
+读取索引只依赖标准库；解析表格（talent_index.ingest）与压测用的模拟数据（talent_index.sample）需要 pandas
+可在仓库根目录执行 pip install -e . 安装；未安装时两个应用的入口脚本通过各自的 talent_path 模块从仓库内导入
+
+    python -m talent_index build data/occupations.xlsx -o data/talents.tidx
+    python -m talent_index info data/talents.tidx
+"""
+
+from .normalize import normalize_text, hash_value, hash_values, simple_hash, simple_hashes, ngrams
+from .index_file import FORMAT_VERSION, STATUS_LABELS, TalentIndex, compile_index, is_current, publish_lock
+from .suggest import SuggestionIndex
+from .phonetic import (pinyin_available, phonetic_keys, query_keys, phonetic_lookup, build_phonetic_index,
+                       update_phonetic_index)
+from .delta import RecordDelta, diff_records
+
+__all__ = [
+    'normalize_text', 'hash_value', 'hash_values', 'simple_hash', 'simple_hashes', 'ngrams',
+    'FORMAT_VERSION', 'STATUS_LABELS', 'TalentIndex', 'compile_index', 'is_current', 'publish_lock',
+    'SuggestionIndex', 'pinyin_available', 'phonetic_keys', 'query_keys', 'phonetic_lookup', 'build_phonetic_index',
+    'update_phonetic_index', 'RecordDelta', 'diff_records',
+]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+命令行：编译 / 查看 / 查询才能索引文件
+"""
+
+import argparse
+import sys
+import time
+
+from .index_file import TalentIndex, compile_index
+
+
+def detect_source_type(path: str) -> str:
+    if path.startswith(('http://', 'https://')):
+        return 'sheets'
+    if path.endswith('.tidx'):
+        return 'index'
+    return 'excel'
+
+
+def build(args) -> int:
+    from .ingest import read_source, detect_columns, normalize_frame, merge_records
+
+    start = time.perf_counter()
+    frames = []
+    for path in args.sources:
+        for label, df in read_source(detect_source_type(path), path, args.name_col):
+            if df.empty:
+                print(f"跳过空工作表：{label}")
+                continue
+            columns = detect_columns(df.columns, args.name_col, args.status_col, args.aliases_col, args.fuzzy_col)
+            print(f"📁 {label}: {len(df)} 行，列映射 名称={columns[0]} 状态={columns[1]} "
+                  f"别称={columns[2]} 模糊词={columns[3]}")
+            frames.append(normalize_frame(df, *columns, default_status=args.default_status))
+
+    records = merge_records(frames)
+    stats = compile_index(records, args.output)
+    print(f"✅ 已编译 {stats['records']} 条记录 -> {args.output} "
+          f"({stats['bytes'] / 1024:.1f} KB, 用时 {time.perf_counter() - start:.2f} 秒)")
+    print(f"   名称键 {stats['name_keys']} | 模糊词键 {stats['keyword_keys']} | 片段键 {stats['ngram_keys']}")
+    return 0
+
+
+def info(args) -> int:
+    with TalentIndex(args.index) as index:
+        for key, value in index.info().items():
+            if key == 'created':
+                value = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(value))
+            print(f"{key:<14}{value}")
+    return 0
+
+
+def lookup(args) -> int:
+    with TalentIndex(args.index) as index:
+        matches = index.lookup(args.query) or index.keyword_lookup(args.query)
+        if not matches:
+            matches = [record_id for record_id, _ in index.ngram_candidates(args.query, limit=5)]
+            print("未找到精确匹配，相近候选：")
+        for record_id in matches:
+            record = index.record(record_id)
+            print(f"{record['name']} [{record['status'] or '未知'}] 别称: {record['aliases']}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m talent_index', description='共享才能索引工具')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='解析表格并编译索引文件')
+    build_parser.add_argument('sources', nargs='+', help='Excel文件路径或Google Sheets URL（可多个）')
+    build_parser.add_argument('-o', '--output', default='talents.tidx', help='输出索引文件路径')
+    build_parser.add_argument('--name-col', type=str, help='职业名称列名')
+    build_parser.add_argument('--status-col', type=str, help='状态列名')
+    build_parser.add_argument('--aliases-col', type=str, help='别称列名')
+    build_parser.add_argument('--fuzzy-col', type=str, help='模糊词列名')
+    build_parser.add_argument('--default-status', default='', choices=['', 'Available', 'Hold', 'Occupied'],
+                              help='无法识别的状态记为（默认未知）')
+    build_parser.set_defaults(handler=build)
+
+    info_parser = commands.add_parser('info', help='查看索引文件信息')
+    info_parser.add_argument('index')
+    info_parser.set_defaults(handler=info)
+
+    lookup_parser = commands.add_parser('lookup', help='在索引文件中查询')
+    lookup_parser.add_argument('index')
+    lookup_parser.add_argument('query')
+    lookup_parser.set_defaults(handler=lookup)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+记录级增量：按行键（归一化名称，与 merge_records 的去重键一致）比较新旧两组记录
+重新加载时只把新增 / 修改 / 删除的记录应用到内存索引与缓存，并作为变更推送给客户端
+"""
+
+from collections import namedtuple
+
+from .normalize import normalize_text
+
+# inserted / deleted 为记录列表，updated 为 (旧记录, 新记录) 列表
+RecordDelta = namedtuple('RecordDelta', ['inserted', 'updated', 'deleted'])
+
+
+def record_key(record) -> str:
+    return normalize_text(record['name'])
+
+
+def diff_records(old, new) -> RecordDelta:
+    """比较两组 {name, status, aliases, keywords} 记录；同一行键的记录内容不同即为修改"""
+    previous = {record_key(record): record for record in old}
+    inserted, updated = [], []
+    for record in new:
+        before = previous.pop(record_key(record), None)
+        if before is None:
+            inserted.append(record)
+        elif before != record:
+            updated.append((before, record))
+    return RecordDelta(inserted, updated, list(previous.values()))
+
+
+def is_empty(delta) -> bool:
+    return not (delta.inserted or delta.updated or delta.deleted)
+
+
+def names_changed(delta) -> bool:
+    """可搜索的名称（名称与别称）是否变化；只改状态或模糊词时名称表、建议索引与拼音索引都不用动"""
+    return bool(delta.inserted or delta.deleted or any(
+        before['name'] != after['name'] or before['aliases'] != after['aliases']
+        for before, after in delta.updated))
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+编译后的才能索引文件（.tidx）
+只依赖标准库：服务端用 mmap 打开后直接在文件上二分查找，不把数据展开成 Python 对象
+
+文件布局（小端序，各段按 8 字节对齐）：
+    文件头    magic, 版本, 记录数, 字符串数, 生成时间
+    段目录    每段 (偏移, 元素个数)，顺序见 SECTIONS
+    string_offsets / string_data    字符串表：UTF-8 数据与 S+1 个偏移
+    records                         每条记录 6 个 uint32：名称, 状态, 别称起止, 模糊词起止
+    refs                            别称/模糊词的字符串编号
+    *_keys / *_postings             按键排序的 (哈希, 记录号) 倒排表：名称+别称、模糊词、二字片段
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为不加锁
+    fcntl = None
+
+from .normalize import normalize_text, hash_value, hash_values, ngrams
+
+MAGIC = b'TIDX'
+# 2：哈希改按 UTF-16 码元计算并按有符号32位回绕（与页面的 simpleHash 一致），版本 1 文件中的键已不可用
+FORMAT_VERSION = 2
+
+HEADER = struct.Struct('<4sHHIIQ')
+SECTION = struct.Struct('<QQ')
+SECTIONS = ('string_offsets', 'string_data', 'records', 'refs',
+            'name_keys', 'name_postings', 'keyword_keys', 'keyword_postings',
+            'ngram_keys', 'ngram_postings')
+
+STATUSES = ('', 'Available', 'Hold', 'Occupied')
+STATUS_LABELS = {'Available': '可用', 'Hold': '暂时保留', 'Occupied': '已被占用', '': '未知状态'}
+RECORD_FIELDS = 6
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _little_endian(data) -> bytes:
+    if isinstance(data, bytes):
+        return data
+    if sys.byteorder != 'little':
+        data = array('I', data)
+        data.byteswap()
+    return data.tobytes()
+
+
+def _postings(pairs) -> tuple:
+    """(哈希, 记录号) 去重排序后拆成两列"""
+    keys, postings = array('I'), array('I')
+    for key, record_id in sorted(set(pairs)):
+        keys.append(key)
+        postings.append(record_id)
+    return keys, postings
+
+
+@contextmanager
+def publish_lock(path: str):
+    """
+    索引文件旁的 .lock 文件排他锁，保证多个 worker 中同一时间只有一个下载表格并发布
+    其余 worker 在此等待，拿到锁后直接映射刚发布的文件
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def compile_index(records: list, path: str) -> dict:
+    """
+    将 [{name, status, aliases, keywords}] 编译为索引文件
+    先写临时文件再 os.replace 原子替换：已映射旧文件的进程继续读旧快照，不会读到写了一半的数据
+    返回各段条目数，便于打印统计
+    """
+    strings = {}
+    string_data = bytearray()
+    string_offsets = array('I', [0])
+
+    def intern(text):
+        if text not in strings:
+            strings[text] = len(strings)
+            string_data.extend(text.encode('utf-8'))
+            string_offsets.append(len(string_data))
+        return strings[text]
+
+    record_table, refs = array('I'), array('I')
+    # 先收集 (文本, 记录号)，最后批量计算哈希
+    texts = {'name': [], 'keyword': [], 'ngram': []}
+
+    for record_id, record in enumerate(records):
+        names = [record['name']] + list(record['aliases'])
+        alias_lo = len(refs)
+        refs.extend(intern(alias) for alias in record['aliases'])
+        keyword_lo = len(refs)
+        refs.extend(intern(kw) for kw in record['keywords'])
+        record_table.extend((intern(record['name']), STATUSES.index(record['status']),
+                             alias_lo, keyword_lo, keyword_lo, len(refs)))
+
+        for name in names:
+            texts['name'].append((name, record_id))
+            texts['ngram'].extend((gram, record_id) for gram in ngrams(name))
+        texts['keyword'].extend((kw, record_id) for kw in record['keywords'])
+
+    sections = {
+        'string_offsets': string_offsets,
+        'string_data': bytes(string_data),
+        'records': record_table,
+        'refs': refs,
+    }
+    for prefix, pairs in texts.items():
+        keys = hash_values(text for text, _ in pairs)
+        sections[f'{prefix}_keys'], sections[f'{prefix}_postings'] = _postings(
+            zip(keys, (record_id for _, record_id in pairs)))
+
+    payloads = []
+    directory = []
+    offset = _align(HEADER.size + SECTION.size * len(SECTIONS))
+    for name in SECTIONS:
+        data = sections[name]
+        payload = _little_endian(data)
+        directory.append((offset, len(data)))
+        payloads.append((offset, payload))
+        offset = _align(offset + len(payload))
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(records), len(strings), int(time.time())))
+            for entry in directory:
+                f.write(SECTION.pack(*entry))
+            for position, payload in payloads:
+                f.write(b'\0' * (position - f.tell()))
+                f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    stats = {'records': len(records), 'strings': len(strings), 'bytes': offset}
+    stats.update((name, len(sections[name])) for name in SECTIONS if name.endswith('_keys'))
+    return stats
+
+
+def is_current(path: str) -> bool:
+    """文件是否为当前版本的索引文件（只读文件头）；不存在、格式或版本不符时返回 False，应重新编译"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return False
+    if len(header) < HEADER.size:
+        return False
+    magic, version = HEADER.unpack(header)[:2]
+    return magic == MAGIC and version == FORMAT_VERSION
+
+
+class TalentIndex:
+    """只读打开索引文件，多个进程打开同一文件时共享操作系统页缓存"""
+
+    def __init__(self, path: str):
+        if sys.byteorder != 'little':
+            raise ValueError("索引文件为小端序，当前平台不支持直接映射")
+
+        self.path = path
+        self._mm = None
+        with open(path, 'rb') as f:
+            self._identity = self._file_identity(os.fstat(f.fileno()))
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.record_count, self.string_count, self.created = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"不是才能索引文件：{path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"索引文件版本 {version} 与当前版本 {FORMAT_VERSION} 不一致，请重新编译")
+
+        self.version = version
+        self._view = memoryview(self._mm)
+        self._sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, count = SECTION.unpack_from(self._mm, HEADER.size + SECTION.size * i)
+            if name == 'string_data':
+                self._sections[name] = self._view[offset:offset + count]
+            else:
+                self._sections[name] = self._view[offset:offset + count * 4].cast('I')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.record_count
+
+    @staticmethod
+    def _file_identity(stat) -> tuple:
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def changed_on_disk(self) -> bool:
+        """路径上是否已发布了新文件（原子替换后 inode 会改变）"""
+        try:
+            return self._file_identity(os.stat(self.path)) != self._identity
+        except FileNotFoundError:
+            return False
+
+    def close(self):
+        if getattr(self, '_sections', None):
+            for view in self._sections.values():
+                view.release()
+            self._sections = {}
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def string(self, string_id: int) -> str:
+        offsets = self._sections['string_offsets']
+        return str(self._sections['string_data'][offsets[string_id]:offsets[string_id + 1]], 'utf-8')
+
+    def _refs(self, lo: int, hi: int) -> list:
+        refs = self._sections['refs']
+        return [self.string(refs[i]) for i in range(lo, hi)]
+
+    def record(self, record_id: int) -> dict:
+        base = record_id * RECORD_FIELDS
+        fields = self._sections['records'][base:base + RECORD_FIELDS]
+        name_id, status, alias_lo, alias_hi, keyword_lo, keyword_hi = fields
+        return {
+            'name': self.string(name_id),
+            'status': STATUSES[status],
+            'aliases': self._refs(alias_lo, alias_hi),
+            'keywords': self._refs(keyword_lo, keyword_hi),
+        }
+
+    def records(self):
+        for record_id in range(self.record_count):
+            yield self.record(record_id)
+
+    def searchable_names(self) -> list:
+        """所有名称与别称，只解码字符串，不构造记录字典"""
+        records, refs = self._sections['records'], self._sections['refs']
+        names = []
+        for base in range(0, self.record_count * RECORD_FIELDS, RECORD_FIELDS):
+            names.append(self.string(records[base]))
+            names.extend(self.string(refs[i]) for i in range(records[base + 2], records[base + 3]))
+        return names
+
+    def _candidates(self, prefix: str, text: str) -> list:
+        keys, postings = self._sections[f'{prefix}_keys'], self._sections[f'{prefix}_postings']
+        key = hash_value(text)
+        lo = bisect_left(keys, key)
+        hi = bisect_right(keys, key, lo)
+        return [postings[i] for i in range(lo, hi)]
+
+    def lookup(self, text: str) -> list:
+        """名称或别称精确匹配（忽略大小写/全半角），返回记录号列表"""
+        query = normalize_text(text)
+        results = []
+        for record_id in self._candidates('name', query):
+            record = self.record(record_id)
+            if any(normalize_text(name) == query for name in [record['name']] + record['aliases']):
+                results.append(record_id)
+        return results
+
+    def keyword_lookup(self, text: str) -> list:
+        """模糊词精确匹配，返回记录号列表"""
+        query = normalize_text(text)
+        return [record_id for record_id in self._candidates('keyword', query)
+                if any(normalize_text(kw) == query for kw in self.record(record_id)['keywords'])]
+
+    def ngram_candidates(self, text: str, limit: int = None) -> list:
+        """按共有二字片段数排序的候选记录 [(记录号, 片段数)]，用于缩小模糊匹配范围（未校验哈希冲突）"""
+        counts = Counter()
+        for gram in ngrams(text):
+            counts.update(set(self._candidates('ngram', gram)))
+        return counts.most_common(limit)
+
+    def to_frame(self):
+        """转为 ingest.NORMALIZED_COLUMNS 格式的 DataFrame"""
+        import pandas as pd
+        from .ingest import NORMALIZED_COLUMNS
+        return pd.DataFrame(list(self.records()), columns=NORMALIZED_COLUMNS)
+
+    def info(self) -> dict:
+        return {
+            'path': self.path,
+            'version': self.version,
+            'records': self.record_count,
+            'strings': self.string_count,
+            'created': self.created,
+            'bytes': len(self._mm),
+            **{name: len(self._sections[name]) for name in SECTIONS if name.endswith('_keys')},
+        }
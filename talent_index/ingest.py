@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+表格读取与清洗
+列识别、别称/模糊词切分、状态归一化在此统一实现，Occupation-search 与 Static-search 共用
+"""
+
+import os
+
+import pandas as pd
+
+from .normalize import normalize_text
+from .index_file import STATUS_LABELS  # 定义在不依赖 pandas 的索引模块中，此处保留原导入路径
+
+EMPTY_VALUES = ['nan', 'none', '']
+
+STATUS_MAP = {
+    'available': 'Available', '可用': 'Available', '空闲': 'Available', '未占用': 'Available',
+    'occupied': 'Occupied', '已占用': 'Occupied', '已被占用': 'Occupied', '占用': 'Occupied', '使用中': 'Occupied',
+    'hold': 'Hold', 'holding': 'Hold', '保留': 'Hold', '暂时保留': 'Hold', '预留': 'Hold', '暂停': 'Hold',
+}
+
+# 合并重复条目时状态取更严格者
+STATUS_PRIORITY = {'': -1, 'Available': 0, 'Hold': 1, 'Occupied': 2}
+
+ALIAS_SEPARATORS = r'[,，、;；|/]'
+KEYWORD_SEPARATORS = r'[,，、;；|/\s]'
+
+# 已清洗的表格列，来自编译好的索引文件时无需再识别与切分
+NORMALIZED_COLUMNS = ['name', 'status', 'aliases', 'keywords']
+
+NAME_KEYWORDS = ['名称', 'name', '职业', 'job', 'occupation', 'title', '才能', 'talent']
+STATUS_KEYWORDS = ['状态', 'status', '审核', '情况', 'state', '可用', 'available']
+ALIAS_KEYWORDS = ['别称', 'alias', 'aliases', '别名', 'alternative', '其他', 'other']
+FUZZY_KEYWORDS = ['模糊词', '模糊', 'fuzzy', '关键词', 'keyword', 'keywords', '标签', 'tag', 'tags']
+
+
+def sheets_csv_url(sheet_url: str) -> str:
+    """将 Google Sheets 编辑链接转换为 CSV 导出链接"""
+    if '/edit' in sheet_url:
+        return sheet_url.replace('/edit#gid=', '/export?format=csv&gid=').replace('/edit', '/export?format=csv')
+    return sheet_url
+
+
+def read_source(source_type: str, path: str, name_column: str = None) -> list:
+    """
+    读取单个数据源，返回 [(来源标签, DataFrame)]；索引文件直接返回已清洗的表格
+    Excel 读取全部工作表，但跳过没有名称列的辅助工作表（说明、更新日志、统计等）；
+    没有任何工作表能识别出名称列时只保留第一个工作表，沿用以首列为名称列的做法
+    """
+    if source_type == 'excel':
+        sheets = pd.read_excel(path, sheet_name=None)
+        frames = [(f"{os.path.basename(path)}#{sheet}", df) for sheet, df in sheets.items()]
+        talents = [(label, df) for label, df in frames if has_name_column(df.columns, name_column)]
+        if not talents:
+            return frames[:1]
+        for label, df in frames:
+            if not has_name_column(df.columns, name_column):
+                print(f"跳过没有名称列的工作表：{label}")
+        return talents
+    if source_type == 'index':
+        from .index_file import TalentIndex
+        with TalentIndex(path) as index:
+            return [(os.path.basename(path), index.to_frame())]
+    return [(path, pd.read_csv(sheets_csv_url(path)))]
+
+
+def is_normalized(df: pd.DataFrame) -> bool:
+    return list(df.columns) == NORMALIZED_COLUMNS
+
+
+def _find_column(columns, keywords, exclude=None):
+    for col in columns:
+        if col == exclude:
+            continue
+        col_lower = str(col).lower().strip()
+        if any(keyword in col_lower for keyword in keywords):
+            return col
+    return None
+
+
+def has_name_column(columns, name_column: str = None) -> bool:
+    """表头中是否有指定的名称列，未指定时是否有可识别的名称列"""
+    if name_column:
+        return name_column in list(columns)
+    return _find_column(columns, NAME_KEYWORDS) is not None
+
+
+def detect_columns(columns, name_column: str = None, status_column: str = None,
+                   aliases_column: str = None, fuzzy_column: str = None) -> tuple:
+    """
+    识别 (名称, 状态, 别称, 模糊词) 列，已指定的列保持不变
+    找不到名称列时使用第一列；其余列找不到时为 None
+    """
+    columns = list(columns)
+    if not name_column:
+        name_column = _find_column(columns, NAME_KEYWORDS) or (columns[0] if columns else None)
+    if not status_column:
+        status_column = _find_column(columns, STATUS_KEYWORDS, exclude=name_column)
+    if not aliases_column:
+        aliases_column = _find_column(columns, ALIAS_KEYWORDS, exclude=name_column)
+    if not fuzzy_column:
+        fuzzy_column = _find_column(columns, FUZZY_KEYWORDS, exclude=name_column)
+    return name_column, status_column, aliases_column, fuzzy_column
+
+
+def normalize_status(status, default: str = 'Available') -> str:
+    return STATUS_MAP.get(str(status).strip().lower(), default)
+
+
+def split_column(df: pd.DataFrame, valid: pd.Series, column: str, pattern: str) -> pd.Series:
+    """按分隔符整列切分别称/模糊词，返回与有效行对齐的列表列"""
+    index = df.index[valid]
+    if not column:
+        return pd.Series([[] for _ in range(len(index))], index=index, dtype=object)
+
+    values = df.loc[valid, column]
+    text = values.astype(str).str.strip()
+    text = text.where(values.notna() & ~text.str.lower().isin(EMPTY_VALUES), '')
+
+    parts = text.str.split(pattern, regex=True).explode().str.strip()
+    parts = parts[parts.notna() & (parts != '')]
+    grouped = parts.groupby(level=0).agg(list)
+    return grouped.reindex(index).apply(lambda items: items if isinstance(items, list) else [])
+
+
+def normalize_frame(df: pd.DataFrame, name_column: str, status_column: str = None, aliases_column: str = None,
+                    fuzzy_column: str = None, default_status: str = 'Available') -> pd.DataFrame:
+    """
+    整列清洗原始表格，返回 NORMALIZED_COLUMNS 格式：
+    name 去空格后的名称（过滤空行），status 归一化状态，aliases / keywords 为列表
+    无法识别的状态记为 default_status
+    """
+    if is_normalized(df):
+        return df
+
+    df = df.reset_index(drop=True)
+    names = df[name_column].astype(str).str.strip()
+    valid = df[name_column].notna() & ~names.str.lower().isin(EMPTY_VALUES)
+    frame = pd.DataFrame({'name': names[valid]})
+
+    if status_column:
+        statuses = df.loc[valid, status_column]
+        statuses = statuses.astype(str).str.strip().where(statuses.notna(), '')
+        frame['status'] = statuses.str.lower().map(STATUS_MAP).fillna(default_status)
+    else:
+        frame['status'] = default_status
+
+    frame['aliases'] = split_column(df, valid, aliases_column, ALIAS_SEPARATORS)
+    frame['keywords'] = split_column(df, valid, fuzzy_column, KEYWORD_SEPARATORS)
+    return frame.reset_index(drop=True)
+
+
+def merge_records(frames) -> list:
+    """
+    合并多个已清洗的表格为记录列表 [{name, status, aliases, keywords}]
+    归一化名称相同的条目视为重复：保留先出现的名称，合并别称与模糊词，状态取更严格者
+    """
+    records = []
+    positions = {}
+    for frame in frames:
+        for name, status, aliases, keywords in zip(frame['name'], frame['status'], frame['aliases'],
+                                                   frame['keywords']):
+            key = normalize_text(name)
+            if key not in positions:
+                positions[key] = len(records)
+                records.append({'name': name, 'status': status, 'aliases': [], 'keywords': []})
+            record = records[positions[key]]
+            record['status'] = max(record['status'], status, key=STATUS_PRIORITY.get)
+            record['aliases'] += [alias for alias in aliases if alias != name and alias not in record['aliases']]
+            record['keywords'] += [kw for kw in keywords if kw not in record['keywords']]
+    return records
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+名称归一化与哈希
+与 Static-search 前端的 simpleHash 逐位一致：
+    NFKC + 小写 + 去首尾空白，按 UTF-16 码元（charCodeAt）计算 hash = hash * 31 + c，按有符号32位回绕后取绝对值
+"""
+
+import unicodedata
+
+
+def normalize_text(text) -> str:
+    """统一大小写、去空格、Unicode 归一化（NFKC）"""
+    return unicodedata.normalize("NFKC", str(text)).lower().strip()
+
+
+def _code_units(text: str):
+    """UTF-16 码元，与 JavaScript 的 charCodeAt 相同（BMP 以外的字符拆成代理对）"""
+    for char in text:
+        code = ord(char)
+        if code > 0xFFFF:
+            code -= 0x10000
+            yield 0xD800 + (code >> 10)
+            yield 0xDC00 + (code & 0x3FF)
+        else:
+            yield code
+
+
+def hash_value(text) -> int:
+    """32位滚动哈希（hash * 31 + char）的绝对值"""
+    hash_value = 0
+    for code in _code_units(normalize_text(text)):
+        hash_value = ((hash_value << 5) - hash_value) + code
+        hash_value = ((hash_value + 0x80000000) % 0x100000000) - 0x80000000
+    return abs(hash_value)
+
+
+def simple_hash(text) -> str:
+    """简单哈希函数，与JavaScript版本保持一致"""
+    return str(hash_value(text))
+
+
+def hash_values(texts) -> list:
+    """
+    批量计算 hash_value，结果与逐个计算完全相同
+    有 NumPy 时把所有字符串的 UTF-16 码元拼成一个数组，按长度降序排列后逐位置整列计算，
+    循环次数只取决于最长字符串的长度，与字符串个数无关
+    """
+    texts = [normalize_text(text) for text in texts]
+    try:
+        import numpy as np
+    except ImportError:  # 没有 NumPy 时逐个计算
+        return [hash_value(text) for text in texts]
+    if not texts:
+        return []
+
+    encoded = [text.encode('utf-16-le') for text in texts]
+    lengths = np.fromiter((len(data) // 2 for data in encoded), dtype=np.int64, count=len(encoded))
+    units = np.frombuffer(b''.join(encoded), dtype='<u2').astype(np.uint32)
+    starts = np.zeros(len(encoded), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    order = np.argsort(-lengths, kind='stable')
+    sorted_lengths, sorted_starts = lengths[order], starts[order]
+    hashes = np.zeros(len(encoded), dtype=np.uint32)
+
+    # uint32 乘加自然按 2^32 回绕，与有符号32位回绕只差最后的符号解释
+    active = len(encoded)
+    for position in range(int(sorted_lengths[0])):
+        while active and sorted_lengths[active - 1] <= position:
+            active -= 1
+        hashes[:active] = hashes[:active] * np.uint32(31) + units[sorted_starts[:active] + position]
+
+    result = np.empty(len(encoded), dtype=np.int64)
+    result[order] = np.abs(hashes.view(np.int32).astype(np.int64))
+    return result.tolist()
+
+
+def simple_hashes(texts) -> list:
+    """批量计算 simple_hash"""
+    return [str(value) for value in hash_values(texts)]
+
+
+def ngrams(text, n: int = 2) -> set:
+    """归一化后的 n 字片段；不足 n 个字符时返回整个字符串"""
+    text = normalize_text(text)
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+拼音键索引
+名称转为无声调全拼（huoyancaokong）与首字母（hyck），玩家输入拼音、首字母或同音字时直接查表命中，
+不再对每个名称算相似度
+Occupation-search 的 DataHandler 与 Static-search 的 DataProcessor 在加载数据时各生成一次
+
+需要 pypinyin；未安装时 phonetic_keys 返回空列表，拼音查找自动关闭
+pypinyin 导入时要加载词典（约 0.3 秒），推迟到第一次生成拼音键时，不拖慢服务启动
+"""
+
+import re
+
+from .normalize import normalize_text
+
+_pypinyin = None
+
+# 首字母键的最少字母数：更短的字母串（如 "xy"、"xyz"）太容易撞上某个名称的首字母
+MIN_INITIALS = 4
+
+# 输入拼音时常见的分隔符（空格、隔音符号、间隔号、连字符）
+_SEPARATORS = re.compile(r"[\s'’·\-_]+")
+
+
+def _load_pypinyin():
+    """首次调用时导入 pypinyin，未安装时返回 None"""
+    global _pypinyin
+    if _pypinyin is None:
+        try:
+            import pypinyin
+        except ImportError:  # 未安装 pypinyin 时不生成拼音键
+            pypinyin = False
+        _pypinyin = pypinyin
+    return _pypinyin or None
+
+
+def pinyin_available() -> bool:
+    return _load_pypinyin() is not None
+
+
+def has_cjk(text) -> bool:
+    """是否含汉字（基本区与扩展 A 区）"""
+    return any('\u4e00' <= c <= '\u9fff' or '\u3400' <= c <= '\u4dbf' for c in text)
+
+
+def compact(text) -> str:
+    """归一化并去掉分隔符，"Huo Yan" 与 "huo'yan" 得到同一个键"""
+    return _SEPARATORS.sub('', normalize_text(text))
+
+
+def phonetic_keys(name) -> list:
+    """
+    名称的拼音键：第一个为全拼，其后为首字母（至少 MIN_INITIALS 个字母）；不含汉字或未安装 pypinyin 时为空
+    两个应用的拼音键都由此生成，首字母的长度下限在两边一致
+    """
+    text = normalize_text(name)
+    if not has_cjk(text):
+        return []
+    pypinyin = _load_pypinyin()
+    if pypinyin is None:
+        return []
+    # 非汉字逐字保留，首字母取其本身
+    syllables = [s for s in pypinyin.lazy_pinyin(text, style=pypinyin.Style.NORMAL, errors=list) if s.strip()]
+    keys = [compact(''.join(syllables))]
+    initials = compact(''.join(s[0] for s in syllables))
+    if len(initials) >= MIN_INITIALS and initials not in keys:
+        keys.append(initials)
+    return [key for key in keys if key]
+
+
+def query_keys(query) -> list:
+    """
+    查询词对应的拼音键：含汉字时取其全拼（同音字、错别字），否则视为玩家直接输入的拼音或首字母
+    只是候选键，是否算命中由 phonetic_lookup 判断
+    """
+    if has_cjk(normalize_text(query)):
+        return phonetic_keys(query)[:1]
+    key = compact(query)
+    return [key] if key else []
+
+
+def phonetic_lookup(index, query) -> list:
+    """
+    在拼音索引中查找查询词，返回命中的全部名称（同音时不止一个），只查字典，不再为名称生成拼音
+    含汉字的查询只匹配名称的全拼；直接输入的字母可匹配全拼或首字母
+    """
+    latin = not has_cjk(normalize_text(query))
+    names = []
+    for key in query_keys(query):
+        for name, is_full in index.get(key, ()):
+            if (is_full or latin) and name not in names:
+                names.append(name)
+    return names
+
+
+def _postings(name):
+    """名称的 (拼音键, 是否全拼)"""
+    return [(key, i == 0) for i, key in enumerate(phonetic_keys(name))]
+
+
+def build_phonetic_index(names) -> dict:
+    """
+    拼音键 -> [(名称, 是否全拼)]（按 names 中的先后顺序、去重），同一个键可能对应多个同音名称
+    建索引时记下键的类型，查询时不必再为名称生成拼音
+    """
+    index = {}
+    for name in names:
+        for key, is_full in _postings(name):
+            postings = index.setdefault(key, [])
+            if (name, is_full) not in postings:
+                postings.append((name, is_full))
+    return index
+
+
+def update_phonetic_index(index, removed=(), added=()) -> dict:
+    """按名称增删更新拼音索引；返回新字典，只替换受影响的名称列表，正在读旧字典的请求不受影响"""
+    index = dict(index)
+    for name in removed:
+        for key, _ in _postings(name):
+            postings = [posting for posting in index.get(key, ()) if posting[0] != name]
+            if postings:
+                index[key] = postings
+            else:
+                index.pop(key, None)
+    for name in added:
+        for key, is_full in _postings(name):
+            postings = index.get(key, [])
+            if (name, is_full) not in postings:
+                index[key] = postings + [(name, is_full)]
+    return index
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+压测用的模拟数据与统计工具
+Occupation-search 与 Static-search 的 benchmark.py 共用，同一 seed 生成相同的表格与错字；需要 pandas
+"""
+
+import random
+
+import pandas as pd
+
+STATUSES = ['Available', 'Occupied', 'Hold', '可用', '已占用']
+STATUS_WEIGHTS = [50, 30, 10, 6, 4]
+
+
+def random_cjk(rng, low=2, high=6):
+    return ''.join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(low, high)))
+
+
+def generate_sheet(rows, seed=0, keywords=False):
+    """
+    生成模拟才能表：约 1/10 名称带英文，约 1/3 带 1~2 个别称
+    keywords 为 True 时另加模糊词列，约 1/5 带模糊词（不加时随机序列与表格内容不变）
+    """
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < rows:
+        name = random_cjk(rng)
+        if rng.random() < 0.1:
+            name += rng.choice(['师', '者', 'Lv', 'EX', ' II'])
+        names.add(name)
+
+    records = []
+    for name in sorted(names, key=lambda _: rng.random()):
+        record = {'才能称号': name}
+        record['别称'] = '，'.join(random_cjk(rng, 2, 4) for _ in range(rng.choice([0, 0, 1, 2])))
+        if keywords:
+            record['模糊词'] = '，'.join(random_cjk(rng, 1, 2) for _ in range(rng.choice([0, 0, 0, 0, 1])))
+        record['审核状态'] = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+def make_typo(rng, text):
+    """随机替换、删除或交换一个字符"""
+    chars = list(text)
+    i = rng.randrange(len(chars))
+    action = rng.choice(['replace', 'delete', 'swap']) if len(chars) > 2 else 'replace'
+    if action == 'replace':
+        chars[i] = chr(rng.randint(0x4E00, 0x9FA5))
+    elif action == 'delete':
+        del chars[i]
+    else:
+        j = min(i + 1, len(chars) - 1)
+        chars[i], chars[j] = chars[j], chars[i]
+    return ''.join(chars)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+拼写建议索引（SymSpell 删除字典）
+建索引时为每个名称生成删去至多 max_distance 个字符的全部变体；查询时只生成查询词自己的删除变体查表，
+共享变体的名称才是候选，再用编辑距离逐个校验，耗时取决于候选数而不是名称总数
+
+变体只保存 64 位哈希与名称序号，排序后存入 array 二分查找，不为每个变体保留字符串
+哈希使用进程内的 hash()，索引不落盘，每个进程在加载数据时自行构建
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .normalize import normalize_text
+
+_HASH_MASK = (1 << 64) - 1
+_ID_BITS = 32
+
+
+def deletes(text, max_distance):
+    """删去至多 max_distance 个字符得到的全部变体（含原字符串）"""
+    variants = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b, limit):
+    """相邻交换记为一次编辑的 Damerau-Levenshtein 距离；超过 limit 时提前返回 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class SuggestionIndex:
+    """
+    terms 为已归一化、去重的名称；lookup 返回按编辑距离排序的 terms 元素
+    名称超过 prefix_length 时只对前缀生成变体（SymSpell 的前缀优化），完整名称仍参与校验
+    """
+
+    def __init__(self, terms, max_distance=2, prefix_length=7):
+        self.terms = list(terms)
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+        # 哈希与序号拼成一个整数一起排序，再拆成两个紧凑数组
+        entries = sorted(
+            ((hash(variant) & _HASH_MASK) << _ID_BITS) | term_id
+            for term_id, term in enumerate(self.terms)
+            for variant in deletes(term[:prefix_length], max_distance)
+        )
+        self._keys = array('Q', (entry >> _ID_BITS for entry in entries))
+        self._ids = array('L', (entry & ((1 << _ID_BITS) - 1) for entry in entries))
+        # 增量更新：删除的名称只记序号，新增名称的变体放在小字典里，基础数组不动
+        self._base_count = len(self.terms)
+        self._removed = frozenset()
+        self._extra = {}
+        self._positions = None
+
+    def __len__(self):
+        return len(self.terms) - len(self._removed)
+
+    def updated(self, added=(), removed=()):
+        """
+        返回增删若干名称后的新索引，与当前索引共享基础数组（当前索引仍可被其他请求使用）
+        增量部分超过基础名称数的 1/4 时整体重建
+        """
+        if self._positions is None:
+            self._positions = {term: term_id for term_id, term in enumerate(self.terms)}
+        removed_ids = set(self._removed)
+        removed_ids.update(self._positions[term] for term in removed if term in self._positions)
+        added = [term for term in added if term not in self._positions or self._positions[term] in removed_ids]
+
+        if len(self.terms) + len(added) - self._base_count + len(removed_ids) > self._base_count // 4:
+            live = [term for term_id, term in enumerate(self.terms) if term_id not in removed_ids]
+            return SuggestionIndex(live + added, self.max_distance, self.prefix_length)
+
+        index = object.__new__(SuggestionIndex)
+        index.__dict__.update(self.__dict__)
+        index.terms = self.terms + added
+        index._removed = frozenset(removed_ids)
+        index._extra = {key: list(ids) for key, ids in self._extra.items()}
+        index._positions = dict(self._positions)
+        for term_id, term in enumerate(added, len(self.terms)):
+            index._positions[term] = term_id
+            for variant in deletes(term[:self.prefix_length], self.max_distance):
+                index._extra.setdefault(hash(variant) & _HASH_MASK, []).append(term_id)
+        return index
+
+    def _candidates(self, query, distance):
+        candidates = set()
+        for variant in deletes(query[:self.prefix_length], distance):
+            key = hash(variant) & _HASH_MASK
+            lo = bisect_left(self._keys, key)
+            if lo < len(self._keys) and self._keys[lo] == key:
+                candidates.update(self._ids[lo:bisect_right(self._keys, key, lo)])
+            candidates.update(self._extra.get(key, ()))
+        return candidates - self._removed
+
+    def lookup(self, query, limit=3, cutoff=0.6):
+        """
+        最相近的至多 limit 个名称，相似度 1 - 距离 / 较长者长度 不低于 cutoff（与 difflib 的 cutoff 含义相近）
+        允许的距离随查询长度放宽（短查询只接受很小的改动），且不超过 max_distance
+        """
+        query = normalize_text(query)
+        if not query or not len(self):
+            return []
+        length = len(query)
+        distance = self.max_distance
+        if cutoff > 0:
+            # 较长者最多比查询长 d，相似度要求 d <= (1 - cutoff) * (length + d)
+            distance = min(distance, int((1 - cutoff) * length / cutoff + 1e-9))
+
+        matches = []
+        for term_id in self._candidates(query, distance):
+            term = self.terms[term_id]
+            if abs(len(term) - length) > distance:
+                continue
+            d = edit_distance(query, term, distance)
+            if d <= distance and 1 - d / max(length, len(term)) >= cutoff:
+                matches.append((d, term_id))
+        matches.sort()
+        return [self.terms[term_id] for _, term_id in matches[:limit]]